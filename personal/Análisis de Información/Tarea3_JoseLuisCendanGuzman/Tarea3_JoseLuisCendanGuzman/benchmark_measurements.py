@@ -0,0 +1,263 @@
+"""
+Benchmark reproducible de los modos de measurements_analysis.py.
+
+1. Genera measurements.txt de varios tamaños (1M, 10M, 100M, 1B filas) con una
+   lista de estaciones y una semilla fijas.
+2. Ejecuta cada modo en un proceso aparte, con repeticiones de calentamiento
+   que no se cuentan y N repeticiones medidas.
+3. Separa arranque (intérprete, imports, SparkContext) de cómputo, y mide el
+   pico de memoria residente (RSS) de cada proceso.
+4. Escribe una tabla CSV con todas las ejecuciones, un resumen con medianas y
+   un gráfico comparativo.
+
+Uso:
+    python benchmark_measurements.py --filas 1M 10M --modos pandas native --repeticiones 3
+"""
+
+import argparse
+import csv
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from multiprocessing import get_context
+
+import numpy as np
+
+from measurements_engines import MOTORES
+
+DIR_PROYECTO = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(DIR_PROYECTO, "measurements_analysis.py")
+ESTACIONES_REF = os.path.join(DIR_PROYECTO, "resultados", "resultados_pandas.txt")
+DIR_DATOS = os.path.join(DIR_PROYECTO, "data", "bench")
+DIR_SALIDA = os.path.join(DIR_PROYECTO, "resultados", "benchmark")
+
+SEMILLA = 42
+FILAS_POR_BLOQUE = 200_000
+
+#Modos Spark: cada uno con su master (número de workers)
+MODOS_SPARK = {
+    'spark_1w': (['spark'], 'local[1]'),
+    'spark_3w': (['spark3'], 'local[3]'),
+    'spark_agg_3w': (['spark_agg'], 'local[3]'),
+    'spark_df_3w': (['spark_df'], 'local[3]'),
+}
+
+#Modo -> (argumentos de measurements_analysis.py, master de Spark o None).
+#Los motores que no son Spark salen del registro (los mismos que la carrera)
+MODOS = {nombre: ([nombre], None) for nombre, clase in MOTORES.items() if clase.compite_en_carrera}
+MODOS.update(MODOS_SPARK)
+
+PATRON_TIEMPOS = re.compile(r"Tiempo: ([\d.]+)s \| Cómputo: ([\d.]+)s")
+
+
+def parsear_filas(texto):
+    """Convierte '1M', '10M', '1B' o '500000' en un entero."""
+    multiplicadores = {'K': 10 ** 3, 'M': 10 ** 6, 'B': 10 ** 9}
+    texto = texto.strip().upper()
+    if texto[-1] in multiplicadores:
+        return int(float(texto[:-1]) * multiplicadores[texto[-1]])
+    return int(texto)
+
+
+def cargar_estaciones():
+    """
+    Lista fija de estaciones con su temperatura media de referencia.
+
+    Se toma de resultados/resultados_pandas.txt para que los datos sintéticos
+    tengan las mismas estaciones que el fichero original.
+    """
+    estaciones = []
+    with open(ESTACIONES_REF, encoding="utf-8") as f:
+        for linea in f:
+            nombre, valores = linea.rstrip("\n").rsplit("=", 1)
+            estaciones.append((nombre, float(valores.split("/")[1])))
+    return estaciones
+
+
+def generar_mediciones(ruta, filas, semilla=SEMILLA):
+    """Genera `filas` mediciones 'estacion;temp' reproducibles con la semilla."""
+    estaciones = cargar_estaciones()
+    nombres = np.array([nombre for nombre, _ in estaciones], dtype=object)
+    medias = np.array([media for _, media in estaciones])
+    rng = np.random.default_rng(semilla)
+
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8", newline="\n") as f:
+        pendientes = filas
+        while pendientes > 0:
+            n = min(FILAS_POR_BLOQUE, pendientes)
+            idx = rng.integers(0, len(estaciones), n)
+            temps = np.clip(rng.normal(medias[idx], 10.0), -99.9, 99.9)
+            bloque = nombres[idx] + ";" + np.char.mod("%.1f", temps).astype(object)
+            f.write("\n".join(bloque))
+            f.write("\n")
+            pendientes -= n
+    os.replace(temporal, ruta)
+
+
+def ejecutar_modo(modo, archivo):
+    """
+    Ejecuta un modo en un proceso aparte.
+
+    Returns:
+        Diccionario con total, cómputo, arranque (s), pico RSS (MB) y código de salida
+    """
+    argumentos, master = MODOS[modo]
+    entorno = dict(os.environ, MEASUREMENTS_FILE=archivo, PYTHONIOENCODING="utf-8")
+    if master:
+        entorno["PYSPARK_SUBMIT_ARGS"] = f"--master {master} pyspark-shell"
+
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen([sys.executable, SCRIPT] + argumentos, cwd=DIR_PROYECTO,
+                               env=entorno, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    salida = proceso.stdout.read().decode("utf-8", errors="replace")
+    pico_rss = None
+    if hasattr(os, "wait4"):
+        #wait4 devuelve el uso de recursos de este hijo concreto (ru_maxrss)
+        _, estado, uso = os.wait4(proceso.pid, 0)
+        codigo = os.waitstatus_to_exitcode(estado)
+        proceso.returncode = codigo
+        pico_rss = uso.ru_maxrss / 1024 ** 2 if sys.platform == "darwin" else uso.ru_maxrss / 1024
+    else:
+        codigo = proceso.wait()
+    total = time.perf_counter() - inicio
+
+    #El pico de los modos Spark no incluye la JVM, que es otro proceso
+    tiempos = PATRON_TIEMPOS.search(salida)
+    computo = float(tiempos.group(2)) if tiempos else None
+    return {
+        'total_s': total,
+        'computo_s': computo,
+        'arranque_s': total - computo if computo is not None else None,
+        'pico_rss_mb': pico_rss,
+        'codigo': codigo,
+    }
+
+
+def resumir(filas_resultados):
+    """Medianas por (filas, modo) de las repeticiones medidas."""
+    grupos = {}
+    for fila in filas_resultados:
+        if fila['codigo'] != 0:
+            continue
+        grupos.setdefault((fila['filas'], fila['modo']), []).append(fila)
+
+    resumen = []
+    for (filas, modo), ejecuciones in sorted(grupos.items()):
+        def mediana(campo):
+            valores = [e[campo] for e in ejecuciones if e[campo] is not None]
+            return statistics.median(valores) if valores else None
+
+        resumen.append({
+            'filas': filas,
+            'modo': modo,
+            'repeticiones': len(ejecuciones),
+            'total_s': mediana('total_s'),
+            'computo_s': mediana('computo_s'),
+            'arranque_s': mediana('arranque_s'),
+            'pico_rss_mb': mediana('pico_rss_mb'),
+        })
+    return resumen
+
+
+def escribir_csv(ruta, filas):
+    if not filas:
+        return
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.DictWriter(f, fieldnames=list(filas[0].keys()))
+        escritor.writeheader()
+        escritor.writerows(filas)
+
+
+def dibujar_grafico(resumen, ruta):
+    """Tiempo total frente a filas por modo, y arranque/cómputo en el mayor tamaño."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
+
+    modos = sorted({r['modo'] for r in resumen})
+    for modo in modos:
+        puntos = [(r['filas'], r['total_s']) for r in resumen if r['modo'] == modo]
+        ax1.plot([p[0] for p in puntos], [p[1] for p in puntos], marker="o", label=modo)
+    ax1.set_xscale("log")
+    ax1.set_yscale("log")
+    ax1.set_xlabel("Filas")
+    ax1.set_ylabel("Tiempo total (s, mediana)")
+    ax1.set_title("Escalado por modo")
+    ax1.legend()
+
+    mayor = max(r['filas'] for r in resumen)
+    ultimos = [r for r in resumen if r['filas'] == mayor]
+    nombres = [r['modo'] for r in ultimos]
+    arranque = [r['arranque_s'] or 0 for r in ultimos]
+    computo = [r['computo_s'] or 0 for r in ultimos]
+    ax2.bar(nombres, arranque, label="Arranque")
+    ax2.bar(nombres, computo, bottom=arranque, label="Cómputo")
+    ax2.set_ylabel("Tiempo (s, mediana)")
+    ax2.set_title(f"Arranque vs cómputo ({mayor:,} filas)")
+    ax2.tick_params(axis="x", rotation=30)
+    ax2.legend()
+
+    fig.tight_layout()
+    fig.savefig(ruta, dpi=120)
+    plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de measurements_analysis.py")
+    parser.add_argument("--filas", nargs="+", default=["1M", "10M"],
+                        help="Tamaños a generar (1M, 10M, 100M, 1B...)")
+    parser.add_argument("--modos", nargs="+", default=list(MODOS), choices=list(MODOS))
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--calentamiento", type=int, default=1)
+    parser.add_argument("--semilla", type=int, default=SEMILLA)
+    parser.add_argument("--regenerar", action="store_true",
+                        help="Vuelve a generar los ficheros aunque existan")
+    parser.add_argument("--salida", default=DIR_SALIDA)
+    args = parser.parse_args()
+
+    os.makedirs(args.salida, exist_ok=True)
+    resultados = []
+
+    for texto in args.filas:
+        filas = parsear_filas(texto)
+        archivo = os.path.join(DIR_DATOS, f"measurements_{texto.upper()}_s{args.semilla}.txt")
+        if args.regenerar or not os.path.exists(archivo):
+            print(f"[GENERANDO] {archivo} ({filas:,} filas)")
+            inicio = time.perf_counter()
+            #En otro proceso: Linux hereda el pico de RSS del padre en los hijos,
+            #así que el proceso del benchmark debe mantenerse pequeño
+            generador = get_context("spawn").Process(
+                target=generar_mediciones, args=(archivo, filas, args.semilla))
+            generador.start()
+            generador.join()
+            print(f"[OK] Generado en {time.perf_counter() - inicio:.1f}s")
+
+        for modo in args.modos:
+            for _ in range(args.calentamiento):
+                ejecutar_modo(modo, archivo)
+            for rep in range(1, args.repeticiones + 1):
+                medida = ejecutar_modo(modo, archivo)
+                resultados.append({'filas': filas, 'modo': modo, 'repeticion': rep, **medida})
+                estado = "OK" if medida['codigo'] == 0 else f"ERROR ({medida['codigo']})"
+                computo = f"{medida['computo_s']:.2f}s" if medida['computo_s'] is not None else "-"
+                rss = f"{medida['pico_rss_mb']:.0f}MB" if medida['pico_rss_mb'] is not None else "-"
+                print(f"{filas:>14,} {modo:14} #{rep} total={medida['total_s']:.2f}s "
+                      f"computo={computo} rss={rss} {estado}")
+
+    resumen = resumir(resultados)
+    escribir_csv(os.path.join(args.salida, "benchmark_ejecuciones.csv"), resultados)
+    escribir_csv(os.path.join(args.salida, "benchmark_resumen.csv"), resumen)
+    if resumen:
+        dibujar_grafico(resumen, os.path.join(args.salida, "benchmark_comparacion.png"))
+    print(f"\nResultados guardados en: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
-import math
 import time
 import sys
 import os
 
+from measurements_engines import MOTORES, crear_motor, formatear, escribir_lineas
+
 #Detectar si estamos en Docker o Windows
 if os.path.exists("/tmp/data/measurements.txt"):
     archivo_datos = "/tmp/data/measurements.txt"
@@ -11,88 +12,89 @@ else:
     archivo_datos = "data/measurements.txt"
     dir_base = "data"
 
-#Obtener modo y workers (spark, pandas, spark3)
-modo = sys.argv[1] if len(sys.argv) > 1 else 'spark'
-
-print("Análisis de temperaturas - Modo:", modo)
-
-#Medir tiempo
-inicio = time.time()
-
-if modo == 'pandas':
-    #Versión con Pandas para comparar rendimiento
-    import pandas as pd
-    
-    df = pd.read_csv(archivo_datos, sep=";", 
-                     names=["estacion", "temperatura"])
-    
-    stats = df.groupby("estacion")["temperatura"].agg(['min', 'mean', 'max'])
-    stats = stats.sort_index()
-    
-    resultados = [(est, (row['min'], row['mean'], row['max'])) 
-                  for est, row in stats.iterrows()]
-    
-    directorio = f"{dir_base}/results"
+#Permite indicar otro fichero (p. ej. los generados por benchmark_measurements.py)
+#Con el modo multi admite patrones glob y listas con comas: "data/*.txt.gz,extra.txt"
+if os.environ.get("MEASUREMENTS_FILE"):
+    archivo_datos = os.environ["MEASUREMENTS_FILE"]
 
-else:
-    #Versión con Spark (procesamiento distribuido)
-    #Se importa SparkContext y SparkConf
-    from pyspark import SparkContext, SparkConf
-    conf1 = SparkConf().setAppName("temperaturas")
-    sc = SparkContext(conf = conf1).getOrCreate()
-    
-    #Cargar y parsear datos
-    lineas = sc.textFile(archivo_datos)
-    
-    def parsear(linea):
-        partes = linea.split(';')
-        return (partes[0], float(partes[1]))
-    
-    mediciones = lineas.map(parsear)
-    
-    #Agrupar por estación y calcular estadísticas
-    def calcular(temps):
-        lista = list(temps)
-        return (min(lista), sum(lista)/len(lista), max(lista))
-    
-    stats = mediciones.groupByKey().mapValues(calcular)
-    
-    #Ordenar alfabéticamente
-    resultados = stats.sortByKey().collect()
-    
+
+def ejecutar_motor(modo, opcion=None):
+    """Ejecuta un motor y devuelve (motor, stats, tiempo total, tiempo de cómputo)."""
+    motor = crear_motor(modo, opcion)
+
+    #Medir tiempo
+    inicio = time.time()
+    stats = motor.aggregate(archivo_datos)
+    tiempo = time.time() - inicio
+
+    #Si el motor no separa el arranque, todo cuenta como cómputo
+    computo = motor.computo if motor.computo is not None else tiempo
+    return motor, stats, tiempo, computo
+
+
+def carrera(modos):
+    """Ejecuta varios motores sobre el mismo fichero y compara tiempos y salida."""
+    informe = [f"{'Motor':16}{'Tiempo (s)':>12}{'Cómputo (s)':>13}  Misma salida"]
+    referencia = None
+    for modo in modos:
+        try:
+            _, stats, tiempo, computo = ejecutar_motor(modo)
+        except ImportError as e:
+            informe.append(f"{modo:16}{'-':>12}{'-':>13}  no instalado ({e.name})")
+            continue
+        lineas = formatear(stats)
+        if referencia is None:
+            referencia = lineas
+        igual = "si" if lineas == referencia else "NO"
+        informe.append(f"{modo:16}{tiempo:12.2f}{computo:13.2f}  {igual}")
+    return informe
+
+
+def main():
+    #Obtener modo y opción (workers, particiones o filas por trozo según el motor)
+    #Uso en flujo: zcat volcado.gz | python measurements_analysis.py stdin [segundos_parcial]
+    modo = sys.argv[1] if len(sys.argv) > 1 else 'spark'
+    opcion = sys.argv[2] if len(sys.argv) > 2 else None
+
+    print("Análisis de temperaturas - Modo:", modo)
     directorio = f"{dir_base}/results"
-    sc.stop()
-
-#Calcular tiempo
-tiempo = time.time() - inicio
-
-#Mostrar resultados
-for estacion, (minima, promedio, maxima) in resultados:
-    #Redondear hacia abajo a 1 decimal
-    min_r = math.floor(minima * 10) / 10
-    mean_r = math.floor(promedio * 10) / 10
-    max_r = math.floor(maxima * 10) / 10
-    print(f"{estacion}={min_r:.1f}/{mean_r:.1f}/{max_r:.1f}")
-
-#Guardar resultados con nombre único
-os.makedirs(directorio, exist_ok=True)
-
-#Nombre de archivo según el modo
-if modo == 'pandas':
-    nombre_archivo = "resultados_pandas.txt"
-elif modo == 'spark3':
-    nombre_archivo = "resultados_spark_3w.txt"
-else:
-    nombre_archivo = "resultados_spark_1w.txt"
-
-archivo = open(f"{directorio}/{nombre_archivo}", "w", encoding="utf-8")
-for estacion, (minima, promedio, maxima) in resultados:
-    min_r = math.floor(minima * 10) / 10
-    mean_r = math.floor(promedio * 10) / 10
-    max_r = math.floor(maxima * 10) / 10
-    archivo.write(f"{estacion}={min_r:.1f}/{mean_r:.1f}/{max_r:.1f}\n")
-archivo.close()
-
-#Mostrar resumen
-print(f"\nTiempo: {tiempo:.2f}s | Estaciones: {len(resultados)} | Modo: {modo}")
-print(f"Resultados guardados en: {directorio}/{nombre_archivo}")
+
+    if modo == 'race':
+        #Uso: python measurements_analysis.py race [pandas,native,polars,...]
+        #Por defecto compiten los motores con compite_en_carrera (todos salvo Spark, stdin e incremental)
+        modos = opcion.split(",") if opcion else [
+            m for m, clase in MOTORES.items() if clase.compite_en_carrera]
+        informe = carrera(modos)
+        for linea in informe:
+            print(linea)
+        ruta = escribir_lineas(directorio, "carrera_motores.txt", informe)
+        print(f"\nResultados guardados en: {ruta}")
+        return
+
+    motor, stats, tiempo, computo = ejecutar_motor(modo, opcion)
+
+    #Mostrar resultados
+    lineas = formatear(stats)
+    for linea in lineas:
+        print(linea)
+
+    #Guardar resultados con el nombre de fichero de cada motor
+    ruta = escribir_lineas(directorio, motor.archivo_salida, lineas)
+
+    #Informe adicional del motor (memoria, comparación de variantes...)
+    if motor.informe:
+        print()
+        for linea in motor.informe:
+            print(linea)
+        if motor.archivo_informe:
+            escribir_lineas(directorio, motor.archivo_informe, motor.informe)
+
+    #Mostrar resumen
+    #El arranque (imports, SparkContext...) es la diferencia entre total y cómputo
+    print(f"\nTiempo: {tiempo:.2f}s | Cómputo: {computo:.2f}s | Estaciones: {len(stats)} | Modo: {modo}")
+    print(f"Resultados guardados en: {ruta}")
+
+
+#Necesario para multiprocessing en Windows (spawn vuelve a importar este fichero)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+Registro de motores para el análisis de temperaturas.
+
+Todos los motores comparten la misma interfaz:
+
+    motor = crear_motor('pandas')
+    stats = motor.aggregate(archivo_datos)   # {estacion: Stats(minima, promedio, maxima)}
+
+Las librerías pesadas (pandas, pyspark, polars, duckdb) se importan dentro de
+aggregate(), así que sólo se cargan las del motor elegido.
+"""
+
+import math
+import os
+import sys
+import time
+from typing import NamedTuple
+
+
+class Stats(NamedTuple):
+    minima: float
+    promedio: float
+    maxima: float
+
+
+MOTORES = {}
+
+
+def registrar(nombre, archivo_salida=None):
+    """Decorador que añade un motor al registro con su fichero de resultados."""
+    def decorador(clase):
+        clase.nombre = nombre
+        clase.archivo_salida = archivo_salida or f"resultados_{nombre}.txt"
+        MOTORES[nombre] = clase
+        return clase
+    return decorador
+
+
+def crear_motor(nombre, opcion=None):
+    """Instancia el motor registrado con ese nombre."""
+    if nombre not in MOTORES:
+        raise ValueError(f"Motor desconocido: {nombre}. Disponibles: {', '.join(MOTORES)}")
+    return MOTORES[nombre](opcion)
+
+
+class Motor:
+    """
+    Interfaz común de los motores.
+
+    - opcion: segundo argumento de la línea de comandos (workers, particiones,
+      filas por trozo...), o None para el valor por defecto del motor.
+    - computo: segundos de cómputo sin el arranque (None = todo aggregate()).
+    - informe: líneas extra que se muestran al final (memoria, comparaciones).
+    - compite_en_carrera: si entra en la carrera por defecto ('race' sin lista).
+    """
+    nombre = None
+    archivo_salida = None
+    archivo_informe = None
+    compite_en_carrera = True
+
+    def __init__(self, opcion=None):
+        self.opcion = opcion
+        self.computo = None
+        self.informe = []
+
+    def aggregate(self, archivo_datos):
+        raise NotImplementedError
+
+
+def formatear(stats):
+    """Convierte {estacion: Stats} en líneas 'estacion=min/media/max' ordenadas."""
+    lineas = []
+    for estacion, (minima, promedio, maxima) in sorted(stats.items()):
+        #Redondear hacia abajo a 1 decimal
+        min_r = math.floor(minima * 10) / 10
+        mean_r = math.floor(promedio * 10) / 10
+        max_r = math.floor(maxima * 10) / 10
+        lineas.append(f"{estacion}={min_r:.1f}/{mean_r:.1f}/{max_r:.1f}")
+    return lineas
+
+
+def escribir_lineas(directorio, nombre_archivo, lineas):
+    """Guarda las líneas en directorio/nombre_archivo y devuelve la ruta."""
+    os.makedirs(directorio, exist_ok=True)
+    ruta = f"{directorio}/{nombre_archivo}"
+    with open(ruta, "w", encoding="utf-8") as f:
+        for linea in lineas:
+            f.write(linea + "\n")
+    return ruta
+
+
+def a_stats(resultados):
+    """Convierte [(estacion, (min, media, max))] en {estacion: Stats}."""
+    return {estacion: Stats(*valores) for estacion, valores in resultados}
+
+
+def desde_decimas(filas):
+    """
+    Convierte filas (estacion, min, suma, cuenta, max) en décimas enteras en
+    {estacion: Stats}. Se divide sólo al final, como en native y pandas_chunks:
+    la media en float del motor puede quedar justo por debajo de x.x5 y el
+    redondeo hacia abajo de formatear() la bajaría una décima.
+    """
+    return {estacion: Stats(minimo / 10, suma / (10 * cuenta), maximo / 10)
+            for estacion, minimo, suma, cuenta, maximo in filas}
+
+
+@registrar('pandas')
+class MotorPandas(Motor):
+    """read_csv completo en memoria + groupby."""
+
+    def aggregate(self, archivo_datos):
+        import pandas as pd
+
+        inicio = time.time()
+        df = pd.read_csv(archivo_datos, sep=";",
+                         names=["estacion", "temperatura"])
+
+        stats = df.groupby("estacion")["temperatura"].agg(['min', 'mean', 'max'])
+        resultado = {est: Stats(row['min'], row['mean'], row['max'])
+                     for est, row in stats.iterrows()}
+        self.computo = time.time() - inicio
+        return resultado
+
+
+@registrar('pandas_chunks')
+class MotorPandasTrozos(Motor):
+    """pandas por trozos con tipos compactos (memoria acotada)."""
+
+    def aggregate(self, archivo_datos):
+        import measurements_pandas
+
+        filas = int(self.opcion) if self.opcion else measurements_pandas.FILAS_POR_TROZO
+        resultados, memoria = measurements_pandas.analizar(archivo_datos, filas)
+
+        pico = f"{memoria['pico_mb']:.1f} MB" if memoria['pico_mb'] is not None else "no disponible"
+        self.informe = [f"Memoria: {memoria['trozos']} trozos | Trozo máximo: "
+                        f"{memoria['trozo_max_mb']:.1f} MB | Pico del proceso: {pico}"]
+        return a_stats(resultados)
+
+
+@registrar('native')
+class MotorNativo(Motor):
+    """mmap + multiprocessing + parser de bytes en décimas."""
+
+    def aggregate(self, archivo_datos):
+        import measurements_native
+
+        workers = int(self.opcion) if self.opcion else None
+        return a_stats(measurements_native.analizar(archivo_datos, workers))
+
+
+@registrar('multi')
+class MotorMultiFichero(Motor):
+    """Varios ficheros (glob o lista con comas), .gz/.zst incluidos, en paralelo."""
+
+    def aggregate(self, archivo_datos):
+        import measurements_streaming
+
+        workers = int(self.opcion) if self.opcion else None
+        resultados, num_ficheros = measurements_streaming.analizar_archivos(archivo_datos, workers)
+        self.informe = [f"Ficheros agregados: {num_ficheros}"]
+        return a_stats(resultados)
+
+
+@registrar('stdin')
+class MotorStdin(Motor):
+    """
+    Lee las mediciones de la entrada estándar (ignora el fichero de datos).
+
+    La opción son los segundos entre resultados parciales, que se escriben
+    en stderr para no mezclarse con la salida final. No entra en la carrera
+    por defecto: se quedaría esperando a la terminal.
+    """
+    INTERVALO = 10
+    compite_en_carrera = False
+
+    def aggregate(self, archivo_datos):
+        import measurements_streaming
+
+        intervalo = float(self.opcion) if self.opcion else self.INTERVALO
+        resultados, lineas = measurements_streaming.analizar_stdin(
+            intervalo=intervalo, al_parcial=self.mostrar_parcial)
+        self.informe = [f"Líneas leídas de stdin: {lineas:,}"]
+        return a_stats(resultados)
+
+    @staticmethod
+    def mostrar_parcial(resultados, lineas):
+        print(f"[PARCIAL] {lineas:,} líneas | {len(resultados)} estaciones", file=sys.stderr)
+        for linea in formatear(a_stats(resultados)):
+            print(linea, file=sys.stderr)
+        sys.stderr.flush()
+
+
+@registrar('incremental')
+class MotorIncremental(Motor):
+    """
+    Almacén persistente por estación: sólo procesa las líneas añadidas desde
+    la última ejecución. Con la opción 'tdigest' guarda también percentiles.
+    No entra en la carrera por defecto: actualiza el almacén, así que en la
+    siguiente carrera ya no calcularía desde cero.
+    """
+    archivo_informe = "informe_incremental.txt"
+    compite_en_carrera = False
+
+    def aggregate(self, archivo_datos):
+        import measurements_store
+
+        percentiles = self.opcion == 'tdigest'
+        resultados, self.informe = measurements_store.actualizar(
+            archivo_datos, percentiles=percentiles)
+        if percentiles:
+            self.informe.append("Percentiles (t-digest): estacion=p50/p95/p99")
+            for estacion, valores in sorted(measurements_store.percentiles_almacen(archivo_datos).items()):
+                self.informe.append(f"{estacion}=" + "/".join(f"{v:.1f}" for v in valores))
+        return a_stats(resultados)
+
+
+@registrar('quantiles')
+class MotorPercentiles(Motor):
+    """
+    min/media/max más p50/p95/p99 por estación (t-digest e histograma),
+    en paralelo por trozos y ficheros. Con la opción 'exacto' compara con
+    los percentiles exactos (sólo ficheros pequeños).
+    """
+    archivo_informe = "percentiles_estaciones.txt"
+
+    def aggregate(self, archivo_datos):
+        import measurements_quantiles
+
+        exacto = self.opcion == 'exacto'
+        workers = int(self.opcion) if self.opcion and not exacto else None
+        resultados, resumenes = measurements_quantiles.analizar(archivo_datos, workers)
+        self.informe = measurements_quantiles.tabla_percentiles(resumenes)
+        if exacto:
+            self.informe += [""] + measurements_quantiles.comprobar_exactos(archivo_datos, resumenes)
+        return a_stats(resultados)
+
+
+class MotorSpark(Motor):
+    """
+    Base de los motores Spark: `variante` de measurements_spark.VARIANTES.
+    No entran en la carrera por defecto (cada sesión Spark arranca una JVM).
+    """
+    variante = None
+    compite_en_carrera = False
+
+    def aggregate(self, archivo_datos):
+        import measurements_spark
+
+        particiones = int(self.opcion) if self.opcion else None
+        resultados, self.computo = measurements_spark.ejecutar(
+            self.variante, archivo_datos, particiones)
+        return a_stats(resultados)
+
+
+@registrar('spark', 'resultados_spark_1w.txt')
+class MotorSparkGroupByKey(MotorSpark):
+    variante = 'groupbykey'
+
+
+@registrar('spark3', 'resultados_spark_3w.txt')
+class MotorSparkGroupByKey3(MotorSpark):
+    #Mismo código que 'spark'; los 3 workers se fijan con --master local[3]
+    variante = 'groupbykey'
+
+
+@registrar('spark_agg')
+class MotorSparkAggregate(MotorSpark):
+    variante = 'aggregatebykey'
+
+
+@registrar('spark_df')
+class MotorSparkDataFrame(MotorSpark):
+    variante = 'dataframe'
+
+
+@registrar('spark_compare')
+class MotorSparkComparar(Motor):
+    """Ejecuta todas las variantes Spark y compara con groupByKey."""
+    archivo_informe = "comparacion_spark.txt"
+    compite_en_carrera = False
+
+    def aggregate(self, archivo_datos):
+        import measurements_spark
+
+        particiones = int(self.opcion) if self.opcion else None
+        resultados, informe = measurements_spark.comparar(
+            archivo_datos, particiones, lambda r: formatear(a_stats(r)))
+        self.informe = ["Comparación de variantes Spark (referencia: groupByKey)"] + informe
+        return a_stats(resultados)
+
+
+@registrar('polars')
+class MotorPolars(Motor):
+    """Polars en modo lazy (scan_csv + group_by().agg()) sobre décimas enteras."""
+
+    def aggregate(self, archivo_datos):
+        import polars as pl
+
+        decimas = (pl.col("temperatura") * 10).round().cast(pl.Int64)
+        stats = (pl.scan_csv(archivo_datos, separator=";", has_header=False,
+                             schema={"estacion": pl.Utf8, "temperatura": pl.Float64})
+                   .group_by("estacion")
+                   .agg(decimas.min().alias("minima"),
+                        decimas.sum().alias("suma"),
+                        pl.len().alias("cuenta"),
+                        decimas.max().alias("maxima"))
+                   .collect())
+        return desde_decimas(stats.iter_rows())
+
+
+@registrar('duckdb')
+class MotorDuckDB(Motor):
+    """DuckDB: read_csv + GROUP BY en SQL sobre décimas enteras."""
+
+    def aggregate(self, archivo_datos):
+        import duckdb
+
+        ruta = archivo_datos.replace("'", "''")
+        consulta = f"""
+            SELECT estacion, min(decimas), sum(decimas), count(*), max(decimas)
+            FROM (
+                SELECT estacion, CAST(round(temperatura * 10) AS BIGINT) AS decimas
+                FROM read_csv('{ruta}', delim=';', header=false, quote='"',
+                              columns={{'estacion': 'VARCHAR', 'temperatura': 'DOUBLE'}})
+            )
+            GROUP BY estacion
+        """
+        with duckdb.connect() as conexion:
+            filas = conexion.execute(consulta).fetchall()
+        return desde_decimas(filas)
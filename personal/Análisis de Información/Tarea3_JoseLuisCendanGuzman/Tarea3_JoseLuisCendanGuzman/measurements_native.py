@@ -0,0 +1,186 @@
+"""
+Modo nativo (Python puro) para el análisis de temperaturas.
+
+El fichero se mapea en memoria (mmap) y se divide en trozos alineados a salto
+de línea. Cada trozo se procesa en un proceso distinto con un parser de bytes
+que trabaja en décimas de grado enteras (sin floats), y al final se combinan
+los (min, max, suma, cuenta) de cada estación.
+"""
+
+import mmap
+import os
+from collections import Counter
+from multiprocessing import Pool
+
+#Tamaño máximo de cada trozo, para acotar la memoria de cada worker
+TAM_MAX_TROZO = 64 * 1024 * 1024
+
+
+def a_decimas(valor):
+    """Convierte b'-12.3' en -123 (décimas de grado) sin pasar por float."""
+    #Caso habitual del formato 1BRC: exactamente un decimal
+    if valor[-2:-1] == b'.':
+        return int(valor[:-2] + valor[-1:])
+    entero, _, decimales = valor.partition(b'.')
+    decimales = (decimales + b'0')[:1]
+    negativo = entero.startswith(b'-')
+    resultado = abs(int(entero or b'0')) * 10 + int(decimales)
+    return -resultado if negativo else resultado
+
+
+def dividir_en_trozos(archivo_datos, num_trozos, inicio=0, fin=None):
+    """
+    Devuelve una lista de (inicio, fin) en bytes alineados a salto de línea.
+
+    Con inicio/fin sólo se reparte ese rango del fichero (inicio debe ser
+    principio de línea).
+    """
+    tamano = os.path.getsize(archivo_datos) if fin is None else fin
+    if tamano <= inicio:
+        return []
+
+    with open(archivo_datos, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            limites = [inicio]
+            paso = max((tamano - inicio) // num_trozos, 1)
+            for i in range(1, num_trozos):
+                pos = max(inicio + i * paso, limites[-1])
+                if pos >= tamano:
+                    break
+                salto = mm.find(b"\n", pos, tamano)
+                if salto == -1:
+                    break
+                limites.append(salto + 1)
+            limites.append(tamano)
+
+    return [(a, b) for a, b in zip(limites, limites[1:]) if b > a]
+
+
+def procesar_trozo(args):
+    """
+    Agrega un trozo del fichero: {estacion(bytes): [min, max, suma, cuenta]}.
+    """
+    archivo_datos, inicio, fin = args
+    with open(archivo_datos, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            datos = mm[inicio:fin]
+    return agregar_lineas(datos)
+
+
+def agregar_lineas(datos, stats=None):
+    """
+    Suma las líneas completas de `datos` a stats {estacion: [min, max, suma, cuenta]}.
+
+    Se puede llamar varias veces con el mismo diccionario para agregar un
+    flujo de forma incremental.
+    """
+    if stats is None:
+        stats = {}
+    for linea in datos.split(b"\n"):
+        if not linea:
+            continue
+        estacion, _, valor = linea.rpartition(b";")
+        temp = a_decimas(valor.rstrip(b"\r"))
+        actual = stats.get(estacion)
+        if actual is None:
+            stats[estacion] = [temp, temp, temp, 1]
+        else:
+            if temp < actual[0]:
+                actual[0] = temp
+            if temp > actual[1]:
+                actual[1] = temp
+            actual[2] += temp
+            actual[3] += 1
+    return stats
+
+
+def procesar_trozo_valores(args):
+    """
+    Como procesar_trozo, pero además cuenta cuántas veces aparece cada
+    temperatura (en décimas) por estación: (stats, {estacion: Counter}).
+
+    Hay como mucho 1999 décimas distintas entre -99.9 y 99.9, así que los
+    contadores ocupan poco aunque el trozo tenga millones de líneas.
+    """
+    archivo_datos, inicio, fin = args
+    with open(archivo_datos, "rb") as f:
+        f.seek(inicio)
+        datos = f.read(fin - inicio)
+    return agregar_lineas_valores(datos)
+
+
+def agregar_lineas_valores(datos, stats=None, valores=None):
+    """Versión de agregar_lineas que también rellena valores {estacion: Counter de décimas}."""
+    if stats is None:
+        stats = {}
+    if valores is None:
+        valores = {}
+    for linea in datos.split(b"\n"):
+        if not linea:
+            continue
+        estacion, _, valor = linea.rpartition(b";")
+        temp = a_decimas(valor.rstrip(b"\r"))
+        actual = stats.get(estacion)
+        if actual is None:
+            stats[estacion] = [temp, temp, temp, 1]
+            valores[estacion] = Counter((temp,))
+            continue
+        if temp < actual[0]:
+            actual[0] = temp
+        if temp > actual[1]:
+            actual[1] = temp
+        actual[2] += temp
+        actual[3] += 1
+        valores[estacion][temp] += 1
+    return stats, valores
+
+
+def combinar(parciales):
+    """Combina los diccionarios parciales de cada trozo."""
+    total = {}
+    for parcial in parciales:
+        for estacion, (minimo, maximo, suma, cuenta) in parcial.items():
+            actual = total.get(estacion)
+            if actual is None:
+                total[estacion] = [minimo, maximo, suma, cuenta]
+            else:
+                actual[0] = min(actual[0], minimo)
+                actual[1] = max(actual[1], maximo)
+                actual[2] += suma
+                actual[3] += cuenta
+    return total
+
+
+def analizar(archivo_datos, workers=None):
+    """
+    Ejecuta el modo nativo y devuelve [(estacion, (min, media, max))] ordenado.
+
+    Los valores se devuelven como float en grados para reutilizar el mismo
+    formateo que los modos pandas y Spark.
+    """
+    workers = workers or os.cpu_count() or 1
+    #Varios trozos por worker para repartir mejor la carga
+    num_trozos = max(workers * 4, os.path.getsize(archivo_datos) // TAM_MAX_TROZO + 1)
+    trozos = dividir_en_trozos(archivo_datos, num_trozos)
+    tareas = [(archivo_datos, inicio, fin) for inicio, fin in trozos]
+
+    if workers == 1:
+        parciales = map(procesar_trozo, tareas)
+        total = combinar(parciales)
+    else:
+        with Pool(workers) as pool:
+            total = combinar(pool.imap_unordered(procesar_trozo, tareas))
+
+    return a_resultados(total)
+
+
+def a_resultados(total):
+    """Convierte {estacion: [min, max, suma, cuenta]} en décimas a [(estacion, (min, media, max))]."""
+    resultados = []
+    for estacion, (minimo, maximo, suma, cuenta) in total.items():
+        resultados.append((
+            estacion.decode("utf-8"),
+            (minimo / 10, suma / (10 * cuenta), maximo / 10)
+        ))
+    resultados.sort()
+    return resultados
@@ -0,0 +1,113 @@
+"""
+Modo pandas por trozos para el análisis de temperaturas.
+
+Lee el fichero en trozos con tipos compactos (estacion como category y
+temperatura como float32), agrega min/max/suma/cuenta de cada trozo y combina
+los parciales, de modo que la memoria queda acotada por el tamaño del trozo y
+no por el del fichero.
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+FILAS_POR_TROZO = 5_000_000
+#Bytes aproximados por línea ("estacion;-12.3\n"), para dimensionar bloques de pyarrow
+BYTES_POR_LINEA = 16
+
+COLUMNAS = ["estacion", "temperatura"]
+TIPOS = {"estacion": "category", "temperatura": "float32"}
+
+
+def leer_trozos(archivo_datos, filas_por_trozo):
+    """
+    Genera DataFrames de ~filas_por_trozo filas con los tipos de TIPOS.
+
+    El motor pyarrow de read_csv no admite chunksize, así que con pyarrow
+    instalado se usa su lector en streaming (pyarrow.csv.open_csv); si no,
+    read_csv con el motor C y chunksize.
+    """
+    try:
+        import pyarrow as pa
+        from pyarrow import csv
+    except ImportError:
+        yield from pd.read_csv(archivo_datos, sep=";", names=COLUMNAS,
+                               dtype=TIPOS, chunksize=filas_por_trozo)
+        return
+
+    lector = csv.open_csv(
+        archivo_datos,
+        read_options=csv.ReadOptions(column_names=COLUMNAS,
+                                     block_size=filas_por_trozo * BYTES_POR_LINEA),
+        parse_options=csv.ParseOptions(delimiter=";"),
+        convert_options=csv.ConvertOptions(column_types={
+            "estacion": pa.dictionary(pa.int32(), pa.string()),
+            "temperatura": pa.float32(),
+        }),
+    )
+    for lote in lector:
+        yield lote.to_pandas()
+
+
+def agregar_trozo(df):
+    """Agrega un trozo en décimas enteras: min, max, suma y cuenta por estación."""
+    #float32 no representa exactamente 17.9; se vuelve a décimas enteras
+    decimas = np.rint(df["temperatura"].to_numpy(dtype=np.float64) * 10).astype(np.int64)
+    parcial = (pd.Series(decimas, index=df["estacion"])
+                 .groupby(level=0, observed=True)
+                 .agg(['min', 'max', 'sum', 'count']))
+    parcial.index = parcial.index.astype(str)
+    return parcial
+
+
+def memoria_pico_mb():
+    """Memoria residente máxima del proceso en MB (None si no se puede medir)."""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / 1024 ** 2
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    #ru_maxrss está en KB en Linux y en bytes en macOS
+    return pico / 1024 ** 2 if sys.platform == "darwin" else pico / 1024
+
+
+def analizar(archivo_datos, filas_por_trozo=FILAS_POR_TROZO):
+    """
+    Ejecuta el modo por trozos y devuelve ([(estacion, (min, media, max))], memoria).
+
+    `memoria` es un diccionario con el tamaño máximo de un trozo en memoria y
+    el pico de memoria residente del proceso, en MB.
+    """
+    total = None
+    trozo_max = 0
+    num_trozos = 0
+    for df in leer_trozos(archivo_datos, filas_por_trozo):
+        num_trozos += 1
+        trozo_max = max(trozo_max, int(df.memory_usage(deep=True).sum()))
+        parcial = agregar_trozo(df)
+        if total is None:
+            total = parcial
+        else:
+            total = (pd.concat([total, parcial])
+                       .groupby(level=0)
+                       .agg({'min': 'min', 'max': 'max', 'sum': 'sum', 'count': 'sum'}))
+
+    resultados = []
+    if total is not None:
+        total = total.sort_index()
+        for estacion, fila in zip(total.index, total.itertuples(index=False)):
+            resultados.append((estacion, (int(fila.min) / 10,
+                                          int(fila.sum) / (10 * int(fila.count)),
+                                          int(fila.max) / 10)))
+
+    memoria = {
+        'trozos': num_trozos,
+        'trozo_max_mb': trozo_max / 1024 ** 2,
+        'pico_mb': memoria_pico_mb(),
+    }
+    return resultados, memoria
@@ -0,0 +1,206 @@
+"""
+Percentiles aproximados e histogramas por estación.
+
+Cada worker resume su trozo (o su fichero comprimido) en dos estructuras
+mergeables por estación, y el proceso principal las combina:
+
+- t-digest (measurements_tdigest, compresión 100): unos 50-100 centroides
+  por estación. No tiene una cota de error garantizada en el peor caso: el
+  error de rango crece con q(1-q), así que es menor en las colas que en la
+  mediana, y depende de cuántas mediciones tenga cada estación y de cómo se
+  repartan entre trozos. Para unos datos concretos, comprobar_exactos (opción
+  'exacto' del motor quantiles) mide el error máximo frente a los exactos.
+- Histograma de bins fijos (Histograma): ANCHO_BIN décimas por bin entre
+  -99.9 y 99.9. El percentil se devuelve como el centro del bin en el que
+  cae, así que el error en valor está acotado: |estimado - exacto| <= ANCHO_BIN/2
+  (ANCHO_BIN/20 grados). Con ANCHO_BIN = 1 el histograma es exacto porque las
+  temperaturas tienen un decimal.
+
+Los percentiles exactos usan el criterio nearest-rank: el valor en la
+posición ceil(q * n) de los datos ordenados.
+"""
+
+import bisect
+import math
+import os
+from multiprocessing import Pool
+
+import measurements_native
+import measurements_streaming
+from measurements_tdigest import TDigest
+
+CUANTILES = (0.5, 0.95, 0.99)
+
+#Rango de temperaturas del formato 1BRC, en décimas
+MIN_DECIMAS = -999
+MAX_DECIMAS = 999
+#Anchura de cada bin en décimas (5 = 0.5 grados, 400 bins)
+ANCHO_BIN = 5
+
+#comprobar_exactos guarda todas las mediciones en memoria
+TAM_MAX_EXACTO = 256 * 1024 * 1024
+
+
+class Histograma:
+    """Histograma de bins fijos en décimas; los valores fuera de rango van al primer/último bin."""
+
+    def __init__(self, ancho=ANCHO_BIN):
+        self.ancho = ancho
+        self.cuentas = [0] * ((MAX_DECIMAS - MIN_DECIMAS) // ancho + 1)
+        self.total = 0
+
+    def add(self, decimas, peso=1):
+        indice = (min(max(decimas, MIN_DECIMAS), MAX_DECIMAS) - MIN_DECIMAS) // self.ancho
+        self.cuentas[indice] += peso
+        self.total += peso
+
+    def add_many(self, pares):
+        for decimas, peso in pares:
+            self.add(decimas, peso)
+
+    def merge(self, otro):
+        self.cuentas = [a + b for a, b in zip(self.cuentas, otro.cuentas)]
+        self.total += otro.total
+        return self
+
+    def cuantil(self, q):
+        """Centro (en décimas) del bin que contiene el percentil q (nearest-rank)."""
+        if not self.total:
+            return None
+        objetivo = max(math.ceil(q * self.total), 1)
+        acumulado = 0
+        for i, cuenta in enumerate(self.cuentas):
+            acumulado += cuenta
+            if acumulado >= objetivo:
+                inicio = MIN_DECIMAS + i * self.ancho
+                fin = min(inicio + self.ancho - 1, MAX_DECIMAS)
+                return (inicio + fin) / 2
+        return MAX_DECIMAS
+
+
+def resumir_tarea(tarea):
+    """
+    Worker: agrega una tarea de measurements_streaming.crear_tareas y resume
+    los valores de cada estación en (TDigest, Histograma).
+
+    Returns:
+        Tupla (stats {estacion: [min, max, suma, cuenta]}, {estacion: (digest, histograma)})
+    """
+    if len(tarea) == 3:
+        stats, valores = measurements_native.procesar_trozo_valores(tarea)
+    else:
+        stats, valores = {}, {}
+        with measurements_streaming.abrir(tarea[0]) as flujo:
+            for bloque in measurements_streaming.leer_bloques(flujo):
+                measurements_native.agregar_lineas_valores(bloque, stats, valores)
+
+    resumenes = {}
+    for estacion, contador in valores.items():
+        digest = TDigest()
+        digest.add_many(contador.items())
+        histograma = Histograma()
+        histograma.add_many(contador.items())
+        resumenes[estacion] = (digest, histograma)
+    return stats, resumenes
+
+
+def combinar_resumenes(parciales):
+    """Combina (stats, resumenes) de cada tarea: digests e histogramas con merge()."""
+    stats_trozos = []
+    resumenes = {}
+    for stats, resumen in parciales:
+        stats_trozos.append(stats)
+        for estacion, (digest, histograma) in resumen.items():
+            actual = resumenes.get(estacion)
+            if actual is None:
+                resumenes[estacion] = (digest, histograma)
+            else:
+                actual[0].merge(digest)
+                actual[1].merge(histograma)
+    return measurements_native.combinar(stats_trozos), resumenes
+
+
+def analizar(patron, workers=None):
+    """
+    Agrega en paralelo y combina los resúmenes de todos los trozos.
+
+    Returns:
+        Tupla ([(estacion, (min, media, max))], {estacion: (digest, histograma)})
+    """
+    rutas = measurements_streaming.expandir_entradas(patron)
+    workers = workers or os.cpu_count() or 1
+    tareas = measurements_streaming.crear_tareas(rutas, workers)
+
+    if workers == 1:
+        total, resumenes = combinar_resumenes(map(resumir_tarea, tareas))
+    else:
+        with Pool(workers) as pool:
+            total, resumenes = combinar_resumenes(pool.imap_unordered(resumir_tarea, tareas))
+
+    resumenes = {estacion.decode("utf-8"): resumen for estacion, resumen in resumenes.items()}
+    return measurements_native.a_resultados(total), resumenes
+
+
+def tabla_percentiles(resumenes, cuantiles=CUANTILES):
+    """Líneas 'estacion=p50/p95/p99 | hist: p50/p95/p99' en grados."""
+    nombres = "/".join(f"p{round(q * 100)}" for q in cuantiles)
+    lineas = [f"estacion={nombres} (t-digest) | hist: {nombres} (bins de {ANCHO_BIN / 10:.1f} grados)"]
+    for estacion, (digest, histograma) in sorted(resumenes.items()):
+        td = "/".join(f"{digest.cuantil(q) / 10:.1f}" for q in cuantiles)
+        hist = "/".join(f"{histograma.cuantil(q) / 10:.2f}" for q in cuantiles)
+        lineas.append(f"{estacion}={td} | hist: {hist}")
+    return lineas
+
+
+def cuantil_exacto(ordenados, q):
+    """Percentil nearest-rank de una lista ordenada."""
+    return ordenados[max(math.ceil(q * len(ordenados)), 1) - 1]
+
+
+def rango(ordenados, valor):
+    """Fracción de valores <= valor."""
+    return bisect.bisect_right(ordenados, valor) / len(ordenados)
+
+
+def comprobar_exactos(patron, resumenes, cuantiles=CUANTILES):
+    """
+    Compara los percentiles aproximados con los exactos (ordenando todas las
+    mediciones en memoria). Sólo para ficheros pequeños.
+
+    Returns:
+        Líneas del informe con el error máximo por percentil
+    """
+    rutas = measurements_streaming.expandir_entradas(patron)
+    tamano = sum(os.path.getsize(r) for r in rutas)
+    if tamano > TAM_MAX_EXACTO:
+        return [f"Comprobación exacta omitida: {tamano / 1024 ** 2:.0f} MB "
+                f"(máximo {TAM_MAX_EXACTO / 1024 ** 2:.0f} MB)"]
+
+    mediciones = {}
+    for ruta in rutas:
+        with measurements_streaming.abrir(ruta) as flujo:
+            for bloque in measurements_streaming.leer_bloques(flujo):
+                for linea in bloque.split(b"\n"):
+                    if not linea:
+                        continue
+                    estacion, _, valor = linea.rpartition(b";")
+                    mediciones.setdefault(estacion.decode("utf-8"), []).append(
+                        measurements_native.a_decimas(valor.rstrip(b"\r")))
+
+    informe = [f"Comprobación exacta ({sum(len(v) for v in mediciones.values()):,} mediciones)",
+               f"{'Percentil':10}{'td err (gr)':>13}{'td err rango':>14}{'hist err (gr)':>15}  Cota hist"]
+    cota = ANCHO_BIN / 2
+    for q in cuantiles:
+        err_td = err_rango = err_hist = 0
+        for estacion, valores in mediciones.items():
+            valores.sort()
+            exacto = cuantil_exacto(valores, q)
+            digest, histograma = resumenes[estacion]
+            estimado = digest.cuantil(q)
+            err_td = max(err_td, abs(estimado - exacto))
+            err_rango = max(err_rango, abs(rango(valores, estimado) - q))
+            err_hist = max(err_hist, abs(histograma.cuantil(q) - exacto))
+        dentro = "si" if err_hist <= cota else "NO"
+        informe.append(f"{'p' + str(round(q * 100)):10}{err_td / 10:13.2f}{err_rango:14.4%}"
+                       f"{err_hist / 10:15.2f}  {dentro} (<= {cota / 10:.2f})")
+    return informe
@@ -0,0 +1,160 @@
+"""
+Variantes Spark para el análisis de temperaturas.
+
+- groupbykey: versión original, envía cada temperatura por el shuffle y
+  construye una lista por estación.
+- aggregatebykey: combina (min, max, suma, cuenta) en cada partición antes
+  del shuffle, así sólo viaja una tupla por estación y partición.
+- dataframe: API de DataFrames (spark.read.csv + groupBy().agg), optimizada
+  por Catalyst y sin serializar filas a Python.
+
+Las tres variantes agregan las temperaturas en décimas enteras y sólo
+dividen al final (como native y pandas_chunks). Sumando floats, el
+resultado depende del orden de la suma (por partición, en el shuffle...)
+y una media justo en el límite de una décima podría bajar 0.1 al
+redondear hacia abajo en formatear(), aunque los datos sean los mismos.
+"""
+
+import time
+
+
+def parsear(linea):
+    """'estacion;12.3' -> ('estacion', 123), con la temperatura en décimas."""
+    partes = linea.split(';')
+    return (partes[0], round(float(partes[1]) * 10))
+
+
+def desde_decimas(minimo, maximo, suma, cuenta):
+    """(min, media, max) en grados a partir de los agregados en décimas."""
+    return (minimo / 10, suma / (10 * cuenta), maximo / 10)
+
+
+def agrupar_groupbykey(sc, archivo_datos, particiones=None):
+    """Versión original con groupByKey().mapValues()."""
+    lineas = sc.textFile(archivo_datos, minPartitions=particiones)
+    mediciones = lineas.map(parsear)
+
+    #Agrupar por estación y calcular estadísticas
+    def calcular(temps):
+        lista = list(temps)
+        return desde_decimas(min(lista), max(lista), sum(lista), len(lista))
+
+    stats = mediciones.groupByKey(numPartitions=particiones).mapValues(calcular)
+
+    #Ordenar alfabéticamente
+    return stats.sortByKey().collect()
+
+
+def agrupar_aggregatebykey(sc, archivo_datos, particiones=None):
+    """Combina (min, max, suma, cuenta) por partición con aggregateByKey."""
+    lineas = sc.textFile(archivo_datos, minPartitions=particiones)
+    mediciones = lineas.map(parsear)
+
+    def sumar_valor(acc, temp):
+        return (min(acc[0], temp), max(acc[1], temp), acc[2] + temp, acc[3] + 1)
+
+    def combinar(a, b):
+        return (min(a[0], b[0]), max(a[1], b[1]), a[2] + b[2], a[3] + b[3])
+
+    inicial = (float('inf'), float('-inf'), 0, 0)
+    stats = mediciones.aggregateByKey(inicial, sumar_valor, combinar, numPartitions=particiones)
+
+    resultados = stats.mapValues(lambda s: desde_decimas(*s))
+    return resultados.sortByKey().collect()
+
+
+def agrupar_dataframe(spark, archivo_datos, particiones=None):
+    """Versión con la API de DataFrames (spark.read.csv + groupBy().agg)."""
+    from pyspark.sql import functions as F
+
+    if particiones:
+        spark.conf.set("spark.sql.shuffle.partitions", str(particiones))
+
+    df = spark.read.csv(archivo_datos, sep=";",
+                        schema="estacion STRING, temperatura DOUBLE")
+    decimas = F.round(F.col("temperatura") * 10).cast("long")
+    stats = (df.groupBy("estacion")
+               .agg(F.min(decimas).alias("minima"),
+                    F.max(decimas).alias("maxima"),
+                    F.sum(decimas).alias("suma"),
+                    F.count(decimas).alias("cuenta"))
+               .orderBy("estacion"))
+
+    return [(fila["estacion"], desde_decimas(fila["minima"], fila["maxima"], fila["suma"], fila["cuenta"]))
+            for fila in stats.collect()]
+
+
+VARIANTES = {
+    'groupbykey': agrupar_groupbykey,
+    'aggregatebykey': agrupar_aggregatebykey,
+    'dataframe': agrupar_dataframe,
+}
+
+
+def crear_sesion():
+    """Crea (o reutiliza) la SparkSession y su SparkContext."""
+    from pyspark import SparkConf
+    from pyspark.sql import SparkSession
+
+    conf1 = SparkConf().setAppName("temperaturas")
+    spark = SparkSession.builder.config(conf=conf1).getOrCreate()
+    return spark, spark.sparkContext
+
+
+def ejecutar(variante, archivo_datos, particiones=None):
+    """
+    Ejecuta una variante y devuelve ([(estacion, (min, media, max))], segundos).
+
+    Los segundos sólo cuentan el cómputo, sin el arranque de la sesión Spark.
+    """
+    spark, sc = crear_sesion()
+    try:
+        inicio = time.time()
+        if variante == 'dataframe':
+            resultados = agrupar_dataframe(spark, archivo_datos, particiones)
+        else:
+            resultados = VARIANTES[variante](sc, archivo_datos, particiones)
+        return resultados, time.time() - inicio
+    finally:
+        spark.stop()
+
+
+def comparar(archivo_datos, particiones=None, formatear=None):
+    """
+    Ejecuta todas las variantes sobre la misma sesión y compara con groupByKey.
+
+    Args:
+        archivo_datos: Fichero de mediciones
+        particiones: Número de particiones (None = valor por defecto de Spark)
+        formatear: Función que convierte los resultados en líneas de texto,
+                   para comprobar que la salida es la misma
+
+    Returns:
+        Tupla (resultados de groupByKey, líneas del informe de comparación)
+    """
+    spark, sc = crear_sesion()
+    tiempos = {}
+    salidas = {}
+    try:
+        for nombre, funcion in VARIANTES.items():
+            inicio = time.time()
+            if nombre == 'dataframe':
+                salidas[nombre] = funcion(spark, archivo_datos, particiones)
+            else:
+                salidas[nombre] = funcion(sc, archivo_datos, particiones)
+            tiempos[nombre] = time.time() - inicio
+    finally:
+        spark.stop()
+
+    base = tiempos['groupbykey']
+    referencia = formatear(salidas['groupbykey']) if formatear else salidas['groupbykey']
+    informe = [
+        f"Particiones: {particiones or 'por defecto'}",
+        f"{'Variante':16}{'Tiempo (s)':>12}{'Speedup':>10}  Misma salida",
+    ]
+    for nombre in VARIANTES:
+        salida = formatear(salidas[nombre]) if formatear else salidas[nombre]
+        igual = "si" if salida == referencia else "NO"
+        informe.append(f"{nombre:16}{tiempos[nombre]:12.2f}{base / tiempos[nombre]:9.2f}x  {igual}")
+
+    return salidas['groupbykey'], informe
@@ -0,0 +1,174 @@
+"""
+Almacén incremental de estadísticas por estación.
+
+Guarda en un JSON junto al fichero de datos los (min, max, suma, cuenta) de
+cada estación en décimas enteras y un checkpoint con el byte hasta el que se
+ha leído. Al volver a ejecutar sólo se procesan las líneas añadidas desde
+entonces, así que el coste es proporcional a los datos nuevos.
+
+El checkpoint guarda también una huella (sha1) de los últimos bytes leídos:
+si el fichero se ha truncado o reescrito, la huella no coincide y se
+recalcula todo desde el principio.
+
+Opcionalmente guarda un t-digest por estación para consultar percentiles.
+"""
+
+import hashlib
+import json
+import os
+from multiprocessing import Pool
+
+import measurements_native
+from measurements_tdigest import TDigest
+
+VERSION = 1
+#Bytes anteriores al checkpoint que se usan para la huella
+TAM_HUELLA = 4096
+
+
+def ruta_almacen(archivo_datos):
+    return archivo_datos + ".almacen.json"
+
+
+def huella(archivo_datos, offset):
+    """sha1 de los TAM_HUELLA bytes anteriores a offset."""
+    with open(archivo_datos, "rb") as f:
+        f.seek(max(offset - TAM_HUELLA, 0))
+        return hashlib.sha1(f.read(min(offset, TAM_HUELLA))).hexdigest()
+
+
+def almacen_vacio(archivo_datos, percentiles):
+    return {
+        'version': VERSION,
+        'archivo': os.path.abspath(archivo_datos),
+        'offset': 0,
+        'huella': None,
+        'lineas': 0,
+        'estaciones': {},
+        'digests': {} if percentiles else None,
+    }
+
+
+def cargar_almacen(archivo_datos, percentiles=False):
+    """
+    Lee el almacén y comprueba que su checkpoint sigue siendo válido.
+
+    Returns:
+        Tupla (almacén, motivo): motivo es None si se puede continuar, o el
+        texto que explica por qué se empieza de cero
+    """
+    ruta = ruta_almacen(archivo_datos)
+    if not os.path.exists(ruta):
+        return almacen_vacio(archivo_datos, percentiles), "sin almacén previo"
+
+    with open(ruta, encoding="utf-8") as f:
+        almacen = json.load(f)
+
+    if almacen.get('version') != VERSION:
+        motivo = "versión de almacén distinta"
+    elif almacen['offset'] > os.path.getsize(archivo_datos):
+        motivo = "el fichero es más pequeño que el checkpoint (truncado)"
+    elif almacen['huella'] != huella(archivo_datos, almacen['offset']):
+        motivo = "el contenido ya leído ha cambiado"
+    elif percentiles and almacen['digests'] is None:
+        motivo = "el almacén no tenía percentiles"
+    else:
+        return almacen, None
+    return almacen_vacio(archivo_datos, percentiles), motivo
+
+
+def guardar_almacen(archivo_datos, almacen):
+    """Escribe el almacén de forma atómica (fichero temporal + os.replace)."""
+    ruta = ruta_almacen(archivo_datos)
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(almacen, f, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+def fin_lineas_completas(archivo_datos):
+    """Byte siguiente al último salto de línea: una línea a medio escribir espera a la próxima vez."""
+    tamano = os.path.getsize(archivo_datos)
+    with open(archivo_datos, "rb") as f:
+        pos = tamano
+        while pos > 0:
+            inicio = max(pos - 64 * 1024, 0)
+            f.seek(inicio)
+            bloque = f.read(pos - inicio)
+            salto = bloque.rfind(b"\n")
+            if salto != -1:
+                return inicio + salto + 1
+            pos = inicio
+    return 0
+
+
+def actualizar(archivo_datos, workers=None, percentiles=False):
+    """
+    Procesa las líneas nuevas del fichero y actualiza el almacén.
+
+    Returns:
+        Tupla ([(estacion, (min, media, max))], informe) con el total acumulado
+        y las líneas del informe (bytes nuevos, motivo de recálculo...)
+    """
+    almacen, motivo = cargar_almacen(archivo_datos, percentiles)
+    inicio = almacen['offset']
+    fin = fin_lineas_completas(archivo_datos)
+    workers = workers or os.cpu_count() or 1
+
+    num_trozos = max(workers * 4, (fin - inicio) // measurements_native.TAM_MAX_TROZO + 1)
+    tareas = [(archivo_datos, a, b)
+              for a, b in measurements_native.dividir_en_trozos(archivo_datos, num_trozos, inicio, fin)]
+    funcion = measurements_native.procesar_trozo_valores if percentiles else measurements_native.procesar_trozo
+
+    if workers == 1 or len(tareas) <= 1:
+        parciales = list(map(funcion, tareas))
+    else:
+        with Pool(workers) as pool:
+            parciales = list(pool.imap_unordered(funcion, tareas))
+
+    #Lo ya guardado es un parcial más (JSON guarda las claves como str)
+    anteriores = {estacion.encode("utf-8"): valores
+                  for estacion, valores in almacen['estaciones'].items()}
+    if percentiles:
+        nuevos = [stats for stats, _ in parciales]
+        digests = {estacion: TDigest.desde_dict(d) for estacion, d in almacen['digests'].items()}
+        for _, valores in parciales:
+            for estacion, contador in valores.items():
+                nombre = estacion.decode("utf-8")
+                digest = digests.get(nombre)
+                if digest is None:
+                    digest = digests[nombre] = TDigest()
+                digest.add_many(contador.items())
+        almacen['digests'] = {estacion: d.a_dict() for estacion, d in digests.items()}
+    else:
+        nuevos = parciales
+        #Los digests dejarían de cubrir las líneas nuevas
+        almacen['digests'] = None
+    total = measurements_native.combinar([anteriores] + nuevos)
+
+    lineas_nuevas = sum(cuenta for stats in nuevos for _, _, _, cuenta in stats.values())
+    almacen['estaciones'] = {estacion.decode("utf-8"): valores for estacion, valores in total.items()}
+    almacen['offset'] = fin
+    almacen['huella'] = huella(archivo_datos, fin)
+    almacen['lineas'] += lineas_nuevas
+    guardar_almacen(archivo_datos, almacen)
+
+    informe = [
+        f"Almacén: {ruta_almacen(archivo_datos)}",
+        f"Recalculado desde cero: {motivo}" if motivo else f"Continuando desde el byte {inicio:,}",
+        f"Bytes nuevos: {fin - inicio:,} | Líneas nuevas: {lineas_nuevas:,} | "
+        f"Líneas totales: {almacen['lineas']:,}",
+    ]
+    return measurements_native.a_resultados(total), informe
+
+
+def percentiles_almacen(archivo_datos, cuantiles=(0.5, 0.95, 0.99)):
+    """Devuelve {estacion: [percentiles en grados]} a partir de los digests guardados."""
+    almacen, motivo = cargar_almacen(archivo_datos, percentiles=True)
+    if motivo:
+        return {}
+    resultado = {}
+    for estacion, datos in almacen['digests'].items():
+        digest = TDigest.desde_dict(datos)
+        resultado[estacion] = [digest.cuantil(q) / 10 for q in cuantiles]
+    return resultado
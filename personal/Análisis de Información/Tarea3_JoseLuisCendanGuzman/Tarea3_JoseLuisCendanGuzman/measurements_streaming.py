@@ -0,0 +1,168 @@
+"""
+Entrada en flujo para el análisis de temperaturas.
+
+- Varios ficheros: la entrada puede ser un patrón glob ("data/*.txt.gz") o
+  varios separados por comas. Los ficheros sin comprimir se dividen en trozos
+  con mmap igual que en el modo nativo; los comprimidos (.gz, .zst) no admiten
+  acceso aleatorio y se procesan enteros, uno por worker.
+- stdin: lee bloques de la entrada estándar a medida que llegan y agrega de
+  forma incremental, sin guardar el fichero en disco. Cada `intervalo`
+  segundos se puede consultar el resultado parcial.
+
+Todo se agrega en décimas enteras con el parser de measurements_native, así
+que la salida coincide con la del modo nativo.
+"""
+
+import glob
+import gzip
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import measurements_native
+
+#Tamaño de lectura de los ficheros comprimidos y de stdin
+TAM_BLOQUE = 4 * 1024 * 1024
+
+EXTENSIONES_GZIP = (".gz",)
+EXTENSIONES_ZSTD = (".zst", ".zstd")
+
+
+def abrir(ruta):
+    """Abre un fichero en binario, descomprimiendo según su extensión."""
+    if ruta.endswith(EXTENSIONES_GZIP):
+        return gzip.open(ruta, "rb")
+    if ruta.endswith(EXTENSIONES_ZSTD):
+        #Python 3.14 trae zstd en la librería estándar; antes hace falta zstandard
+        try:
+            from compression import zstd
+        except ImportError:
+            import zstandard
+            return zstandard.open(ruta, "rb")
+        return zstd.open(ruta, "rb")
+    return open(ruta, "rb")
+
+
+def esta_comprimido(ruta):
+    return ruta.endswith(EXTENSIONES_GZIP + EXTENSIONES_ZSTD)
+
+
+def expandir_entradas(patron):
+    """
+    Convierte 'a.txt,dir/*.gz' en la lista ordenada de ficheros existentes.
+
+    Lanza FileNotFoundError si algún patrón no encuentra ningún fichero.
+    """
+    rutas = []
+    for parte in patron.split(","):
+        parte = parte.strip()
+        if not parte:
+            continue
+        encontradas = sorted(glob.glob(parte)) if glob.has_magic(parte) else [parte]
+        encontradas = [r for r in encontradas if os.path.isfile(r)]
+        if not encontradas:
+            raise FileNotFoundError(f"Ningún fichero coincide con: {parte}")
+        rutas.extend(encontradas)
+    return rutas
+
+
+def leer_bloques(flujo, tam_bloque=TAM_BLOQUE):
+    """
+    Genera bloques de bytes que terminan en salto de línea.
+
+    La línea incompleta del final de cada lectura se guarda para el bloque
+    siguiente. Con read1() se devuelve lo que haya disponible en una tubería
+    sin esperar a llenar el bloque, para poder dar parciales en directo.
+    """
+    leer = getattr(flujo, "read1", flujo.read)
+    resto = b""
+    while True:
+        bloque = leer(tam_bloque)
+        if not bloque:
+            break
+        corte = bloque.rfind(b"\n")
+        if corte == -1:
+            resto += bloque
+            continue
+        yield resto + bloque[:corte + 1]
+        resto = bloque[corte + 1:]
+    if resto:
+        yield resto
+
+
+def agregar_flujo(flujo, stats=None):
+    """Agrega todas las líneas de un flujo binario en stats {estacion: [min, max, suma, cuenta]}."""
+    if stats is None:
+        stats = {}
+    for bloque in leer_bloques(flujo):
+        measurements_native.agregar_lineas(bloque, stats)
+    return stats
+
+
+def procesar_tarea(tarea):
+    """Tarea de un worker: (ruta, inicio, fin) de un fichero plano o (ruta,) comprimido."""
+    if len(tarea) == 3:
+        return measurements_native.procesar_trozo(tarea)
+    with abrir(tarea[0]) as flujo:
+        return agregar_flujo(flujo)
+
+
+def crear_tareas(rutas, workers):
+    """Reparte los ficheros en tareas: trozos para los planos, enteros para los comprimidos."""
+    planos = [r for r in rutas if not esta_comprimido(r)]
+    tareas = [(r,) for r in rutas if esta_comprimido(r)]
+    tamano_planos = sum(os.path.getsize(r) for r in planos)
+    for ruta in planos:
+        #Trozos proporcionales al tamaño de cada fichero, varios por worker
+        tamano = os.path.getsize(ruta)
+        num_trozos = max(workers * 4 * tamano // max(tamano_planos, 1),
+                         tamano // measurements_native.TAM_MAX_TROZO + 1, 1)
+        tareas.extend((ruta, inicio, fin)
+                      for inicio, fin in measurements_native.dividir_en_trozos(ruta, num_trozos))
+    return tareas
+
+
+def analizar_archivos(patron, workers=None):
+    """
+    Agrega en paralelo todos los ficheros del patrón.
+
+    Returns:
+        Tupla ([(estacion, (min, media, max))], número de ficheros)
+    """
+    rutas = expandir_entradas(patron)
+    workers = workers or os.cpu_count() or 1
+    tareas = crear_tareas(rutas, workers)
+
+    if workers == 1:
+        total = measurements_native.combinar(map(procesar_tarea, tareas))
+    else:
+        with Pool(workers) as pool:
+            total = measurements_native.combinar(pool.imap_unordered(procesar_tarea, tareas))
+    return measurements_native.a_resultados(total), len(rutas)
+
+
+def analizar_stdin(flujo=None, intervalo=None, al_parcial=None):
+    """
+    Agrega un flujo (stdin por defecto) de forma incremental.
+
+    Args:
+        flujo: Flujo binario de entrada (None = sys.stdin.buffer)
+        intervalo: Segundos entre resultados parciales (None = sin parciales)
+        al_parcial: Función que recibe ([(estacion, (min, media, max))], líneas leídas)
+
+    Returns:
+        Tupla ([(estacion, (min, media, max))], líneas leídas)
+    """
+    flujo = flujo or sys.stdin.buffer
+    stats = {}
+    lineas = 0
+    ultimo = time.time()
+    for bloque in leer_bloques(flujo):
+        measurements_native.agregar_lineas(bloque, stats)
+        #El último bloque puede no acabar en salto de línea
+        lineas += bloque.count(b"\n") + (not bloque.endswith(b"\n"))
+        if intervalo and al_parcial and time.time() - ultimo >= intervalo:
+            al_parcial(measurements_native.a_resultados(stats), lineas)
+            ultimo = time.time()
+    return measurements_native.a_resultados(stats), lineas
@@ -0,0 +1,139 @@
+"""
+t-digest (variante "merging") para estimar percentiles sin guardar las mediciones.
+
+Resume una distribución en unos pocos cientos de centroides (media, peso).
+Los centroides de los extremos se mantienen pequeños y los del centro pueden
+ser grandes, así que p1/p99 son más precisos que p50. Dos digests se combinan
+con merge(), lo que permite calcularlos por trozos o por worker y juntarlos.
+
+Referencia: Dunning y Ertl, "Computing Extremely Accurate Quantiles Using
+t-Digests" (2019).
+"""
+
+import math
+
+#Parámetro de compresión (delta): a más, más centroides y más precisión
+COMPRESION = 100
+
+
+def _k(q, compresion):
+    """Función de escala k1: q en [0, 1] -> k en [-delta/4, delta/4]."""
+    return compresion / (2 * math.pi) * math.asin(2 * q - 1)
+
+
+def _k_inversa(k, compresion):
+    return (math.sin(k * 2 * math.pi / compresion) + 1) / 2
+
+
+class TDigest:
+    """
+    Digest mergeable de una distribución.
+
+    - add(valor, peso): añade un valor (o un valor repetido `peso` veces).
+    - merge(otro): combina otro digest en este.
+    - cuantil(q): estimación del percentil q (0-1).
+    """
+
+    def __init__(self, compresion=COMPRESION):
+        self.compresion = compresion
+        self.medias = []
+        self.pesos = []
+        self.total = 0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+        self._pendientes = []
+
+    def add(self, valor, peso=1):
+        self._pendientes.append((valor, peso))
+        self.total += peso
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+        if len(self._pendientes) > 10 * self.compresion:
+            self._comprimir()
+
+    def add_many(self, pares):
+        """Añade pares (valor, peso), p. ej. un Counter de décimas."""
+        for valor, peso in pares:
+            self.add(valor, peso)
+
+    def merge(self, otro):
+        otro._comprimir()
+        self._pendientes.extend(zip(otro.medias, otro.pesos))
+        self.total += otro.total
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+        self._comprimir()
+        return self
+
+    def _comprimir(self):
+        """Une centroides y pendientes respetando el tamaño máximo que marca k1."""
+        if not self._pendientes:
+            return
+        puntos = sorted(list(zip(self.medias, self.pesos)) + self._pendientes)
+        self._pendientes = []
+
+        medias, pesos = [], []
+        acumulado = 0
+        media, peso = puntos[0]
+        q_limite = _k_inversa(_k(0, self.compresion) + 1, self.compresion)
+        for siguiente_media, siguiente_peso in puntos[1:]:
+            if (acumulado + peso + siguiente_peso) / self.total <= q_limite:
+                #Media ponderada incremental
+                peso += siguiente_peso
+                media += (siguiente_media - media) * siguiente_peso / peso
+            else:
+                medias.append(media)
+                pesos.append(peso)
+                acumulado += peso
+                q_limite = _k_inversa(_k(acumulado / self.total, self.compresion) + 1,
+                                      self.compresion)
+                media, peso = siguiente_media, siguiente_peso
+        medias.append(media)
+        pesos.append(peso)
+        self.medias, self.pesos = medias, pesos
+
+    def cuantil(self, q):
+        """Percentil q (0-1) interpolando entre los centros de los centroides."""
+        self._comprimir()
+        if not self.medias:
+            return None
+        if len(self.medias) == 1:
+            return self.medias[0]
+
+        objetivo = q * self.total
+        #Antes del primer centro: entre el mínimo y el primer centroide
+        centro = self.pesos[0] / 2
+        if objetivo <= centro:
+            return self.minimo + (self.medias[0] - self.minimo) * objetivo / centro
+
+        acumulado = 0
+        for i in range(len(self.medias) - 1):
+            centro = acumulado + self.pesos[i] / 2
+            siguiente = acumulado + self.pesos[i] + self.pesos[i + 1] / 2
+            if objetivo <= siguiente:
+                fraccion = (objetivo - centro) / (siguiente - centro)
+                return self.medias[i] + (self.medias[i + 1] - self.medias[i]) * fraccion
+            acumulado += self.pesos[i]
+
+        #Después del último centro: entre el último centroide y el máximo
+        centro = self.total - self.pesos[-1] / 2
+        fraccion = (objetivo - centro) / (self.total - centro)
+        return self.medias[-1] + (self.maximo - self.medias[-1]) * fraccion
+
+    def a_dict(self):
+        """Representación serializable en JSON."""
+        self._comprimir()
+        return {'compresion': self.compresion, 'medias': self.medias, 'pesos': self.pesos,
+                'minimo': self.minimo, 'maximo': self.maximo}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        digest = cls(datos['compresion'])
+        digest.medias = list(datos['medias'])
+        digest.pesos = list(datos['pesos'])
+        digest.total = sum(digest.pesos)
+        digest.minimo = datos['minimo']
+        digest.maximo = datos['maximo']
+        return digest
@@ -0,0 +1,159 @@
+"""
+Layout ODS particionado por tiempo (bucket pattern).
+Un documento por (producto, supermercado, mes) con el array de precios diarios
+y sus agregados precalculados, más el archivado de buckets antiguos a Parquet.
+"""
+
+import os
+from datetime import datetime
+
+import pandas as pd
+
+BUCKET_INDEX = [('ProductId', 1), ('SupermarketId', 1), ('month', 1)]
+ARCHIVE_DIR = os.path.join("data", "archive")
+
+
+def build_buckets(valid_df, products_map, supermarkets_map, processed_at=None):
+    """
+    Agrupa los hechos validados en buckets mensuales.
+
+    Args:
+        valid_df: DataFrame devuelto por validate_prices (con `_date` y `_price`)
+        products_map: {id_producto: datos del producto}
+        supermarkets_map: {id_supermercado: datos del supermercado}
+        processed_at: Marca de tiempo del proceso (por defecto, ahora)
+
+    Returns:
+        Lista de documentos bucket listos para insertar en MongoDB
+    """
+    if valid_df.empty:
+        return []
+
+    processed_at = processed_at or datetime.now()
+    facts = pd.DataFrame({
+        'ProductId': valid_df['ID_Producto'].astype('int64'),
+        'SupermarketId': valid_df['ID_Supermercado'].astype('int64'),
+        'month': valid_df['_date'].dt.strftime('%Y-%m'),
+        'day': valid_df['_date'].dt.day,
+        'Price': valid_df['_price'].astype(float),
+    }).sort_values(['ProductId', 'SupermarketId', 'month', 'day'])
+
+    keys = ['ProductId', 'SupermarketId', 'month']
+    stats = facts.groupby(keys)['Price'].agg(['min', 'max', 'sum', 'count'])
+
+    buckets = []
+    for (id_prod, id_sup, month), group in facts.groupby(keys, sort=False):
+        prod_info = products_map[id_prod]
+        sup_info = supermarkets_map[id_sup]
+        bucket_stats = stats.loc[(id_prod, id_sup, month)]
+        buckets.append({
+            # Clave del bucket
+            'ProductId': int(id_prod),
+            'SupermarketId': int(id_sup),
+            'month': month,
+            'month_start': datetime.strptime(month, '%Y-%m'),
+
+            # Etiquetas (una vez por bucket en lugar de una vez por día)
+            'Product': prod_info.get('nombre'),
+            'Category': prod_info.get('categoria'),
+            'Supermarket': sup_info.get('nombre'),
+            'Latitude': sup_info.get('latitud'),
+            'Longitude': sup_info.get('longitud'),
+
+            # Precios diarios y agregados precalculados
+            'prices': [{'day': int(day), 'price': float(price)}
+                       for day, price in zip(group['day'], group['Price'])],
+            'min': float(bucket_stats['min']),
+            'max': float(bucket_stats['max']),
+            'sum': float(bucket_stats['sum']),
+            'count': int(bucket_stats['count']),
+
+            # Metadatos ETL
+            '_processed_at': processed_at,
+            '_layer': 'ODS'
+        })
+    return buckets
+
+
+def unwind_buckets(buckets, date_from=None, date_to=None):
+    """
+    Expande los buckets a una fila por día (mismas columnas que 'ods_prices').
+
+    Args:
+        buckets: Documentos bucket leídos de MongoDB
+        date_from: Fecha mínima 'YYYY-MM-DD' (opcional)
+        date_to: Fecha máxima 'YYYY-MM-DD' (opcional)
+
+    Returns:
+        DataFrame con una fila por precio diario
+    """
+    rows = []
+    for bucket in buckets:
+        for item in bucket['prices']:
+            rows.append({
+                'Date': f"{bucket['month']}-{item['day']:02d}",
+                'Price': item['price'],
+                'Product': bucket.get('Product'),
+                'Category': bucket.get('Category'),
+                'ProductId': bucket['ProductId'],
+                'Supermarket': bucket.get('Supermarket'),
+                'SupermarketId': bucket['SupermarketId'],
+                'Latitude': bucket.get('Latitude'),
+                'Longitude': bucket.get('Longitude'),
+            })
+
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    # Los buckets de los extremos del rango pueden traer días fuera de él
+    if date_from:
+        df = df[df['Date'] >= date_from]
+    if date_to:
+        df = df[df['Date'] <= date_to]
+    return df.reset_index(drop=True)
+
+
+def month_range_filter(date_from=None, date_to=None):
+    """Filtro MongoDB sobre 'month' que cubre el rango de fechas pedido."""
+    month_filter = {}
+    if date_from:
+        month_filter['$gte'] = date_from[:7]
+    if date_to:
+        month_filter['$lte'] = date_to[:7]
+    return {'month': month_filter} if month_filter else {}
+
+
+def archive_buckets_to_parquet(collection, before_month, archive_dir=ARCHIVE_DIR):
+    """
+    Archiva en Parquet los buckets anteriores a un mes y los elimina de MongoDB.
+
+    Args:
+        collection: Colección de buckets ('ods_prices_buckets')
+        before_month: Primer mes que se conserva en MongoDB ('YYYY-MM')
+        archive_dir: Directorio de salida (un fichero por mes)
+
+    Returns:
+        Número de buckets archivados
+    """
+    query = {'month': {'$lt': before_month}}
+    buckets = list(collection.find(query, {'_id': 0}))
+    if not buckets:
+        return 0
+
+    os.makedirs(archive_dir, exist_ok=True)
+    df = unwind_buckets(buckets)
+    df['month'] = df['Date'].str[:7]
+    for month, month_df in df.groupby('month'):
+        path = os.path.join(archive_dir, f"ods_prices_{month}.parquet")
+        if os.path.exists(path):
+            # Re-archivado del mismo mes: se combinan sin duplicar días
+            month_df = pd.concat([pd.read_parquet(path), month_df.drop(columns='month')])
+            month_df = month_df.drop_duplicates(['Date', 'ProductId', 'SupermarketId'], keep='last')
+        else:
+            month_df = month_df.drop(columns='month')
+        month_df.to_parquet(path, index=False)
+        print(f"[ARCHIVO] {path} ({len(month_df)} registros)")
+
+    # Sólo se borra de MongoDB después de escribir los ficheros
+    collection.delete_many(query)
+    return len(buckets)
@@ -0,0 +1,223 @@
+"""
+Dimensiones con claves sustitutas para la capa ODS compacta.
+Mantiene una caché versionada (SCD tipo 2) de Productos y Supermercados para que
+los hechos guarden sólo claves enteras y las etiquetas se recuperen al final.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Inicio de validez de la primera versión de cada miembro (cubre todo el histórico)
+BEGINNING_OF_TIME = datetime(1900, 1, 1)
+MISSING_KEY = -1
+
+
+def is_null(value):
+    """None o NaN (un atributo nulo vuelve de MongoDB vía DataFrame como NaN)."""
+    return pd.api.types.is_scalar(value) and pd.isna(value)
+
+
+def same_value(a, b):
+    """Compara dos valores de atributo tratando todos los nulos como iguales."""
+    if is_null(a) or is_null(b):
+        return is_null(a) and is_null(b)
+    return a == b
+
+
+class DimensionCache:
+    """
+    Caché de una dimensión con clave sustituta entera.
+    - Cambios en atributos `tracked` abren una nueva versión (SCD tipo 2)
+    - Cambios en el resto de atributos se sobrescriben (SCD tipo 1)
+    - Persiste las versiones en una colección MongoDB ('dim_*')
+    """
+
+    def __init__(self, collection, natural_key, attributes, tracked, key_name):
+        """
+        Args:
+            collection: Colección MongoDB donde se guardan las versiones
+            natural_key: Campo con el ID de negocio (p. ej. 'id_producto')
+            attributes: Atributos descriptivos que se guardan en la dimensión
+            tracked: Subconjunto de `attributes` versionado con SCD tipo 2
+            key_name: Nombre de la clave sustituta (p. ej. 'ProductKey')
+        """
+        self.collection = collection
+        self.natural_key = natural_key
+        self.attributes = list(attributes)
+        self.tracked = list(tracked)
+        self.key_name = key_name
+        self.versions = self._empty_versions()
+
+    def _empty_versions(self):
+        columns = [self.key_name, self.natural_key] + self.attributes + [
+            'valid_from', 'valid_to', 'is_current', 'version'
+        ]
+        return pd.DataFrame(columns=columns)
+
+    def load(self):
+        """Carga todas las versiones guardadas en MongoDB."""
+        data = list(self.collection.find({}, {'_id': 0}))
+        self.versions = pd.DataFrame(data) if data else self._empty_versions()
+        return self
+
+    def _next_key(self):
+        if self.versions.empty:
+            return 1
+        return int(self.versions[self.key_name].max()) + 1
+
+    def sync(self, records, as_of=None):
+        """
+        Sincroniza la dimensión con los registros RAW actuales.
+
+        Args:
+            records: Lista de diccionarios de la dimensión RAW
+            as_of: Fecha de efecto de los cambios (por defecto, ahora)
+
+        Returns:
+            Diccionario con el número de miembros nuevos, versionados y actualizados
+        """
+        as_of = as_of or datetime.now()
+        stats = {'new': 0, 'versioned': 0, 'updated': 0}
+        current = {}
+        if not self.versions.empty:
+            current_rows = self.versions[self.versions['is_current'].astype(bool)]
+            current = {row[self.natural_key]: row for row in current_rows.to_dict('records')}
+
+        next_key = self._next_key()
+        inserts = []
+        for record in records:
+            natural_id = record.get(self.natural_key)
+            values = {attr: record.get(attr) for attr in self.attributes}
+            previous = current.get(natural_id)
+
+            if previous is None:
+                valid_from, version = BEGINNING_OF_TIME, 1
+                stats['new'] += 1
+            elif not all(same_value(previous.get(attr), values[attr]) for attr in self.tracked):
+                # SCD tipo 2: cerrar la versión vigente y abrir otra
+                self.collection.update_one(
+                    {self.key_name: previous[self.key_name]},
+                    {'$set': {'valid_to': as_of, 'is_current': False}}
+                )
+                valid_from, version = as_of, int(previous['version']) + 1
+                stats['versioned'] += 1
+            else:
+                changed = {attr: values[attr] for attr in self.attributes
+                           if not same_value(previous.get(attr), values[attr])}
+                if changed:
+                    # SCD tipo 1: sobrescribir en todas las versiones del miembro
+                    self.collection.update_many({self.natural_key: natural_id}, {'$set': changed})
+                    stats['updated'] += 1
+                continue
+
+            inserts.append({
+                self.key_name: next_key,
+                self.natural_key: natural_id,
+                **values,
+                'valid_from': valid_from,
+                'valid_to': None,
+                'is_current': True,
+                'version': version
+            })
+            next_key += 1
+
+        if inserts:
+            self.collection.insert_many(inserts)
+        if any(stats.values()):
+            self.load()
+        return stats
+
+    def lookup(self, natural_ids, dates):
+        """
+        Resuelve la clave sustituta vigente en cada fecha (vectorizado).
+
+        Args:
+            natural_ids: Serie con los IDs de negocio de los hechos
+            dates: Serie datetime con la fecha de cada hecho
+
+        Returns:
+            Array de claves sustitutas (MISSING_KEY si no hay versión vigente)
+        """
+        if self.versions.empty:
+            return np.full(len(natural_ids), MISSING_KEY, dtype=np.int64)
+
+        facts = pd.DataFrame({
+            '_pos': np.arange(len(natural_ids)),
+            self.natural_key: np.asarray(natural_ids),
+            '_date': pd.to_datetime(np.asarray(dates)),
+        }).sort_values('_date')
+        versions = self.versions[[self.key_name, self.natural_key, 'valid_from']].copy()
+        versions['valid_from'] = pd.to_datetime(versions['valid_from'])
+        versions = versions.sort_values('valid_from')
+
+        matched = pd.merge_asof(
+            facts, versions, left_on='_date', right_on='valid_from',
+            by=self.natural_key, direction='backward'
+        ).sort_values('_pos')
+        return matched[self.key_name].fillna(MISSING_KEY).to_numpy(dtype=np.int64)
+
+    def labels(self):
+        """Devuelve las etiquetas de cada clave sustituta (índice = clave)."""
+        return self.versions.set_index(self.key_name)[[self.natural_key] + self.attributes]
+
+
+def product_dimension(db):
+    """Dimensión Productos: la categoría se versiona con SCD tipo 2."""
+    return DimensionCache(
+        db['dim_products'], 'id_producto', ['nombre', 'categoria'],
+        tracked=['categoria'], key_name='ProductKey'
+    )
+
+
+def supermarket_dimension(db):
+    """Dimensión Supermercados: el factor de precio se versiona con SCD tipo 2."""
+    return DimensionCache(
+        db['dim_supermarkets'], 'id_supermercado',
+        ['nombre', 'factor_precio', 'latitud', 'longitud'],
+        tracked=['factor_precio'], key_name='SupermarketKey'
+    )
+
+
+def date_to_key(dates):
+    """Convierte una serie datetime en claves enteras YYYYMMDD."""
+    return (dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day).astype('int32')
+
+
+def key_to_date(date_keys):
+    """Convierte claves enteras YYYYMMDD en fechas 'YYYY-MM-DD'."""
+    return pd.to_datetime(date_keys.astype(str), format='%Y%m%d').dt.strftime('%Y-%m-%d')
+
+
+def rehydrate_ods(facts, products, supermarkets):
+    """
+    Recupera las etiquetas de los hechos compactos sólo en el momento de la salida.
+
+    Args:
+        facts: DataFrame con DateKey, ProductKey, SupermarketKey y Price
+        products: DimensionCache de Productos
+        supermarkets: DimensionCache de Supermercados
+
+    Returns:
+        DataFrame con las mismas columnas que el ODS desnormalizado
+    """
+    if facts.empty:
+        return facts
+
+    product_labels = products.labels()
+    supermarket_labels = supermarkets.labels()
+    product_keys = facts['ProductKey']
+    supermarket_keys = facts['SupermarketKey']
+
+    return pd.DataFrame({
+        'Date': key_to_date(facts['DateKey']),
+        'Price': facts['Price'],
+        'Product': product_keys.map(product_labels['nombre']),
+        'Category': product_keys.map(product_labels['categoria']),
+        'ProductId': product_keys.map(product_labels['id_producto']),
+        'Supermarket': supermarket_keys.map(supermarket_labels['nombre']),
+        'SupermarketId': supermarket_keys.map(supermarket_labels['id_supermercado']),
+        'Latitude': supermarket_keys.map(supermarket_labels['latitud']),
+        'Longitude': supermarket_keys.map(supermarket_labels['longitud']),
+    })
@@ -0,0 +1,131 @@
+"""
+Validación de calidad de datos entre RAW y ODS.
+Comprueba un lote completo de precios con máscaras vectorizadas (pandas/NumPy)
+y separa las filas válidas de las rechazadas con sus códigos de motivo.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Columnas de la tabla de hechos RAW
+DATE_COL = 'Fecha'
+PRODUCT_COL = 'ID_Producto'
+SUPERMARKET_COL = 'ID_Supermercado'
+PRICE_COL = 'Precio'
+NATURAL_KEY = [DATE_COL, PRODUCT_COL, SUPERMARKET_COL]
+
+# Códigos de motivo de rechazo (en orden de evaluación)
+NULL_FIELD = 'NULL_FIELD'
+PRICE_NOT_NUMERIC = 'PRICE_NOT_NUMERIC'
+PRICE_NEGATIVE = 'PRICE_NEGATIVE'
+UNKNOWN_PRODUCT = 'UNKNOWN_PRODUCT'
+UNKNOWN_SUPERMARKET = 'UNKNOWN_SUPERMARKET'
+DATE_INVALID = 'DATE_INVALID'
+DATE_OUT_OF_RANGE = 'DATE_OUT_OF_RANGE'
+DUPLICATE_KEY = 'DUPLICATE_KEY'
+PRICE_OUTLIER = 'PRICE_OUTLIER'
+
+# Configuración por defecto
+MIN_DATE = '2000-01-01'
+OUTLIER_WINDOW = 5        # Observaciones por (producto, supermercado) en la mediana móvil
+OUTLIER_MIN_PERIODS = 3   # Observaciones mínimas en la ventana para poder marcar un atípico
+OUTLIER_RATIO = 2.5       # Atípico si el precio es más de 2.5 veces la mediana o menos de 1/2.5
+
+
+def validate_prices(df, product_ids, supermarket_ids, min_date=MIN_DATE, max_date=None,
+                    outlier_window=OUTLIER_WINDOW, outlier_min_periods=OUTLIER_MIN_PERIODS,
+                    outlier_ratio=OUTLIER_RATIO):
+    """
+    Valida un lote de precios RAW de una sola vez.
+
+    Args:
+        df: DataFrame con las columnas de la tabla de hechos RAW
+        product_ids: IDs de producto conocidos (dimensión Productos)
+        supermarket_ids: IDs de supermercado conocidos (dimensión Supermercados)
+        min_date: Fecha mínima admitida
+        max_date: Fecha máxima admitida (por defecto, hoy)
+        outlier_window: Tamaño de la ventana de la mediana móvil
+        outlier_min_periods: Observaciones mínimas en la ventana para calcular la mediana.
+            Los grupos (producto, supermercado) más pequeños no se marcan nunca: con dos
+            observaciones la mediana es su media y las dos se desviarían lo mismo.
+        outlier_ratio: Cociente precio/mediana (por arriba o por abajo) a partir del
+            cual un precio es atípico
+
+    Returns:
+        Tupla (valid, rejected). `valid` trae las columnas normalizadas
+        `_price` (float) y `_date` (datetime); `rejected` trae `reason_codes`
+        con la lista de motivos de cada fila.
+    """
+    if max_date is None:
+        max_date = pd.Timestamp.now().normalize()
+
+    n = len(df)
+    columns = {col: (df[col] if col in df.columns else pd.Series([None] * n, index=df.index))
+               for col in NATURAL_KEY + [PRICE_COL]}
+
+    price = pd.to_numeric(columns[PRICE_COL], errors='coerce')
+    date = pd.to_datetime(columns[DATE_COL], errors='coerce', format='%Y-%m-%d')
+
+    masks = {}
+    nulls = np.zeros(n, dtype=bool)
+    for col in NATURAL_KEY + [PRICE_COL]:
+        nulls |= columns[col].isna().to_numpy()
+    masks[NULL_FIELD] = nulls
+    masks[PRICE_NOT_NUMERIC] = ~nulls & price.isna().to_numpy()
+    masks[PRICE_NEGATIVE] = (price < 0).to_numpy()
+    masks[UNKNOWN_PRODUCT] = ~nulls & ~columns[PRODUCT_COL].isin(product_ids).to_numpy()
+    masks[UNKNOWN_SUPERMARKET] = ~nulls & ~columns[SUPERMARKET_COL].isin(supermarket_ids).to_numpy()
+    masks[DATE_INVALID] = ~nulls & date.isna().to_numpy()
+    masks[DATE_OUT_OF_RANGE] = ((date < pd.Timestamp(min_date)) | (date > pd.Timestamp(max_date))).to_numpy()
+
+    # Duplicados de clave natural: se conserva la primera aparición válida. Sólo se
+    # buscan entre las filas que pasan el resto de reglas, así una primera copia
+    # rechazada (precio nulo, fecha mala...) no deja la clave sin ninguna fila válida
+    passed = ~np.logical_or.reduce(list(masks.values()))
+    keys = pd.DataFrame({col: columns[col] for col in NATURAL_KEY})
+    duplicates = np.zeros(n, dtype=bool)
+    duplicates[passed] = keys[passed].duplicated(keep='first').to_numpy()
+    masks[DUPLICATE_KEY] = duplicates
+
+    # Atípicos respecto a la mediana móvil, sólo sobre las filas que pasan el resto
+    candidate = ~np.logical_or.reduce(list(masks.values()))
+    outliers = np.zeros(n, dtype=bool)
+    if candidate.any():
+        sub = pd.DataFrame({
+            'product': columns[PRODUCT_COL][candidate],
+            'supermarket': columns[SUPERMARKET_COL][candidate],
+            'date': date[candidate],
+            'price': price[candidate],
+        }).sort_values(['product', 'supermarket', 'date'])
+        groups = sub.groupby(['product', 'supermarket'], sort=False)['price']
+        median = (groups.rolling(outlier_window, min_periods=outlier_min_periods, center=True).median()
+                  .reset_index(level=[0, 1], drop=True)
+                  .reindex(sub.index))
+        # Sin mediana (grupo o ventana demasiado pequeños) no se marca nada
+        median = median.where(groups.transform('size') >= outlier_min_periods)
+        ratio = sub['price'] / median
+        flagged = ratio[(ratio > outlier_ratio) | (ratio < 1 / outlier_ratio)].index
+        outliers[df.index.get_indexer(flagged)] = True
+    masks[PRICE_OUTLIER] = outliers
+
+    codes = list(masks.keys())
+    matrix = np.column_stack([masks[code] for code in codes])
+    rejected_rows = matrix.any(axis=1)
+
+    valid = df.loc[~rejected_rows].copy()
+    valid['_price'] = price[~rejected_rows]
+    valid['_date'] = date[~rejected_rows]
+
+    rejected = df.loc[rejected_rows].copy()
+    rejected['reason_codes'] = [
+        [codes[i] for i in np.flatnonzero(row)] for row in matrix[rejected_rows]
+    ]
+
+    return valid, rejected
+
+
+def summarize_reasons(rejected):
+    """Cuenta las filas rechazadas por código de motivo."""
+    if rejected.empty:
+        return {}
+    return rejected['reason_codes'].explode().value_counts().to_dict()
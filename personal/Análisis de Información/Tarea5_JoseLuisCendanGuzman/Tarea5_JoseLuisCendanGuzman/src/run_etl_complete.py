@@ -3,6 +3,7 @@ Script maestro que ejecuta todo el pipeline ETL completo.
 Ejecuta las 3 capas en secuencia: RAW -> ODS -> DRV
 """
 
+import argparse
 import sys
 import time
 import os
@@ -38,8 +39,37 @@ def check_mongodb_connection(uri):
         print(f"[ERROR] No se pudo conectar a MongoDB: {e}")
         return False
 
-def run_complete_etl():
-    """Ejecuta el pipeline ETL completo."""
+def env_int(name):
+    """Lee una variable de entorno entera (None si no está definida o está vacía)."""
+    value = os.getenv(name)
+    return int(value) if value else None
+
+def parse_args(argv=None):
+    """
+    Opciones del pipeline. Cada una puede venir de la línea de comandos o
+    de su variable de entorno (.env); la línea de comandos tiene prioridad.
+    """
+    parser = argparse.ArgumentParser(description="Pipeline ETL completo RAW -> ODS -> DRV")
+    parser.add_argument("--ttl-days", type=int, default=env_int("ODS_TTL_DAYS"),
+                        help="Layout bucketed: días tras el inicio del mes en que MongoDB "
+                             "elimina cada bucket (ODS_TTL_DAYS)")
+    parser.add_argument("--archive-months", type=int, default=env_int("ODS_ARCHIVE_MONTHS"),
+                        help="Layout bucketed: meses que se conservan en MongoDB; los "
+                             "anteriores se archivan en Parquet (ODS_ARCHIVE_MONTHS)")
+    parser.add_argument("--window-days", type=int, default=env_int("KPI_WINDOW_DAYS"),
+                        help="Días recientes para los KPIs de situación actual "
+                             "(KPI_WINDOW_DAYS; por defecto todo el histórico)")
+    return parser.parse_args(argv)
+
+def run_complete_etl(ttl_days=None, archive_months=None, window_days=None):
+    """
+    Ejecuta el pipeline ETL completo.
+    
+    Args:
+        ttl_days: TTL de los buckets ODS en días (sólo layout bucketed)
+        archive_months: Meses de buckets que se conservan en MongoDB (sólo layout bucketed)
+        window_days: Ventana en días de los KPIs de situación actual
+    """
     
     print("=" * 70)
     print(" PIPELINE ETL COMPLETO - Smart Shopping")
@@ -47,6 +77,12 @@ def run_complete_etl():
     
     # 1. Obtener configuración
     mongo_uri = get_mongo_connection_string()
+    ods_layout = os.getenv("ODS_LAYOUT", "denormalized")
+    print(f"[CONFIG] Layout ODS: {ods_layout}")
+    if ttl_days or archive_months:
+        print(f"[CONFIG] TTL buckets: {ttl_days or '-'} días | Archivado: {archive_months or '-'} meses")
+    if window_days:
+        print(f"[CONFIG] Ventana de KPIs: {window_days} días")
     
     # 2. Verificar Conexión
     if not check_mongodb_connection(mongo_uri):
@@ -73,7 +109,8 @@ def run_complete_etl():
         print("#" * 70)
         print("# CAPA 2: ODS/CMD")
         print("#" * 70)
-        etl2 = ETL_Layer2_ODS(mongo_uri)
+        etl2 = ETL_Layer2_ODS(mongo_uri, layout=ods_layout,
+                              ttl_days=ttl_days, archive_months=archive_months)
         count2 = etl2.run_etl_layer2()
         
         if count2 == 0:
@@ -86,7 +123,7 @@ def run_complete_etl():
         print("#" * 70)
         print("# CAPA 3: DRV/EXP")
         print("#" * 70)
-        etl3 = ETL_Layer3_DRV(mongo_uri)
+        etl3 = ETL_Layer3_DRV(mongo_uri, ods_layout=ods_layout, window_days=window_days)
         count3 = etl3.run_etl_layer3()
         
         # RESUMEN FINAL
@@ -114,5 +151,6 @@ def run_complete_etl():
         return False
 
 if __name__ == "__main__":
-    success = run_complete_etl()
+    args = parse_args()
+    success = run_complete_etl(args.ttl_days, args.archive_months, args.window_days)
     sys.exit(0 if success else 1)
@@ -0,0 +1,98 @@
+# ==============================================================
+# Benchmark de la carga de estudiantes desde CSV
+# ==============================================================
+# Genera unos CSV sintéticos con el mismo formato que 'estudiantes.csv'
+# y 'notas.csv' y mide:
+# - la carga en bloque de GestorEstudiantes.cargar_desde_csv con todos
+#   los estudiantes,
+# - la carga antigua (iterrows + filtrar todas las notas para cada
+#   estudiante) con una muestra, porque su coste crece con
+#   estudiantes x notas, y comprueba que las dos dan el mismo resultado.
+#
+# Uso:
+#     python benchmark_carga.py [estudiantes] [muestra_antigua]
+# ==============================================================
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from gestion_estudiantes_jcendguz import Estudiante, GestorEstudiantes
+
+
+def generar_csv(directorio, n_estudiantes, semilla=0):
+    """
+    Escribe estudiantes.csv y notas.csv con n_estudiantes y entre 3 y 6 notas
+    (con un decimal) por estudiante. Devuelve las dos rutas.
+    """
+    rng = np.random.default_rng(semilla)
+    ids = np.arange(1, n_estudiantes + 1)
+    num_notas = rng.integers(3, 7, size=n_estudiantes)
+    ids_notas = np.repeat(ids, num_notas)
+    notas = np.round(rng.uniform(0, 10, size=len(ids_notas)), 1)
+
+    df_notas = pd.DataFrame({'id_estudiante': ids_notas, 'nota': notas})
+    promedios = df_notas.groupby('id_estudiante', sort=False)['nota'].mean().round(2).to_numpy()
+    df_estudiantes = pd.DataFrame({
+        'id': ids,
+        'nombre': [f"Estudiante {i}" for i in ids],
+        'promedio': promedios,
+        'estado': np.where(promedios >= 5, 'Aprobado', 'Suspenso'),
+    })
+
+    ruta_estudiantes = os.path.join(directorio, "estudiantes.csv")
+    ruta_notas = os.path.join(directorio, "notas.csv")
+    df_estudiantes.to_csv(ruta_estudiantes, index=False)
+    df_notas.to_csv(ruta_notas, index=False)
+    return ruta_estudiantes, ruta_notas
+
+
+def cargar_por_filas(ruta_estudiantes, ruta_notas):
+    """Versión anterior de cargar_desde_csv, como referencia."""
+    df_estudiante = pd.read_csv(ruta_estudiantes)
+    df_notas = pd.read_csv(ruta_notas)
+    estudiantes = []
+    for _, row in df_estudiante.iterrows():
+        id_estudiante = int(row['id'])
+        notas_estudiante = [float(nota) for nota in df_notas[df_notas['id_estudiante'] == id_estudiante]['nota'].tolist()]
+        estudiantes.append(Estudiante(row['nombre'], notas_estudiante, id_estudiante))
+    return estudiantes
+
+
+def medir(funcion, *args):
+    """Devuelve (segundos, resultado)."""
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return time.perf_counter() - inicio, resultado
+
+
+def mismos_estudiantes(a, b):
+    return [(e.id, e.to_dict()) for e in a] == [(e.id, e.to_dict()) for e in b]
+
+
+def main():
+    n_estudiantes = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    muestra = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+
+    with tempfile.TemporaryDirectory() as directorio:
+        print(f"Generando {n_estudiantes} estudiantes...")
+        rutas = generar_csv(directorio, n_estudiantes)
+        t_bloque, gestor = medir(GestorEstudiantes, *rutas)
+        print(f"Carga en bloque: {n_estudiantes} estudiantes en {t_bloque:.3f} s "
+              f"({t_bloque / n_estudiantes * 1e6:.1f} us/estudiante)")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        rutas = generar_csv(directorio, muestra)
+        t_filas, antiguos = medir(cargar_por_filas, *rutas)
+        t_bloque_muestra, gestor = medir(GestorEstudiantes, *rutas)
+        igual = mismos_estudiantes(antiguos, gestor.estudiantes)
+        print(f"\nMuestra de {muestra} estudiantes:")
+        print(f"  Por filas: {t_filas:.3f} s | En bloque: {t_bloque_muestra:.3f} s | "
+              f"Speedup: {t_filas / t_bloque_muestra:.1f}x | Mismo resultado: {'si' if igual else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# ==============================================================
+# Benchmark de los backends de persistencia de GestorEstudiantes
+# ==============================================================
+# Para cada backend (CSV + registro, instantánea binaria, SQLite) mide,
+# con unos CSV sintéticos de benchmark_carga:
+# - carga en frío: crear el GestorEstudiantes desde lo guardado,
+# - cambio individual: actualizar_notas de un estudiante (tiempo medio),
+# - alta masiva: registrar estudiantes nuevos uno a uno dentro de en_lote()
+#   y con registrar_lote,
+# y comprueba que al volver a cargar se obtiene lo mismo.
+#
+# Uso:
+#     python benchmark_persistencia.py [estudiantes] [cambios] [altas]
+# ==============================================================
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from benchmark_carga import generar_csv, mismos_estudiantes
+from gestion_estudiantes_jcendguz import (GestorEstudiantes, PersistenciaBinaria, PersistenciaCSV,
+                                          PersistenciaSQLite)
+
+
+def crear_persistencia(tipo, directorio, rutas):
+    if tipo == 'csv':
+        return PersistenciaCSV(*rutas)
+    if tipo == 'binaria':
+        return PersistenciaBinaria(os.path.join(directorio, "estudiantes.bin"))
+    return PersistenciaSQLite(os.path.join(directorio, "estudiantes.db"))
+
+
+def medir_backend(tipo, n_estudiantes, n_cambios, n_altas):
+    with tempfile.TemporaryDirectory() as directorio:
+        rutas = generar_csv(directorio, n_estudiantes)
+
+        #Importar los CSV y guardarlos con el backend
+        gestor = GestorEstudiantes(*rutas, persistencia=crear_persistencia(tipo, directorio, rutas))
+        if tipo != 'csv':
+            gestor.cargar_desde_csv()
+            gestor.compactar()
+        gestor.cerrar()
+
+        inicio = time.perf_counter()
+        gestor = GestorEstudiantes(*rutas, persistencia=crear_persistencia(tipo, directorio, rutas))
+        t_carga = time.perf_counter() - inicio
+
+        nombres = [f"Estudiante {i}" for i in range(1, n_cambios + 1)]
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for nombre in nombres:
+                gestor.actualizar_notas(nombre, [5.5, 6.5, 7.5])
+        t_cambio = (time.perf_counter() - inicio) / n_cambios
+
+        inicio = time.perf_counter()
+        with gestor.en_lote():
+            for i in range(n_altas):
+                gestor.registrar_estudiante(f"Nuevo {i}", [4.0, 6.0, 8.5])
+        t_altas = time.perf_counter() - inicio
+
+        cohorte = [(f"Cohorte {i}", [4.0, 6.0, 8.5]) for i in range(n_altas)]
+        inicio = time.perf_counter()
+        gestor.registrar_lote(cohorte)
+        t_lote = time.perf_counter() - inicio
+
+        esperados = gestor.estudiantes
+        gestor.cerrar()
+        recargado = GestorEstudiantes(*rutas, persistencia=crear_persistencia(tipo, directorio, rutas))
+        igual = mismos_estudiantes(esperados, recargado.estudiantes)
+        recargado.cerrar()
+        return t_carga, t_cambio, t_altas, t_lote, igual
+
+
+def main():
+    n_estudiantes = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_cambios = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    n_altas = int(sys.argv[3]) if len(sys.argv) > 3 else 10_000
+
+    print(f"{n_estudiantes} estudiantes, {n_cambios} cambios individuales, {n_altas} altas en lote\n")
+    print(f"{'Backend':10}{'Carga (s)':>12}{'Cambio (ms)':>14}{'Altas (s)':>12}{'Lote (s)':>11}  Recarga igual")
+    for tipo in ('csv', 'binaria', 'sqlite'):
+        t_carga, t_cambio, t_altas, t_lote, igual = medir_backend(tipo, n_estudiantes, n_cambios, n_altas)
+        print(f"{tipo:10}{t_carga:12.3f}{t_cambio * 1000:14.3f}{t_altas:12.3f}{t_lote:11.3f}  {'si' if igual else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
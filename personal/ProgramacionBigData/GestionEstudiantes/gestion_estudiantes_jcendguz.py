@@ -7,9 +7,16 @@
 # --------------------------------------------------------------
 # Clase Estudiante
 # --------------------------------------------------------------
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from itertools import repeat
 from typing import List
+import numpy as np
 import pandas as pd
+import json
+import math
 import os
+import sqlite3
 
 #Se crean las clases propias de excepciones que se van a usar
 class  InvalidatedNotasError(Exception):
@@ -25,9 +32,10 @@ class EstudianteNotFound(Exception):
 class Estudiante:
     """
     Representa a un estudiante con nombre, notas, promedio y estado.
-    El identificador (id) es gestionado externamente por el GestorEstudiantes.
+    El identificador (id) lo asigna el GestorEstudiantes y se guarda en el propio
+    objeto, así no cambia aunque se borren otros estudiantes.
     """
-    def __init__(self, nombre:str, notas:List[float]):
+    def __init__(self, nombre:str, notas:List[float], id_estudiante:int=None):
         """
         TODO: Inicializar el estudiante con su nombre y lista de notas (float).
         El id será asignado externamente por el gestor de estudiantes.
@@ -38,6 +46,7 @@ class Estudiante:
             raise ValueError("El nombre no puede ser una cadena vacía o nula")
         #Si tenemos notas validas
         if (self._validar_notas(notas)):
+            self.id = id_estudiante
             self.__nombre = nombre
             self.__notas = notas
             self.__promedio = self.calcular_promedio()
@@ -104,6 +113,12 @@ class Estudiante:
         self.__promedio = self.calcular_promedio()
         self.__estado = self.determinar_estado()
 
+    def get_nombre(self):
+        """
+        Getter para obtener el nombre del estudiante.
+        """
+        return self.__nombre
+
     def get_notas(self):
         """
         Getter para obtener las notas del estudiante.
@@ -124,8 +139,7 @@ class Estudiante:
         'nombre', 'promedio' y 'estado'.
 
         Nota:
-            El 'id' se gestiona externamente desde la clase GestorEstudiantes
-            y se añadirá al momento de guardar o mostrar la información en CSV.
+            El 'id' está en el atributo id (lo asigna GestorEstudiantes).
             Las notas se guardan por separado en 'notas.csv'.
         """
         return {
@@ -175,23 +189,904 @@ class Estudiante:
 
         return notas
 # --------------------------------------------------------------
+# Almacén columnar de estudiantes
+# --------------------------------------------------------------
+#Texto del estado según si está aprobado (igual que Estudiante.determinar_estado)
+ESTADOS = ("Suspenso", "Aprobado")
+
+
+def indices_de_tramos(inicios, longitudes):
+    """
+    Posiciones de todos los tramos [inicio, inicio + longitud) seguidas, sin bucles
+    de Python: sirve para copiar las notas de varios estudiantes de una vez.
+    """
+    longitudes = np.asarray(longitudes, dtype=np.int64)
+    desplazamientos = np.cumsum(longitudes) - longitudes
+    return np.repeat(np.asarray(inicios, dtype=np.int64) - desplazamientos, longitudes) + np.arange(longitudes.sum())
+
+
+def promedios_por_tramos(notas, inicios, longitudes):
+    """
+    Promedio de cada tramo de notas. Se suma nota a nota en el mismo orden que
+    sum(), así el promedio es exactamente el de Estudiante.calcular_promedio.
+    """
+    sumas = np.zeros(len(inicios))
+    for k in range(int(np.max(longitudes, initial=0))):
+        tiene = longitudes > k
+        sumas[tiene] += notas[inicios[tiene] + k]
+    return sumas / longitudes
+
+
+def centesimas(promedios):
+    """Suma de los promedios redondeados a 2 decimales (como en to_dict), en centésimas enteras."""
+    return sum(round(round(promedio, 2) * 100) for promedio in promedios)
+
+
+class IndicePromedios:
+    """
+    Índice secundario por promedio: para cada estado, una lista de pares
+    (promedio, id) ordenada, que se mantiene con bisect en cada alta, cambio
+    de notas y baja. Como el estado solo depende del promedio (Aprobado si
+    >= 5), todos los Suspenso van antes que los Aprobado y las dos listas
+    seguidas dan el orden de todo el grupo. Así las consultas por rango, los
+    k mejores y los percentiles cuestan O(log n + k) con o sin filtro de estado.
+    Los promedios son los exactos, sin redondear a 2 decimales.
+    """
+    #A partir de cuántos pares un lote se mezcla reordenando la lista entera
+    UMBRAL_LOTE = 64
+
+    def __init__(self):
+        self.listas = {estado: [] for estado in ESTADOS}
+
+    def __len__(self):
+        return sum(len(lista) for lista in self.listas.values())
+
+    def _por_estado(self, pares):
+        grupos = {estado: [] for estado in ESTADOS}
+        for promedio, id_estudiante in pares:
+            grupos[ESTADOS[promedio >= 5]].append((promedio, id_estudiante))
+        return grupos
+
+    def agregar(self, promedios, ids):
+        """Añade los pares (promedio, id). Un lote grande se mezcla de una vez."""
+        for estado, nuevos in self._por_estado(zip(promedios, ids)).items():
+            lista = self.listas[estado]
+            if len(nuevos) > self.UMBRAL_LOTE:
+                #sort detecta los dos tramos ya ordenados y los mezcla en O(n)
+                nuevos.sort()
+                lista.extend(nuevos)
+                lista.sort()
+            else:
+                for par in nuevos:
+                    insort(lista, par)
+
+    def quitar(self, promedios, ids):
+        """Quita los pares (promedio, id), que tienen que estar en el índice."""
+        for estado, viejos in self._por_estado(zip(promedios, ids)).items():
+            lista = self.listas[estado]
+            if len(viejos) > self.UMBRAL_LOTE:
+                viejos = set(viejos)
+                lista[:] = [par for par in lista if par not in viejos]
+            else:
+                for par in viejos:
+                    del lista[bisect_left(lista, par)]
+
+    def _listas(self, estado):
+        """Listas en las que buscar, de menor a mayor promedio."""
+        if estado is None:
+            return [self.listas[ESTADOS[0]], self.listas[ESTADOS[1]]]
+        if estado not in ESTADOS:
+            raise ValueError(f"El estado {estado} no es válido, debe ser uno de {ESTADOS}")
+        return [self.listas[estado]]
+
+    def rango(self, minimo, maximo, estado=None):
+        """Pares con minimo <= promedio <= maximo, de menor a mayor promedio."""
+        resultado = []
+        for lista in self._listas(estado):
+            desde = bisect_left(lista, (minimo, -math.inf))
+            hasta = bisect_right(lista, (maximo, math.inf))
+            resultado.extend(lista[desde:hasta])
+        return resultado
+
+    def extremos(self, k, estado=None, mejores=True):
+        """
+        Los k pares con mayor promedio (de mayor a menor) o, con mejores=False,
+        con menor promedio (de menor a mayor).
+        """
+        listas = self._listas(estado)
+        resultado = []
+        for lista in (reversed(listas) if mejores else listas):
+            falta = k - len(resultado)
+            if falta <= 0:
+                break
+            resultado.extend(lista[:-falta - 1:-1] if mejores else lista[:falta])
+        return resultado
+
+    def posicion(self, posicion, estado=None):
+        """Par en esa posición (desde 0) del orden de menor a mayor promedio."""
+        for lista in self._listas(estado):
+            if posicion < len(lista):
+                return lista[posicion]
+            posicion -= len(lista)
+        raise IndexError("Posición fuera del índice")
+
+    def percentil(self, q, estado=None):
+        """
+        Par del percentil q (entre 0 y 1) por rango más cercano: el que ocupa la
+        posición ceil(q * n) del orden de menor a mayor (el primero si q es 0).
+        None si no hay estudiantes.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f"El percentil {q} debe estar entre 0 y 1")
+        n = sum(len(lista) for lista in self._listas(estado))
+        if n == 0:
+            return None
+        return self.posicion(max(math.ceil(q * n), 1) - 1, estado)
+
+
+class AlmacenEstudiantes:
+    """
+    Guarda los estudiantes por columnas en arrays de numpy, una fila por estudiante:
+    - ids, promedios (float64) y aprobados (bool),
+    - las notas de todos en un único array plano, con el inicio y el número
+      de notas de cada fila (formato CSR),
+    - nombres en una lista.
+    _filas traduce id -> fila. Las bajas solo marcan la fila como inactiva y,
+    cuando hay tantas filas o notas sin usar como usadas, se compacta.
+    El número de estudiantes, de aprobados y la suma de promedios se actualizan
+    en cada cambio, así las estadísticas del grupo no recorren nada, y lo mismo
+    el índice de promedios por estado (IndicePromedios) para las consultas por
+    rango, los mejores y los percentiles.
+
+    Las notas se guardan en float64 y no en float32: con float32 una nota como
+    4.8 se leería como 4.800000190734863 y el promedio podría cambiar de estado
+    justo en el 5.
+    """
+    CAPACIDAD_INICIAL = 1024
+
+    def __init__(self):
+        capacidad = self.CAPACIDAD_INICIAL
+        self.ids = np.empty(capacidad, dtype=np.int64)
+        self.promedios = np.empty(capacidad, dtype=np.float64)
+        self.aprobados = np.zeros(capacidad, dtype=bool)
+        self.activos = np.zeros(capacidad, dtype=bool)
+        self.inicio_notas = np.empty(capacidad, dtype=np.int64)
+        self.num_notas = np.empty(capacidad, dtype=np.int64)
+        self.nombres = []
+        self.notas = np.empty(capacidad * 4, dtype=np.float64)
+        self._filas = {}
+        #Filas y posiciones de notas ocupadas (incluidas las que ya no se usan)
+        self._n_filas = 0
+        self._n_notas = 0
+        self._filas_borradas = 0
+        self._notas_sin_usar = 0
+        #Estadísticas del grupo
+        self.n_aprobados = 0
+        self.suma_centesimas = 0
+        self.indice = IndicePromedios()
+
+    def __len__(self):
+        return len(self._filas)
+
+    def __contains__(self, id_estudiante):
+        return id_estudiante in self._filas
+
+    @staticmethod
+    def _ampliar(array, minimo):
+        """Devuelve el array con capacidad para al menos minimo elementos (doblando el tamaño)."""
+        if len(array) >= minimo:
+            return array
+        nuevo = np.zeros(max(minimo, 2 * len(array)), dtype=array.dtype)
+        nuevo[:len(array)] = array
+        return nuevo
+
+    def _reservar(self, filas, notas):
+        """Se asegura de que caben filas estudiantes y notas notas más."""
+        minimo = self._n_filas + filas
+        for columna in ('ids', 'promedios', 'aprobados', 'activos', 'inicio_notas', 'num_notas'):
+            setattr(self, columna, self._ampliar(getattr(self, columna), minimo))
+        self.notas = self._ampliar(self.notas, self._n_notas + notas)
+
+    def _sumar_estadisticas(self, filas, signo):
+        promedios, ids = self.promedios[filas].tolist(), self.ids[filas].tolist()
+        self.n_aprobados += signo * int(self.aprobados[filas].sum())
+        self.suma_centesimas += signo * centesimas(promedios)
+        if signo > 0:
+            self.indice.agregar(promedios, ids)
+        else:
+            self.indice.quitar(promedios, ids)
+
+    def fila(self, id_estudiante):
+        """Fila del estudiante (KeyError si no existe)."""
+        return self._filas[id_estudiante]
+
+    def filas_activas(self):
+        """Filas de los estudiantes que no se han dado de baja, en orden de alta."""
+        return np.flatnonzero(self.activos[:self._n_filas])
+
+    def notas_de(self, fila):
+        inicio = self.inicio_notas[fila]
+        return self.notas[inicio:inicio + self.num_notas[fila]].tolist()
+
+    def agregar_lote(self, ids, nombres, notas, longitudes):
+        """
+        Añade varios estudiantes ya validados. notas tiene las notas de todos
+        seguidas, en el orden de ids, y longitudes cuántas son de cada uno.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        notas = np.asarray(notas, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.int64)
+        lista_ids = ids.tolist()
+        if len(set(lista_ids)) != len(lista_ids) or any(i in self._filas for i in lista_ids):
+            raise ValueError("Hay ids de estudiante repetidos")
+
+        self._reservar(len(ids), len(notas))
+        primera, ultima = self._n_filas, self._n_filas + len(ids)
+        inicios = self._n_notas + np.cumsum(longitudes) - longitudes
+        self.notas[self._n_notas:self._n_notas + len(notas)] = notas
+        self._n_notas += len(notas)
+
+        self.ids[primera:ultima] = ids
+        self.inicio_notas[primera:ultima] = inicios
+        self.num_notas[primera:ultima] = longitudes
+        self.promedios[primera:ultima] = promedios_por_tramos(self.notas, inicios, longitudes)
+        self.aprobados[primera:ultima] = self.promedios[primera:ultima] >= 5
+        self.activos[primera:ultima] = True
+        self.nombres.extend(nombres)
+        self._filas.update(zip(lista_ids, range(primera, ultima)))
+        self._n_filas = ultima
+        self._sumar_estadisticas(slice(primera, ultima), 1)
+
+    def agregar(self, id_estudiante, nombre, notas):
+        self.agregar_lote([id_estudiante], [nombre], notas, [len(notas)])
+
+    def actualizar_notas(self, id_estudiante, notas):
+        """
+        Sustituye las notas de un estudiante ya validadas. Si caben en su tramo se
+        escriben encima; si no, se añaden al final del array de notas.
+        """
+        fila = self._filas[id_estudiante]
+        self._sumar_estadisticas([fila], -1)
+        anteriores = int(self.num_notas[fila])
+        if len(notas) <= anteriores:
+            inicio = int(self.inicio_notas[fila])
+            self._notas_sin_usar += anteriores - len(notas)
+        else:
+            self._reservar(0, len(notas))
+            inicio = self._n_notas
+            self._n_notas += len(notas)
+            self._notas_sin_usar += anteriores
+        self.notas[inicio:inicio + len(notas)] = notas
+        self.inicio_notas[fila] = inicio
+        self.num_notas[fila] = len(notas)
+        self.promedios[fila] = sum(notas) / len(notas)
+        self.aprobados[fila] = self.promedios[fila] >= 5
+        self._sumar_estadisticas([fila], 1)
+        self._compactar_si_hace_falta()
+
+    def actualizar_notas_lote(self, ids, notas, longitudes):
+        """
+        Sustituye las notas de varios estudiantes (ya validadas) de una vez: las
+        nuevas notas se añaden al final del array y se recalculan los promedios
+        de todas las filas juntas. Si un id sale varias veces se queda la última,
+        como si se aplicaran en orden.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        longitudes = np.asarray(longitudes, dtype=np.int64)
+        inicios = np.cumsum(longitudes) - longitudes
+        ultimas = len(ids) - 1 - np.unique(ids[::-1], return_index=True)[1]
+        ultimas.sort()
+        ids, inicios, longitudes = ids[ultimas], inicios[ultimas], longitudes[ultimas]
+
+        filas = np.array([self._filas[i] for i in ids.tolist()], dtype=np.int64)
+        self._sumar_estadisticas(filas, -1)
+        self._notas_sin_usar += int(self.num_notas[filas].sum())
+        nuevas = np.asarray(notas, dtype=np.float64)[indices_de_tramos(inicios, longitudes)]
+        self._reservar(0, len(nuevas))
+        self.notas[self._n_notas:self._n_notas + len(nuevas)] = nuevas
+        self.inicio_notas[filas] = self._n_notas + np.cumsum(longitudes) - longitudes
+        self.num_notas[filas] = longitudes
+        self._n_notas += len(nuevas)
+        self.promedios[filas] = promedios_por_tramos(self.notas, self.inicio_notas[filas], longitudes)
+        self.aprobados[filas] = self.promedios[filas] >= 5
+        self._sumar_estadisticas(filas, 1)
+        self._compactar_si_hace_falta()
+
+    def eliminar(self, id_estudiante):
+        """Da de baja al estudiante y devuelve su nombre."""
+        fila = self._filas.pop(id_estudiante)
+        self._sumar_estadisticas([fila], -1)
+        self.activos[fila] = False
+        nombre = self.nombres[fila]
+        self.nombres[fila] = None
+        self._filas_borradas += 1
+        self._notas_sin_usar += int(self.num_notas[fila])
+        self._compactar_si_hace_falta()
+        return nombre
+
+    def _compactar_si_hace_falta(self):
+        if (self._filas_borradas > max(self.CAPACIDAD_INICIAL, len(self))
+                or self._notas_sin_usar > max(self.CAPACIDAD_INICIAL, self._n_notas - self._notas_sin_usar)):
+            self.compactar()
+
+    def compactar(self):
+        """Quita las filas dadas de baja y las notas sin usar, conservando el orden."""
+        filas = self.filas_activas()
+        longitudes = self.num_notas[filas]
+        notas = self.notas[indices_de_tramos(self.inicio_notas[filas], longitudes)]
+        columnas = {columna: getattr(self, columna)[filas].copy()
+                    for columna in ('ids', 'promedios', 'aprobados', 'activos', 'num_notas')}
+        nombres = [self.nombres[fila] for fila in filas.tolist()]
+        #El índice va por id, no por fila: no cambia al compactar
+        indice = self.indice
+
+        self.__init__()
+        self._reservar(len(filas), len(notas))
+        for columna, valores in columnas.items():
+            getattr(self, columna)[:len(filas)] = valores
+        self.inicio_notas[:len(filas)] = np.cumsum(longitudes) - longitudes
+        self.notas[:len(notas)] = notas
+        self.nombres = nombres
+        self._filas = dict(zip(columnas['ids'].tolist(), range(len(filas))))
+        self._n_filas, self._n_notas = len(filas), len(notas)
+        self.n_aprobados = int(columnas['aprobados'].sum())
+        self.suma_centesimas = centesimas(columnas['promedios'].tolist())
+        self.indice = indice
+
+    def promedio_general(self):
+        """Media de los promedios redondeados a 2 decimales (0 si no hay estudiantes)."""
+        return round(self.suma_centesimas / 100 / len(self), 2) if len(self) else 0.0
+
+    def contar_por_estado(self):
+        return {'Aprobado': self.n_aprobados, 'Suspenso': len(self) - self.n_aprobados}
+
+    def ids_en_rango(self, minimo, maximo, estado=None):
+        return [id_estudiante for _, id_estudiante in self.indice.rango(minimo, maximo, estado)]
+
+    def ids_extremos(self, k, estado=None, mejores=True):
+        return [id_estudiante for _, id_estudiante in self.indice.extremos(k, estado, mejores)]
+
+    def a_dataframes(self):
+        """DataFrames de estudiantes (id, nombre, promedio, estado) y notas (id_estudiante, nota)."""
+        filas = self.filas_activas()
+        ids = self.ids[filas]
+        longitudes = self.num_notas[filas]
+        df_estudiantes = pd.DataFrame({
+            'id': ids,
+            'nombre': [self.nombres[fila] for fila in filas.tolist()],
+            'promedio': [round(promedio, 2) for promedio in self.promedios[filas].tolist()],
+            'estado': np.where(self.aprobados[filas], ESTADOS[1], ESTADOS[0]),
+        }, columns=['id', 'nombre', 'promedio', 'estado'])
+        df_notas = pd.DataFrame({
+            'id_estudiante': np.repeat(ids, longitudes),
+            'nota': self.notas[indices_de_tramos(self.inicio_notas[filas], longitudes)],
+        }, columns=['id_estudiante', 'nota'])
+        return df_estudiantes, df_notas
+
+
+class VistaEstudiante:
+    """
+    Vista de un estudiante del almacén con la misma interfaz de lectura que
+    Estudiante (id, get_nombre, get_notas, to_dict, __str__). No copia nada:
+    lee del almacén cada vez a partir del id, así sigue siendo válida aunque
+    el almacén se compacte.
+    """
+    __slots__ = ('_almacen', 'id')
+
+    def __init__(self, almacen:AlmacenEstudiantes, id_estudiante:int):
+        self._almacen = almacen
+        self.id = id_estudiante
+
+    def _fila(self):
+        try:
+            return self._almacen.fila(self.id)
+        except KeyError:
+            raise EstudianteNotFound(f"El estudiante {self.id} ya no existe")
+
+    def get_nombre(self):
+        return self._almacen.nombres[self._fila()]
+
+    def get_notas(self):
+        return self._almacen.notas_de(self._fila())
+
+    def get_promedio(self):
+        return float(self._almacen.promedios[self._fila()])
+
+    def get_estado(self):
+        return ESTADOS[bool(self._almacen.aprobados[self._fila()])]
+
+    def to_dict(self):
+        return {
+            "nombre": self.get_nombre(),
+            "notas": self.get_notas(),
+            "promedio": round(self.get_promedio(), 2),
+            "estado": self.get_estado()
+        }
+
+    def __str__(self):
+        return f"Nombre: {self.get_nombre()} | Promedio: {self.get_promedio():.2f} | Estado: {self.get_estado()}"
+# --------------------------------------------------------------
+# Validación de lotes
+# --------------------------------------------------------------
+def aplanar_listas_notas(listas):
+    """
+    Junta las listas de notas de un lote en un único array.
+    Devuelve (notas float64, nº de notas por fila, es_lista por fila, es_float por nota);
+    las notas que no son float quedan como NaN.
+    """
+    listas = list(listas)
+    es_lista = np.fromiter((isinstance(notas, list) for notas in listas), dtype=bool, count=len(listas))
+    longitudes = np.fromiter((len(notas) if ok else 0 for notas, ok in zip(listas, es_lista)),
+                             dtype=np.int64, count=len(listas))
+    planas = [nota for notas, ok in zip(listas, es_lista) if ok for nota in notas]
+    es_float = np.fromiter(map(isinstance, planas, repeat(float)), dtype=bool, count=len(planas))
+    if es_float.all():
+        notas = np.array(planas, dtype=np.float64)
+    else:
+        notas = np.array([nota if ok else np.nan for nota, ok in zip(planas, es_float)], dtype=np.float64)
+    return notas, longitudes, es_lista, es_float
+
+
+def agrupar_notas(claves, claves_notas, notas):
+    """
+    Notas en formato largo (una fila por nota, como notas.csv) agrupadas según
+    claves, ordenando una vez como en columnas_desde_dataframes. Las notas no
+    numéricas quedan como NaN y no son válidas.
+    Devuelve lo mismo que aplanar_listas_notas.
+    """
+    claves = np.asarray(claves)
+    claves_notas = np.asarray(claves_notas)
+    notas = pd.to_numeric(pd.Series(notas), errors='coerce').to_numpy(dtype=np.float64)
+    orden = np.argsort(claves_notas, kind='stable')
+    claves_ordenadas = claves_notas[orden]
+    inicios = np.searchsorted(claves_ordenadas, claves, side='left')
+    longitudes = np.searchsorted(claves_ordenadas, claves, side='right') - inicios
+    notas = notas[orden][indices_de_tramos(inicios, longitudes)]
+    return notas, longitudes, np.ones(len(claves), dtype=bool), ~np.isnan(notas)
+
+
+def errores_de_notas(notas, longitudes, es_lista, es_float):
+    """
+    Valida las notas de todas las filas de una vez, con las reglas de
+    Estudiante._validar_notas (lista no vacía de float entre 0 y 10).
+    Devuelve el mensaje de error de cada fila, o None si es válida.
+    """
+    errores = [None] * len(longitudes)
+    fila_de_nota = np.repeat(np.arange(len(longitudes)), longitudes)
+    inicio_fila = np.cumsum(longitudes) - longitudes
+    posiciones = np.flatnonzero(~es_float | ~((notas >= 0) & (notas <= 10)))
+    #Solo se informa de la primera nota errónea de cada fila
+    filas, primeras = np.unique(fila_de_nota[posiciones], return_index=True)
+    for fila, posicion in zip(filas.tolist(), posiciones[primeras].tolist()):
+        if es_float[posicion]:
+            errores[fila] = f"La nota {notas[posicion]} debe estar entre 0 y 10"
+        else:
+            errores[fila] = f"La nota {posicion - inicio_fila[fila] + 1} debe ser de tipo float"
+    for fila in np.flatnonzero(~es_lista | (longitudes == 0)).tolist():
+        errores[fila] = "Deben tener notas asignadas"
+    return errores
+
+
+def notas_validas(notas, longitudes, validas):
+    """Notas y nº de notas solo de las filas válidas (máscara por fila)."""
+    return notas[np.repeat(validas, longitudes)], longitudes[validas]
+
+
+# --------------------------------------------------------------
+# Persistencia
+# --------------------------------------------------------------
+# Cada backend sabe:
+# - cargar(): devuelve (columnas, cambios). columnas es None o la tupla
+#   (ids, nombres, notas, longitudes) que acepta AlmacenEstudiantes.agregar_lote,
+#   y cambios los cambios pendientes que el gestor tiene que aplicar encima.
+# - guardar_cambios(cambios, almacen): guarda una lista de cambios ya aplicados
+#   al almacén ({'op': 'alta' | 'notas' | 'baja', 'id': ...}).
+# - guardar(almacen): guarda el estado completo.
+# - cerrar().
+
+def columnas_desde_dataframes(df_estudiante, df_notas):
+    """
+    Prepara todos los estudiantes de los dos CSV en una pasada:
+    - las notas se ordenan una vez por id_estudiante (orden estable, así cada
+      estudiante conserva el orden de sus notas en el fichero) y cada
+      estudiante toma su tramo con searchsorted, en lugar de filtrar todas
+      las notas para cada estudiante;
+    - los nombres y las notas se validan de golpe con numpy, con las mismas
+      reglas que Estudiante.
+    Las notas de ids que no están en estudiantes.csv se ignoran, como antes.
+    Devuelve (ids, nombres, notas de todos seguidas en el orden de ids, número de notas de cada uno).
+    """
+    ids = df_estudiante['id'].to_numpy(dtype=np.int64)
+    nombres = df_estudiante['nombre']
+
+    #Validamos los nombres
+    nombres_validos = (nombres.map(lambda nombre: isinstance(nombre, str))
+                       & nombres.astype(str).str.strip().ne("")).to_numpy(dtype=bool)
+    if not nombres_validos.all():
+        id_erroneo = ids[np.argmin(nombres_validos)]
+        raise ValueError(f"El nombre del estudiante {id_erroneo} no puede ser una cadena vacía o nula")
+
+    #Validamos las notas de los estudiantes que existen (las no numéricas pasan a NaN y no son válidas)
+    ids_notas = df_notas['id_estudiante'].to_numpy(dtype=np.int64)
+    notas = pd.to_numeric(df_notas['nota'], errors='coerce').to_numpy(dtype=np.float64)
+    invalidas = np.isin(ids_notas, ids) & ~((notas >= 0) & (notas <= 10))
+    if invalidas.any():
+        fila = np.argmax(invalidas)
+        raise InvalidatedNotasError(f"Error al crear el estudiante {ids_notas[fila]}: La nota "
+                                    f"{df_notas['nota'].iloc[fila]} debe ser un número entre 0 y 10")
+
+    #Agrupamos las notas por estudiante ordenando una sola vez
+    orden = np.argsort(ids_notas, kind='stable')
+    ids_ordenados = ids_notas[orden]
+    inicios = np.searchsorted(ids_ordenados, ids, side='left')
+    fines = np.searchsorted(ids_ordenados, ids, side='right')
+    sin_notas = inicios == fines
+    if sin_notas.any():
+        raise InvalidatedNotasError(f"El estudiante {ids[np.argmax(sin_notas)]} debe tener notas asignadas")
+
+    longitudes = fines - inicios
+    notas_estudiantes = notas[orden][indices_de_tramos(inicios, longitudes)]
+    return ids, nombres.tolist(), notas_estudiantes, longitudes
+
+
+def leer_csv_estudiantes(archivo_estudiantes, archivo_notas):
+    """Columnas de los dos CSV, o None si alguno no existe."""
+    if not os.path.exists(archivo_estudiantes) or not os.path.exists(archivo_notas):
+        # Si los archivos no existen, iniciar con lista vacía
+        print(f"Archivos CSV no encontrados. Se iniciará con lista vacía.")
+        return None
+    return columnas_desde_dataframes(pd.read_csv(archivo_estudiantes), pd.read_csv(archivo_notas))
+
+
+def escribir_csv_estudiantes(almacen, archivo_estudiantes, archivo_notas):
+    """
+    Escribe el almacén en los dos CSV. Cada fichero se escribe en uno temporal
+    y se sustituye con os.replace, para no dejar un CSV a medias.
+    """
+    df_estudiante, df_notas = almacen.a_dataframes()
+    for df, archivo in ((df_estudiante, archivo_estudiantes), (df_notas, archivo_notas)):
+        df.to_csv(archivo + ".tmp", index=False)
+        os.replace(archivo + ".tmp", archivo)
+
+
+class PersistenciaConRegistro:
+    """
+    Base de los backends de fichero: una instantánea con todo el estado más un
+    registro de cambios al que se añade una línea JSON por cambio.
+    Al cargar se lee la instantánea y se devuelven los cambios del registro.
+    Cuando el registro tiene tantas líneas como estudiantes hay (o
+    MIN_CAMBIOS_COMPACTAR), se compacta: se reescribe la instantánea y se vacía.
+    Así cada cambio cuesta una línea de escritura, y la reescritura completa se
+    reparte entre muchos cambios.
+    Las subclases implementan leer_instantanea() y escribir_instantanea(almacen).
+    """
+    #Mínimo de cambios en el registro antes de compactar
+    MIN_CAMBIOS_COMPACTAR = 1000
+
+    def __init__(self, archivo_cambios:str):
+        self.archivo_cambios = archivo_cambios
+        self._cambios_pendientes = 0
+
+    def cargar(self):
+        return self.leer_instantanea(), self._leer_cambios()
+
+    def _leer_cambios(self):
+        if not os.path.exists(self.archivo_cambios):
+            return
+        with open(self.archivo_cambios, "rb+") as f:
+            leidos = 0
+            for linea in f:
+                # Una última línea incompleta (escritura interrumpida) se descarta
+                if not linea.endswith(b"\n"):
+                    f.truncate(leidos)
+                    break
+                yield json.loads(linea)
+                self._cambios_pendientes += 1
+                leidos += len(linea)
+
+    def guardar_cambios(self, cambios, almacen):
+        """Añade los cambios al registro con una sola escritura y compacta si toca."""
+        with open(self.archivo_cambios, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(cambio, ensure_ascii=False) + "\n" for cambio in cambios))
+        self._cambios_pendientes += len(cambios)
+        if self._cambios_pendientes >= max(self.MIN_CAMBIOS_COMPACTAR, len(almacen)):
+            self.guardar(almacen)
+
+    def guardar(self, almacen):
+        """Reescribe la instantánea con el estado actual y vacía el registro de cambios."""
+        self.escribir_instantanea(almacen)
+        if os.path.exists(self.archivo_cambios):
+            os.remove(self.archivo_cambios)
+        self._cambios_pendientes = 0
+
+    def cerrar(self):
+        pass
+
+
+class PersistenciaCSV(PersistenciaConRegistro):
+    """
+    Instantánea en 'estudiantes.csv' y 'notas.csv'. Si no se indica
+    archivo_cambios, se usa '<archivo_estudiantes sin extensión>_cambios.log'.
+    """
+    def __init__(self, archivo_estudiantes:str, archivo_notas:str, archivo_cambios:str=None):
+        super().__init__(archivo_cambios or os.path.splitext(archivo_estudiantes)[0] + "_cambios.log")
+        self.archivo_estudiantes = archivo_estudiantes
+        self.archivo_notas = archivo_notas
+
+    def leer_instantanea(self):
+        return leer_csv_estudiantes(self.archivo_estudiantes, self.archivo_notas)
+
+    def escribir_instantanea(self, almacen):
+        escribir_csv_estudiantes(almacen, self.archivo_estudiantes, self.archivo_notas)
+
+
+class PersistenciaBinaria(PersistenciaConRegistro):
+    """
+    Instantánea binaria que se lee con np.memmap, sin parsear texto:
+    cabecera (MAGIA, versión, nº de estudiantes, nº de notas, bytes de nombres)
+    seguida de ids (int64), nº de notas de cada uno (int64), notas (float64)
+    y los nombres en UTF-8 separados por '\\0'.
+    Si no se indica archivo_cambios, se usa '<archivo sin extensión>_cambios.log'.
+    """
+    MAGIA = b"GEST"
+    VERSION = 1
+    CABECERA = np.dtype([('magia', 'S4'), ('version', '<u4'), ('n_estudiantes', '<i8'),
+                         ('n_notas', '<i8'), ('bytes_nombres', '<i8')])
+
+    def __init__(self, archivo:str, archivo_cambios:str=None):
+        super().__init__(archivo_cambios or os.path.splitext(archivo)[0] + "_cambios.log")
+        self.archivo = archivo
+
+    def leer_instantanea(self):
+        if not os.path.exists(self.archivo):
+            return None
+        cabecera = np.fromfile(self.archivo, dtype=self.CABECERA, count=1)[0]
+        if cabecera['magia'] != self.MAGIA or cabecera['version'] != self.VERSION:
+            raise ValueError(f"{self.archivo} no es una instantánea de estudiantes válida")
+        n, m = int(cabecera['n_estudiantes']), int(cabecera['n_notas'])
+
+        columnas = []
+        desplazamiento = self.CABECERA.itemsize
+        for tipo, cantidad in ((np.int64, n), (np.int64, n), (np.float64, m), (np.uint8, int(cabecera['bytes_nombres']))):
+            if cantidad:
+                columnas.append(np.memmap(self.archivo, dtype=tipo, mode='r', offset=desplazamiento, shape=(cantidad,)))
+            else:
+                columnas.append(np.empty(0, dtype=tipo))
+            desplazamiento += cantidad * np.dtype(tipo).itemsize
+        ids, longitudes, notas, nombres = columnas
+        nombres = nombres.tobytes().decode("utf-8").split("\0") if n else []
+        return ids, nombres, notas, longitudes
+
+    def escribir_instantanea(self, almacen):
+        filas = almacen.filas_activas()
+        longitudes = almacen.num_notas[filas]
+        notas = almacen.notas[indices_de_tramos(almacen.inicio_notas[filas], longitudes)]
+        nombres = "\0".join(almacen.nombres[fila] for fila in filas.tolist()).encode("utf-8")
+        cabecera = np.array([(self.MAGIA, self.VERSION, len(filas), len(notas), len(nombres))], dtype=self.CABECERA)
+
+        with open(self.archivo + ".tmp", "wb") as f:
+            for array in (cabecera, almacen.ids[filas], longitudes, notas):
+                f.write(array.tobytes())
+            f.write(nombres)
+        os.replace(self.archivo + ".tmp", self.archivo)
+
+
+class PersistenciaSQLite:
+    """
+    Base de datos SQLite con una tabla de estudiantes y otra de notas
+    (clave primaria (id_estudiante, posicion), así las notas de un estudiante
+    están juntas y en orden), en modo WAL. Cada llamada a guardar_cambios es
+    una única transacción, tenga uno o muchos cambios.
+    """
+    def __init__(self, archivo_bd:str):
+        self.archivo_bd = archivo_bd
+        self.conexion = sqlite3.connect(archivo_bd)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        #Con WAL, NORMAL no pierde la consistencia ante un corte, solo las últimas transacciones
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        with self.conexion:
+            self.conexion.executescript("""
+                CREATE TABLE IF NOT EXISTS estudiantes (
+                    id INTEGER PRIMARY KEY,
+                    nombre TEXT NOT NULL,
+                    promedio REAL NOT NULL,
+                    estado TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS notas (
+                    id_estudiante INTEGER NOT NULL REFERENCES estudiantes(id),
+                    posicion INTEGER NOT NULL,
+                    nota REAL NOT NULL,
+                    PRIMARY KEY (id_estudiante, posicion)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_estudiantes_nombre ON estudiantes(nombre COLLATE NOCASE);
+                CREATE INDEX IF NOT EXISTS idx_estudiantes_estado_promedio ON estudiantes(estado, promedio);
+            """)
+
+    def cargar(self):
+        filas = self.conexion.execute("SELECT id, nombre FROM estudiantes ORDER BY id").fetchall()
+        if not filas:
+            return None, []
+        ids = np.array([fila[0] for fila in filas], dtype=np.int64)
+        nombres = [fila[1] for fila in filas]
+        notas = np.array(self.conexion.execute(
+            "SELECT id_estudiante, nota FROM notas ORDER BY id_estudiante, posicion").fetchall(), dtype=np.float64)
+        #Las notas ya vienen agrupadas y en el orden de ids
+        longitudes = np.bincount(np.searchsorted(ids, notas[:, 0].astype(np.int64)), minlength=len(ids))
+        return (ids, nombres, notas[:, 1], longitudes), []
+
+    @staticmethod
+    def _filas_estudiante(almacen, id_estudiante):
+        fila = almacen.fila(id_estudiante)
+        estudiante = (id_estudiante, almacen.nombres[fila], round(float(almacen.promedios[fila]), 2),
+                      ESTADOS[bool(almacen.aprobados[fila])])
+        notas = [(id_estudiante, posicion, nota) for posicion, nota in enumerate(almacen.notas_de(fila))]
+        return estudiante, notas
+
+    def guardar_cambios(self, cambios, almacen):
+        """
+        Guarda el estado actual (en el almacén) de cada id que aparece en los
+        cambios, con un executemany por tabla dentro de una sola transacción.
+        """
+        ids = list(dict.fromkeys(cambio['id'] for cambio in cambios))
+        estudiantes, notas = [], []
+        for id_estudiante in ids:
+            if id_estudiante in almacen:
+                estudiante, notas_estudiante = self._filas_estudiante(almacen, id_estudiante)
+                estudiantes.append(estudiante)
+                notas.extend(notas_estudiante)
+        with self.conexion:
+            self.conexion.executemany("DELETE FROM notas WHERE id_estudiante = ?", ((i,) for i in ids))
+            self.conexion.executemany("DELETE FROM estudiantes WHERE id = ?",
+                                      ((i,) for i in ids if i not in almacen))
+            self.conexion.executemany("INSERT OR REPLACE INTO estudiantes VALUES (?, ?, ?, ?)", estudiantes)
+            self.conexion.executemany("INSERT INTO notas VALUES (?, ?, ?)", notas)
+
+    def guardar(self, almacen):
+        df_estudiante, df_notas = almacen.a_dataframes()
+        posiciones = df_notas.groupby('id_estudiante', sort=False).cumcount()
+        with self.conexion:
+            self.conexion.execute("DELETE FROM notas")
+            self.conexion.execute("DELETE FROM estudiantes")
+            self.conexion.executemany("INSERT INTO estudiantes VALUES (?, ?, ?, ?)",
+                                      zip(*(df_estudiante[columna].tolist() for columna in df_estudiante.columns)))
+            self.conexion.executemany("INSERT INTO notas VALUES (?, ?, ?)",
+                                      zip(df_notas['id_estudiante'].tolist(), posiciones.tolist(),
+                                          df_notas['nota'].tolist()))
+
+    def cerrar(self):
+        self.conexion.close()
+# --------------------------------------------------------------
 # Clase GestorEstudiantes
 # --------------------------------------------------------------
 class GestorEstudiantes:
     """
     Clase que gestiona el listado de estudiantes y su persistencia
     utilizando dos ficheros CSV: 'estudiantes.csv' y 'notas.csv'.
+
+    La persistencia es intercambiable (parámetro persistencia): por defecto
+    PersistenciaCSV (los dos CSV más un registro de cambios), y también
+    PersistenciaBinaria o PersistenciaSQLite. Con cualquiera de ellas los CSV
+    se pueden importar y exportar con cargar_desde_csv y guardar_en_csv.
+
+    Los datos están en un AlmacenEstudiantes (por columnas) y las búsquedas
+    devuelven VistaEstudiante. Estudiante se sigue usando para validar.
     """
-    def __init__(self, archivo_estudiantes:str, archivo_notas:str):
+    def __init__(self, archivo_estudiantes:str, archivo_notas:str, archivo_cambios:str=None, persistencia=None):
         """
         TODO: Inicializar el gestor con los nombres de los archivos CSV.
         Cargar automáticamente los datos desde ambos archivos (si existen),
         uniendo los estudiantes con sus notas a partir del id.
+        Si no se indica persistencia, se usa PersistenciaCSV con los dos CSV y archivo_cambios.
         """
         self.archivo_estudiantes = archivo_estudiantes
         self.archivo_notas = archivo_notas
-        self.estudiantes : List[Estudiante] = []
-        self.cargar_desde_csv() 
+        self.persistencia = persistencia or PersistenciaCSV(archivo_estudiantes, archivo_notas, archivo_cambios)
+        self.almacen = AlmacenEstudiantes()
+        #Índice: nombre normalizado -> ids con ese nombre (en orden de alta)
+        self._por_nombre = {}
+        self._siguiente_id = 1
+        #Cambios acumulados dentro de en_lote() (None fuera de un lote)
+        self._lote = None
+        self.cargar()
+
+    @staticmethod
+    def _normalizar_nombre(nombre):
+        """Clave del índice de nombres: sin mayúsculas ni espacios al principio o al final."""
+        return nombre.lower().strip()
+
+    @property
+    def estudiantes(self) -> List[VistaEstudiante]:
+        """Vistas de todos los estudiantes, en orden de alta."""
+        return [VistaEstudiante(self.almacen, id_estudiante)
+                for id_estudiante in self.almacen.ids[self.almacen.filas_activas()].tolist()]
+
+    def _indexar_nombres(self, ids, nombres):
+        for id_estudiante, nombre in zip(ids, nombres):
+            self._por_nombre.setdefault(self._normalizar_nombre(nombre), []).append(id_estudiante)
+        if ids:
+            self._siguiente_id = max(self._siguiente_id, max(ids) + 1)
+
+    def _alta(self, id_estudiante, nombre, notas):
+        """Añade un estudiante ya validado al almacén y al índice de nombres."""
+        self.almacen.agregar(id_estudiante, nombre, notas)
+        self._indexar_nombres([id_estudiante], [nombre])
+
+    def _baja(self, id_estudiante):
+        """Quita el estudiante del almacén y del índice de nombres."""
+        clave = self._normalizar_nombre(self.almacen.eliminar(id_estudiante))
+        mismos = self._por_nombre[clave]
+        mismos.remove(id_estudiante)
+        if not mismos:
+            del self._por_nombre[clave]
+
+    def _registrar_cambio(self, cambio):
+        self._registrar_cambios([cambio])
+
+    def _registrar_cambios(self, cambios):
+        """
+        Guarda cambios ya aplicados al almacén, o los acumula si hay un lote abierto.
+        """
+        if not cambios:
+            return
+        if self._lote is not None:
+            self._lote.extend(cambios)
+        else:
+            self.persistencia.guardar_cambios(cambios, self.almacen)
+
+    @contextmanager
+    def en_lote(self):
+        """
+        Agrupa los cambios hechos dentro del with y los guarda juntos al salir
+        (una escritura en el registro o una transacción en SQLite):
+
+            with gestor.en_lote():
+                for nombre, notas in nuevos:
+                    gestor.registrar_estudiante(nombre, notas)
+
+        Si hay un error a mitad, se guardan los cambios que ya se habían aplicado.
+        """
+        if self._lote is not None:
+            yield
+            return
+        self._lote = []
+        try:
+            yield
+        finally:
+            cambios, self._lote = self._lote, None
+            if cambios:
+                self.persistencia.guardar_cambios(cambios, self.almacen)
+
+    def _aplicar_cambio(self, cambio):
+        """
+        Aplica un cambio pendiente de la persistencia. Es idempotente (un alta de
+        un id que ya existe lo sustituye y una baja de un id que no existe no hace
+        nada), por si el registro no se llegó a vaciar después de compactar.
+        """
+        existe = cambio['id'] in self.almacen
+        if cambio['op'] == 'alta':
+            if existe:
+                self._baja(cambio['id'])
+            Estudiante(cambio['nombre'], cambio['notas'])
+            self._alta(cambio['id'], cambio['nombre'], cambio['notas'])
+        elif cambio['op'] == 'notas':
+            if existe:
+                Estudiante._validar_notas(cambio['notas'])
+                self.almacen.actualizar_notas(cambio['id'], cambio['notas'])
+        elif cambio['op'] == 'baja':
+            if existe:
+                self._baja(cambio['id'])
+        else:
+            raise ValueError(f"Cambio desconocido en el registro: {cambio}")
+
+    def compactar(self):
+        """
+        Guarda el estado completo con la persistencia (en los backends de fichero,
+        reescribe la instantánea y vacía el registro de cambios).
+        """
+        self.persistencia.guardar(self.almacen)
+
+    def cerrar(self):
+        self.persistencia.cerrar()
 
     def registrar_estudiante(self, nombre:str, notas:List[float]):
         """
@@ -200,21 +1095,147 @@ class GestorEstudiantes:
         Calcular su promedio y estado, añadirlo a la lista y guardar los datos actualizados en los CSV
         correspondientes ('estudiantes.csv' y 'notas.csv').
         
-        Nota: El ID se asigna automáticamente en guardar_en_csv() según la posición en la lista.
+        Nota: El ID es el siguiente al mayor asignado y se guarda en el estudiante.
+        El alta se guarda con la persistencia del gestor (ver en_lote() para muchas altas).
         """
         try:
             #if self.buscar_estudiante(nombre):
             #    raise ValueError(f"El estudiante {nombre} ya existe")
             
-            nuevo_estudiante = Estudiante(nombre, notas)
-            self.estudiantes.append(nuevo_estudiante)
-            # El ID se asigna automáticamente al guardar (índice en la lista + 1)
-            self.guardar_en_csv()
+            #Estudiante valida el nombre y las notas; los datos se guardan en el almacén
+            Estudiante(nombre, notas)
+            id_estudiante = self._siguiente_id
+            self._alta(id_estudiante, nombre, notas)
+            self._registrar_cambio({'op': 'alta', 'id': id_estudiante, 'nombre': nombre, 'notas': notas})
         except (ValueError,InvalidatedNotasError) as exception:
             raise ValueError(f" Error al registrar el estudiante: {exception}")
         except Exception as exception:
             raise Exception(f" Error del sistema al registrar el estudiante: {exception}")
 
+    @staticmethod
+    def _leer_lote(datos, notas, columnas_clave):
+        """
+        Convierte la entrada de registrar_lote/actualizar_lote en
+        (clave de cada fila, notas, nº de notas por fila, errores por fila).
+        La clave es la primera de columnas_clave que tenga cada fila.
+        """
+        if isinstance(datos, pd.DataFrame):
+            if notas is None and {'id_estudiante', 'nota'} <= set(datos.columns):
+                #Solo notas en formato largo: cada id_estudiante distinto es una fila
+                claves = pd.unique(datos['id_estudiante']).tolist()
+                agrupadas = agrupar_notas(claves, datos['id_estudiante'].to_numpy(), datos['nota'])
+            else:
+                columna = next(c for c in columnas_clave if c in datos.columns)
+                claves = datos[columna].tolist()
+                if notas is not None:
+                    #Estudiantes y notas como en los CSV, unidos por 'id'
+                    agrupadas = agrupar_notas(datos['id'].to_numpy(), notas['id_estudiante'].to_numpy(), notas['nota'])
+                else:
+                    agrupadas = aplanar_listas_notas(datos['notas'].tolist())
+        else:
+            claves, listas = [], []
+            for fila in datos:
+                if isinstance(fila, dict):
+                    claves.append(next((fila[c] for c in columnas_clave if c in fila), None))
+                    listas.append(fila.get('notas'))
+                else:
+                    clave, notas_fila = fila if isinstance(fila, (tuple, list)) and len(fila) == 2 else (None, None)
+                    claves.append(clave)
+                    listas.append(notas_fila)
+            agrupadas = aplanar_listas_notas(listas)
+        return claves, agrupadas[0], agrupadas[1], errores_de_notas(*agrupadas)
+
+    @staticmethod
+    def _informe_lote(columna, claves, ids, errores):
+        return pd.DataFrame({
+            'fila': np.arange(len(claves)),
+            columna: claves,
+            'id': pd.array(ids, dtype='Int64'),
+            'error': errores,
+        })
+
+    def registrar_lote(self, estudiantes, notas=None):
+        """
+        Registra muchos estudiantes de una vez. estudiantes puede ser:
+        - un iterable de tuplas (nombre, notas) o de diccionarios {'nombre', 'notas'},
+        - un DataFrame con las columnas 'nombre' y 'notas' (una lista por fila),
+        - un DataFrame con 'id' y 'nombre' y, en notas, un DataFrame con 'id_estudiante'
+          y 'nota' (el formato de los CSV; esos ids solo sirven para unir las notas,
+          el gestor asigna ids nuevos).
+        Se validan todas las filas a la vez, las válidas se añaden juntas al almacén
+        y se guardan con una sola escritura. Las filas erróneas no lanzan excepción:
+        devuelve un informe (DataFrame) con una fila por entrada con las columnas
+        fila, nombre, id (el asignado, o nulo) y error (el motivo, o nulo).
+        """
+        try:
+            nombres, notas, longitudes, errores = self._leer_lote(estudiantes, notas, ('nombre',))
+            for fila, nombre in enumerate(nombres):
+                if not isinstance(nombre, str) or nombre.strip() == "":
+                    errores[fila] = "El nombre no puede ser una cadena vacía o nula"
+
+            validas = np.array([error is None for error in errores], dtype=bool)
+            notas, longitudes = notas_validas(notas, longitudes, validas)
+            nombres_validos = [nombre for nombre, ok in zip(nombres, validas) if ok]
+            nuevos_ids = list(range(self._siguiente_id, self._siguiente_id + len(nombres_validos)))
+            self.almacen.agregar_lote(nuevos_ids, nombres_validos, notas, longitudes)
+            self._indexar_nombres(nuevos_ids, nombres_validos)
+
+            planas = notas.tolist()
+            inicios = (np.cumsum(longitudes) - longitudes).tolist()
+            self._registrar_cambios([
+                {'op': 'alta', 'id': id_estudiante, 'nombre': nombre, 'notas': planas[inicio:inicio + longitud]}
+                for id_estudiante, nombre, inicio, longitud
+                in zip(nuevos_ids, nombres_validos, inicios, longitudes.tolist())])
+
+            ids = iter(nuevos_ids)
+            return self._informe_lote('nombre', nombres, [next(ids) if ok else None for ok in validas], errores)
+        except Exception as exception:
+            raise Exception(f" Error del sistema al registrar el lote de estudiantes: {exception}")
+
+    def _resolver_estudiante(self, clave):
+        """Id del estudiante indicado por nombre (str) o por id (entero), o None si no existe."""
+        if isinstance(clave, str):
+            mismos = self._por_nombre.get(self._normalizar_nombre(clave))
+            return mismos[0] if mismos else None
+        if isinstance(clave, (int, np.integer)) and int(clave) in self.almacen:
+            return int(clave)
+        return None
+
+    def actualizar_lote(self, cambios, notas=None):
+        """
+        Sustituye las notas de muchos estudiantes de una vez. cambios puede ser:
+        - un iterable de tuplas (nombre o id, notas) o de diccionarios con 'id' o
+          'nombre' y 'notas',
+        - un DataFrame con 'id' o 'nombre' y 'notas' (una lista por fila),
+        - un DataFrame con 'id_estudiante' y 'nota' (formato de notas.csv): cada
+          estudiante que aparece pasa a tener exactamente esas notas,
+        - un DataFrame con 'id' y notas en formato largo, como en registrar_lote.
+        Igual que registrar_lote, valida todo a la vez, guarda una sola vez y
+        devuelve un informe con las columnas fila, estudiante, id y error.
+        """
+        try:
+            claves, notas, longitudes, errores = self._leer_lote(cambios, notas, ('id', 'nombre'))
+            ids = [self._resolver_estudiante(clave) for clave in claves]
+            for fila, (clave, id_estudiante) in enumerate(zip(claves, ids)):
+                if id_estudiante is None:
+                    errores[fila] = f"El estudiante {clave} no existe"
+
+            validas = np.array([error is None for error in errores], dtype=bool)
+            notas, longitudes = notas_validas(notas, longitudes, validas)
+            ids_validos = [id_estudiante for id_estudiante, ok in zip(ids, validas) if ok]
+            if ids_validos:
+                self.almacen.actualizar_notas_lote(ids_validos, notas, longitudes)
+
+            planas = notas.tolist()
+            inicios = (np.cumsum(longitudes) - longitudes).tolist()
+            self._registrar_cambios([
+                {'op': 'notas', 'id': id_estudiante, 'notas': planas[inicio:inicio + longitud]}
+                for id_estudiante, inicio, longitud in zip(ids_validos, inicios, longitudes.tolist())])
+
+            return self._informe_lote('estudiante', claves, [i if ok else None for i, ok in zip(ids, validas)], errores)
+        except Exception as exception:
+            raise Exception(f"Error del sistema al actualizar el lote de estudiantes: {exception}")
+
     def eliminar_estudiante(self, nombre):
         """
         TODO: Eliminar un estudiante de la lista (sin distinguir mayúsculas/minúsculas) y eliminar
@@ -225,8 +1246,8 @@ class GestorEstudiantes:
             estudiante = self.buscar_estudiante(nombre)
             if estudiante is None:
                 raise EstudianteNotFound(f"El estudiante {nombre} no existe")
-            self.estudiantes.remove(estudiante)
-            self.guardar_en_csv()
+            self._baja(estudiante.id)
+            self._registrar_cambio({'op': 'baja', 'id': estudiante.id})
             print(f"Estudiante '{nombre}' eliminado correctamente.")
         except EstudianteNotFound as exception:
             raise EstudianteNotFound(f"No se pudo eliminar el estudiante: {exception}")
@@ -239,11 +1260,8 @@ class GestorEstudiantes:
         Si no hay estudiantes, devolver 0.
         """
         try:
-            if not self.estudiantes:
-                return 0.0
-            #Convertimos la lista de estudiantes en un DataFrame  para poder calcular el promedio general
-            df = pd.DataFrame([promedio.to_dict() for promedio in self.estudiantes])
-            return round(df['promedio'].mean(),2)
+            #El almacén mantiene la suma de los promedios en cada cambio
+            return self.almacen.promedio_general()
         except Exception as exception:
              raise Exception(f" Error del sistema al calcular el promedio general: {exception}")
         
@@ -251,17 +1269,21 @@ class GestorEstudiantes:
         """
         TODO: Buscar y retornar un objeto Estudiante cuyo nombre coincida (sin distinguir mayúsculas).
         Si no se encuentra, devolver None.
+        Si hay varios con el mismo nombre, devuelve el primero que se dio de alta.
         """
         try:
-            estudiante_lower = nombre.lower().strip()
-            for estudiante in self.estudiantes:
-                if estudiante_lower == estudiante.to_dict()['nombre'].lower().strip():
-                    return estudiante
-            return None
+            mismos = self._por_nombre.get(self._normalizar_nombre(nombre))
+            return VistaEstudiante(self.almacen, mismos[0]) if mismos else None
         except Exception as exception:
              raise Exception(f" Error inesperado al buscar el estudiante: {exception}")
         
         
+    def buscar_por_id(self, id_estudiante):
+        """
+        Devuelve el estudiante con ese id, o None si no existe.
+        """
+        return VistaEstudiante(self.almacen, id_estudiante) if id_estudiante in self.almacen else None
+
     def actualizar_notas(self, nombre, nuevas_notas):
         """
         TODO: Buscar el estudiante indicado por nombre, actualizar sus notas, recalcular promedio y
@@ -272,8 +1294,9 @@ class GestorEstudiantes:
             estudiante = self.buscar_estudiante(nombre)
             if estudiante is None:
                 raise EstudianteNotFound(f"El estudiante {nombre} no existe")
-            estudiante.actualizar_notas(nuevas_notas)
-            self.guardar_en_csv()
+            Estudiante._validar_notas(nuevas_notas)
+            self.almacen.actualizar_notas(estudiante.id, nuevas_notas)
+            self._registrar_cambio({'op': 'notas', 'id': estudiante.id, 'notas': nuevas_notas})
             print(f"Notas de '{nombre}' actualizadas correctamente.")
         except EstudianteNotFound as exception:
              raise EstudianteNotFound(f"No se pudo actualizar el estudiante: {exception}")
@@ -286,11 +1309,11 @@ class GestorEstudiantes:
         "ID: <id> | Nombre: <nombre> | Promedio: <promedio> | Estado: <estado>"
         """
         try:
-            if not self.estudiantes:
+            if not len(self.almacen):
                 raise ValueError("No hay estudiantes registrados")
-            for idx, estudiante in enumerate(self.estudiantes, start=1):
+            for estudiante in self.estudiantes:
                 # Concatenamos el ID con el __str__() del estudiante
-                print(f"ID: {idx} | {estudiante.__str__()}")
+                print(f"ID: {estudiante.id} | {estudiante.__str__()}")
         except ValueError as exception:
             raise ValueError(f"Error al mostrar los estudiantes: {exception}")
         except Exception as exception:
@@ -301,23 +1324,23 @@ class GestorEstudiantes:
         ('Aprobado' o 'Suspenso').
         """
         try:
-            if not self.estudiantes:
+            if not len(self.almacen):
                 print("No hay estudiantes registrados")
                 return
             
-            # Filtramos estudiantes por estado y guardamos con su índice
-            estudiantes_filtrados = [
-                (idx, estudiante) 
-                for idx, estudiante in enumerate(self.estudiantes, start=1)
-                if estudiante.to_dict()['estado'] == filtro_estado
-            ]
+            # Los estudiantes del estado salen del índice de promedios; se
+            # muestran en orden de alta, como antes
+            ids = []
+            if filtro_estado in ESTADOS:
+                ids = sorted(self.almacen.ids_en_rango(-math.inf, math.inf, filtro_estado), key=self.almacen.fila)
+            estudiantes_filtrados = [VistaEstudiante(self.almacen, id_estudiante) for id_estudiante in ids]
 
             if not estudiantes_filtrados:
                 raise ValueError(f"No hay estudiantes con estado '{filtro_estado}'")
             
             # Mostramos cada estudiante concatenando el ID con su __str__()
-            for idx, estudiante in estudiantes_filtrados:
-                print(f"ID: {idx} | {estudiante.__str__()}")
+            for estudiante in estudiantes_filtrados:
+                print(f"ID: {estudiante.id} | {estudiante.__str__()}")
         except ValueError as exception:
             raise ValueError(f"Error al mostrar los estudiantes por estado: {exception}")
         except Exception as exception:
@@ -329,13 +1352,64 @@ class GestorEstudiantes:
         Ejemplo: {'Aprobado': 12, 'Suspenso': 9}
         """        
         try:
-            if not self.estudiantes:
-                return {'Aprobado':0, 'Suspenso':0}
-
-            df = pd.DataFrame([estudiante.to_dict() for estudiante in self.estudiantes])
-            return {'Aprobado': len(df[df['estado'] == 'Aprobado']), 'Suspenso': len(df[df['estado'] == 'Suspenso'])}
+            #Conteos mantenidos por el almacén en cada cambio
+            return self.almacen.contar_por_estado()
         except Exception as exception:
             raise Exception(f"Error del sistema al contar los estudiantes por estado: {exception}")
+
+    def buscar_por_promedio(self, minimo, maximo, estado=None):
+        """
+        Devuelve los estudiantes con minimo <= promedio <= maximo (promedio sin
+        redondear), de menor a mayor promedio. Con estado ('Aprobado' o
+        'Suspenso') solo los de ese estado.
+        """
+        try:
+            return [VistaEstudiante(self.almacen, id_estudiante)
+                    for id_estudiante in self.almacen.ids_en_rango(minimo, maximo, estado)]
+        except ValueError as exception:
+            raise ValueError(f"Error al buscar estudiantes por promedio: {exception}")
+        except Exception as exception:
+            raise Exception(f"Error del sistema al buscar estudiantes por promedio: {exception}")
+
+    def mejores_estudiantes(self, k, estado=None):
+        """
+        Devuelve los k estudiantes con mejor promedio, de mayor a menor
+        (opcionalmente solo los de un estado).
+        """
+        try:
+            return [VistaEstudiante(self.almacen, id_estudiante)
+                    for id_estudiante in self.almacen.ids_extremos(k, estado)]
+        except ValueError as exception:
+            raise ValueError(f"Error al buscar los mejores estudiantes: {exception}")
+        except Exception as exception:
+            raise Exception(f"Error del sistema al buscar los mejores estudiantes: {exception}")
+
+    def peores_estudiantes(self, k, estado=None):
+        """
+        Devuelve los k estudiantes con peor promedio, de menor a mayor
+        (opcionalmente solo los de un estado).
+        """
+        try:
+            return [VistaEstudiante(self.almacen, id_estudiante)
+                    for id_estudiante in self.almacen.ids_extremos(k, estado, mejores=False)]
+        except ValueError as exception:
+            raise ValueError(f"Error al buscar los peores estudiantes: {exception}")
+        except Exception as exception:
+            raise Exception(f"Error del sistema al buscar los peores estudiantes: {exception}")
+
+    def percentil_promedio(self, q, estado=None):
+        """
+        Devuelve el promedio (redondeado a 2 decimales) del percentil q, con q
+        entre 0 y 1: por ejemplo 0.5 es la mediana y 0.9 el promedio que iguala o
+        supera al 90% del grupo. Si no hay estudiantes, devuelve None.
+        """
+        try:
+            par = self.almacen.indice.percentil(q, estado)
+            return None if par is None else round(par[0], 2)
+        except ValueError as exception:
+            raise ValueError(f"Error al calcular el percentil del promedio: {exception}")
+        except Exception as exception:
+            raise Exception(f"Error del sistema al calcular el percentil del promedio: {exception}")
     def guardar_en_csv(self):
         """
         TODO: Guardar los datos actualizados de los estudiantes en 'estudiantes.csv'
@@ -343,64 +1417,45 @@ class GestorEstudiantes:
         Cada archivo debe seguir estas estructuras:
         - 'estudiantes.csv': id, nombre, promedio, estado
         - 'notas.csv': id_estudiante, nota
-        # Nota: los objetos Estudiante no almacenan el id internamente;
-        # el GestorEstudiantes asigna y gestiona los ids al guardar o cargar datos.
+        # Nota: se guarda el id de cada estudiante (no su posición), así los ids
+        # no cambian al borrar. Con otra persistencia sirve para exportar.
         """
         try:
-            df_estudiante = []
-            df_notas = []
-            
-            for i, estudiante in enumerate(self.estudiantes, start=1):
-                estudiante_dict = estudiante.to_dict()
-                
-                df_estudiante.append({
-                    'id': i,
-                    'nombre': estudiante_dict['nombre'],
-                    'promedio': estudiante_dict['promedio'],
-                    'estado': estudiante_dict['estado']
-                })
-                
-                # Usamos el getter para obtener las notas
-                for nota in estudiante.get_notas():
-                    df_notas.append({'id_estudiante': i, 'nota': nota})
-
-            df_estudiante = pd.DataFrame(df_estudiante)
-            df_notas = pd.DataFrame(df_notas)
-
-            df_estudiante.to_csv(self.archivo_estudiantes, index=False)
-            df_notas.to_csv(self.archivo_notas, index=False)
-            
+            escribir_csv_estudiantes(self.almacen, self.archivo_estudiantes, self.archivo_notas)
         except Exception as e:
             raise Exception(f"Error al guardar en CSV: {e}")
+
+    def _agregar_columnas(self, columnas):
+        ids, nombres, notas, longitudes = columnas
+        self.almacen.agregar_lote(ids, nombres, notas, longitudes)
+        self._indexar_nombres(np.asarray(ids).tolist(), nombres)
+
+    def cargar(self):
+        """
+        Carga el estado guardado por la persistencia y aplica encima los cambios pendientes.
+        """
+        try:
+            columnas, cambios = self.persistencia.cargar()
+            if columnas is not None:
+                self._agregar_columnas(columnas)
+            for cambio in cambios:
+                self._aplicar_cambio(cambio)
+        except Exception as e:
+            raise Exception(f"Error al cargar los estudiantes: {e}")
+
     def cargar_desde_csv(self):
         """
         TODO: Leer los datos desde ambos archivos CSV ('estudiantes.csv' y 'notas.csv'),
         reconstruyendo los objetos Estudiante y asociando sus notas por id_estudiante.
-        # Nota: los objetos Estudiante no almacenan el id internamente;
-        # el GestorEstudiantes asigna y gestiona los ids al guardar o cargar datos.
+        Con PersistenciaCSV esto ya lo hace cargar(); con otra persistencia sirve
+        para importar los CSV (después, compactar() los guarda en el backend).
         """
 
         try:
-            if not os.path.exists(self.archivo_estudiantes) or not os.path.exists(self.archivo_notas):
-                # Si los archivos no existen, iniciar con lista vacía
-                print(f"Archivos CSV no encontrados. Se iniciará con lista vacía.")
-                return
-            
-            # Cargamos los datos de los archivos CSV
-            df_estudiante=pd.read_csv(self.archivo_estudiantes)
-            df_notas=pd.read_csv(self.archivo_notas)
-
-            # Reconstruir objetos Estudiante
-            for _, row in df_estudiante.iterrows():
-                id_estudiante = row['id']
-                nombre = row['nombre']
-                
-                # Filtrar notas del estudiante usando pandas
-                notas_estudiante = [float(nota) for nota in df_notas[df_notas['id_estudiante'] == id_estudiante]['nota'].tolist()]
-                
-                # Crear objeto Estudiante
-                estudiante = Estudiante(nombre, notas_estudiante)
-                self.estudiantes.append(estudiante)
+            columnas = leer_csv_estudiantes(self.archivo_estudiantes, self.archivo_notas)
+            if columnas is not None:
+                # Añadir todos los estudiantes al almacén de una vez
+                self._agregar_columnas(columnas)
         except Exception as e:
             raise Exception(f"Error al cargar desde CSV: {e}")
 # --------------------------------------------------------------
@@ -4,11 +4,28 @@ analysis.py
 Aquí están las funciones para calcular estadísticas.
 Conteos, tops y agrupaciones.
 
+Además de las funciones sueltas, obtener_agregados calcula todos los conteos
+de una vez (cada columna se recorre una sola vez) y los guarda en caché por
+versión del dataset, para que main.py y los gráficos no vuelvan a recorrer
+el DataFrame.
+
 Autor: Luis Cendán
 """
 
+import hashlib
+
+import numpy as np
 import pandas as pd
 
+# Columnas que usan los agregados (la versión del dataset se calcula sobre ellas)
+COLUMNAS_AGREGADOS = ['type', 'release_year', 'country', 'listed_in', 'rating', 'duration_num']
+
+# Número de intervalos del histograma de duración
+BINS_DURACION = 30
+
+# Caché de agregados: versión del dataset -> diccionario de conteos
+_cache_agregados = {}
+
 def contenido_por_tipo(df):
     """
     Calcula cuántos títulos hay de cada tipo (Movie, TV Show).
@@ -46,3 +63,139 @@ def contenido_por_rating(df):
     Calcula cuántos títulos hay por cada rating.
     """
     return df['rating'].value_counts()
+
+
+def version_dataset(df):
+    """
+    Calcula una huella (sha1) de las columnas que usan los agregados.
+    Si los datos cambian, cambia la versión y se recalculan los agregados.
+    """
+    columnas = [c for c in COLUMNAS_AGREGADOS if c in df.columns]
+    hashes = pd.util.hash_pandas_object(df[columnas], index=False)
+    return hashlib.sha1(hashes.to_numpy().tobytes()).hexdigest()
+
+
+def calcular_agregados(df):
+    """
+    Calcula todos los conteos en una sola pasada, leyendo cada columna una vez.
+    Se guardan los conteos completos (no solo el top), así cualquier top-N sale
+    del mismo resultado con .head(n).
+    """
+    agregados = {
+        'por_tipo': ordenar_conteos(df['type'].value_counts()),
+        'por_anio': df['release_year'].value_counts().sort_index(),
+        'por_pais': ordenar_conteos(df['country'].value_counts()),
+        'por_genero': ordenar_conteos(df['listed_in'].str.split(', ').explode().value_counts()),
+        'por_rating': ordenar_conteos(df['rating'].value_counts()),
+    }
+    if 'duration_num' in df.columns:
+        agregados['hist_duracion'] = histograma_duracion(df)
+    return agregados
+
+
+def ordenar_conteos(conteos):
+    """
+    Ordena de mayor a menor cantidad y, en caso de empate, alfabéticamente.
+    value_counts no fija el orden de los empates, y así el modo por trozos y
+    el modo en memoria dan exactamente el mismo resultado.
+    """
+    orden = np.lexsort((conteos.index.to_numpy(dtype=str), -conteos.to_numpy()))
+    return conteos.iloc[orden]
+
+
+def histograma_duracion(df, bins=BINS_DURACION):
+    """
+    Histograma de duration_num por tipo, con los mismos intervalos para todos
+    los tipos (como sns.histplot con hue).
+    Devuelve (bordes, {tipo: conteos}).
+    """
+    datos = df.dropna(subset=['duration_num'])
+    bordes = np.histogram_bin_edges(datos['duration_num'], bins=bins)
+    conteos = {}
+    for tipo, grupo in datos.groupby('type', observed=True, sort=False):
+        conteos[tipo] = np.histogram(grupo['duration_num'], bins=bordes)[0]
+    return bordes, conteos
+
+
+def agregados_parciales(df):
+    """
+    Conteos de un trozo del dataset que se pueden sumar con los de otros trozos
+    (modo por trozos). Para la duración se guardan los conteos de cada
+    (tipo, duración), porque los intervalos del histograma dependen del mínimo
+    y el máximo de todo el dataset.
+    """
+    parciales = {
+        'por_tipo': df['type'].value_counts(sort=False),
+        'por_anio': df['release_year'].value_counts(sort=False),
+        'por_pais': df['country'].value_counts(sort=False),
+        'por_genero': df['listed_in'].str.split(', ').explode().value_counts(sort=False),
+        'por_rating': df['rating'].value_counts(sort=False),
+    }
+    if 'duration_num' in df.columns:
+        parciales['duracion'] = df.dropna(subset=['duration_num']).groupby(
+            ['type', 'duration_num'], observed=True, sort=False).size()
+
+    # Cada trozo tiene sus propias categorías: se pasan a valores normales para poder sumar
+    for clave, conteo in parciales.items():
+        if isinstance(conteo.index, pd.CategoricalIndex):
+            conteo.index = conteo.index.astype(conteo.index.categories.dtype)
+        elif isinstance(conteo.index, pd.MultiIndex):
+            conteo.index = conteo.index.set_levels(
+                [nivel.astype(nivel.categories.dtype) if isinstance(nivel, pd.CategoricalIndex) else nivel
+                 for nivel in conteo.index.levels])
+    return parciales
+
+
+def sumar_conteos(conteos):
+    """
+    Suma varias Series de conteos, manteniendo el orden de primera aparición.
+    """
+    conteos = [c for c in conteos if len(c)]
+    if not conteos:
+        return pd.Series(dtype='int64', name='count')
+    niveles = list(range(conteos[0].index.nlevels))
+    return pd.concat(conteos).groupby(level=niveles, sort=False).sum()
+
+
+def combinar_parciales(parciales, bins=BINS_DURACION):
+    """
+    Junta los conteos parciales de todos los trozos en el mismo formato que
+    calcular_agregados y con el mismo orden (ordenar_conteos).
+    """
+    agregados = {}
+    for clave in ['por_tipo', 'por_pais', 'por_genero', 'por_rating']:
+        agregados[clave] = ordenar_conteos(sumar_conteos([p[clave] for p in parciales]))
+    agregados['por_anio'] = sumar_conteos([p['por_anio'] for p in parciales]).sort_index()
+
+    if parciales and 'duracion' in parciales[0]:
+        duracion = sumar_conteos([p['duracion'] for p in parciales])
+        valores = duracion.index.get_level_values(1).to_numpy(dtype='float64')
+        # Los bordes solo dependen del mínimo y el máximo, así que salen iguales que en memoria
+        bordes = np.histogram_bin_edges(valores, bins=bins)
+        conteos = {}
+        for tipo in duracion.index.get_level_values(0).unique():
+            grupo = duracion.xs(tipo, level=0)
+            conteos[tipo] = np.histogram(grupo.index.to_numpy(dtype='float64'), bins=bordes,
+                                         weights=grupo.to_numpy())[0].astype(np.int64)
+        agregados['hist_duracion'] = (bordes, conteos)
+    return agregados
+
+
+def obtener_agregados(df, version=None):
+    """
+    Devuelve los agregados del dataset, calculándolos solo la primera vez.
+    - version: identificador del dataset (por ejemplo, el hash del CSV). Si no
+      se indica, se calcula con version_dataset.
+    """
+    if version is None:
+        version = version_dataset(df)
+    if version not in _cache_agregados:
+        _cache_agregados[version] = calcular_agregados(df)
+    return _cache_agregados[version]
+
+
+def limpiar_cache_agregados():
+    """
+    Vacía la caché de agregados.
+    """
+    _cache_agregados.clear()
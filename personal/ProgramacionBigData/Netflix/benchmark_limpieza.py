@@ -0,0 +1,86 @@
+"""
+benchmark_limpieza.py
+---------------------
+Micro-benchmark de la limpieza: compara las versiones antiguas, que recorren
+las filas con apply y una función Python, con las vectorizadas de
+data_cleaning.py sobre el dataset replicado varias veces.
+
+Uso:
+    python benchmark_limpieza.py [replicas] [repeticiones]
+
+Autor: Luis Cendán
+"""
+
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_loader import cargar_dataset
+from data_cleaning import limpiar_columna_country, limpiar_duracion
+
+
+# Versiones anteriores (por filas), como referencia
+
+def country_por_filas(df):
+    df_clean = df.copy()
+    df_clean['country'] = df_clean['country'].astype('object').fillna('Unknown')
+    df_clean['country'] = df_clean['country'].apply(lambda x: x.split(',')[0].strip() if isinstance(x, str) else x)
+    return df_clean
+
+
+def duracion_por_filas(df):
+    def extraer(row):
+        duration = row['duration']
+        if pd.isna(duration):
+            return np.nan
+        match = re.search(r'(\d+)', str(duration))
+        if match:
+            return int(match.group(1))
+        return np.nan
+
+    df_clean = df.copy()
+    df_clean['duration_num'] = df_clean.apply(extraer, axis=1)
+    return df_clean
+
+
+def medir(funcion, df, repeticiones):
+    """
+    Devuelve el mejor tiempo (en segundos) de varias repeticiones y el resultado.
+    """
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(df)
+        tiempo = time.perf_counter() - inicio
+        mejor = tiempo if mejor is None else min(mejor, tiempo)
+    return mejor, resultado
+
+
+def main():
+    replicas = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    df = cargar_dataset("netflix_titles.csv")
+    if df is None:
+        return
+    df_grande = pd.concat([df] * replicas, ignore_index=True)
+    print(f"\nDataset replicado x{replicas}: {len(df_grande)} filas, {repeticiones} repeticiones\n")
+
+    casos = [
+        ('country', country_por_filas, limpiar_columna_country),
+        ('duration_num', duracion_por_filas, limpiar_duracion),
+    ]
+
+    print(f"{'Columna':15}{'Por filas (s)':>15}{'Vectorizado (s)':>17}{'Speedup':>10}  Mismo resultado")
+    for columna, antigua, nueva in casos:
+        t_antigua, r_antigua = medir(antigua, df_grande, repeticiones)
+        t_nueva, r_nueva = medir(nueva, df_grande, repeticiones)
+        igual = r_antigua[columna].astype('object').equals(r_nueva[columna].astype('object'))
+        print(f"{columna:15}{t_antigua:15.4f}{t_nueva:17.4f}{t_antigua / t_nueva:9.1f}x  {'si' if igual else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+chunked_pipeline.py
+-------------------
+Modo por trozos (out-of-core) para catálogos que no caben en memoria.
+
+El CSV se lee en trozos de filas_por_trozo filas. Cada trozo pasa por los
+mismos pasos que el modo en memoria (tipos de data_loader, quitar
+duplicados, limpiar_columna_country y limpiar_duracion) y se resume con
+analysis.agregados_parciales. Al final se suman los conteos de todos los
+trozos con analysis.combinar_parciales, así que en memoria solo hay un
+trozo y los conteos.
+
+Los duplicados se quitan por show_id con un conjunto de los ids ya vistos,
+de modo que también se detectan entre trozos distintos (se queda la primera
+aparición). Cuando show_id identifica cada fila, como en netflix_titles.csv,
+el resultado es idéntico al del modo en memoria (ver agregados_iguales).
+
+Autor: Luis Cendán
+"""
+
+import numpy as np
+import pandas as pd
+
+from analysis import agregados_parciales, combinar_parciales
+from data_cleaning import limpiar_columna_country, limpiar_duracion
+from data_loader import tipar_dataset
+
+FILAS_POR_TROZO = 2000
+
+
+def leer_por_trozos(ruta_csv, filas_por_trozo=FILAS_POR_TROZO):
+    """
+    Genera los trozos del CSV con los mismos tipos que cargar_dataset.
+    """
+    for trozo in pd.read_csv(ruta_csv, chunksize=filas_por_trozo):
+        yield tipar_dataset(trozo)
+
+
+def quitar_vistos(trozo, vistos):
+    """
+    Quita las filas cuyo show_id ya ha salido (en este trozo o en uno anterior)
+    y añade los nuevos ids al conjunto vistos.
+    """
+    repetidos = trozo['show_id'].isin(vistos) | trozo['show_id'].duplicated()
+    if repetidos.any():
+        trozo = trozo[~repetidos].copy()
+    vistos.update(trozo['show_id'])
+    return trozo
+
+
+def analizar_por_trozos(ruta_csv, filas_por_trozo=FILAS_POR_TROZO):
+    """
+    Ejecuta la limpieza y los conteos trozo a trozo.
+    Devuelve (agregados, resumen), donde agregados tiene el mismo formato que
+    analysis.calcular_agregados y resumen cuenta trozos, filas y duplicados.
+    """
+    vistos = set()
+    parciales = []
+    filas = 0
+    for trozo in leer_por_trozos(ruta_csv, filas_por_trozo):
+        filas += len(trozo)
+        trozo = quitar_vistos(trozo, vistos)
+        # Cada trozo es nuevo y nadie más lo usa: se limpia sin copias
+        trozo = limpiar_columna_country(trozo, inplace=True)
+        trozo = limpiar_duracion(trozo, inplace=True)
+        parciales.append(agregados_parciales(trozo))
+
+    resumen = {
+        'trozos': len(parciales),
+        'filas': filas,
+        'titulos': len(vistos),
+        'duplicados': filas - len(vistos),
+    }
+    return combinar_parciales(parciales), resumen
+
+
+def agregados_iguales(a, b):
+    """
+    Comprueba que dos diccionarios de agregados tienen los mismos valores en el
+    mismo orden (sin mirar si el índice es categórico o no).
+    """
+    if a.keys() != b.keys():
+        return False
+    for clave in a:
+        if clave == 'hist_duracion':
+            bordes_a, conteos_a = a[clave]
+            bordes_b, conteos_b = b[clave]
+            if not np.array_equal(bordes_a, bordes_b):
+                return False
+            if [str(t) for t in conteos_a] != [str(t) for t in conteos_b]:
+                return False
+            if not all(np.array_equal(x, y) for x, y in zip(conteos_a.values(), conteos_b.values())):
+                return False
+        elif (list(a[clave].index) != list(b[clave].index)
+              or list(a[clave].to_numpy()) != list(b[clave].to_numpy())):
+            return False
+    return True
@@ -7,79 +7,208 @@ Rellenamos nulos, quitamos duplicados y convertimos textos a números.
 Autor: Luis Cendán
 """
 
+import time
+import tracemalloc
+
 import numpy as np
 import pandas as pd
-import re
 
-def limpiar_columna_country(df):
+MODOS_PREPARACION = ('copias', 'pipeline')
+
+
+def limpiar_columna_country(df, inplace=False):
     """
     Analiza la columna country, rellena nulos con 'Unknown' y queda con el primer pais.
-    No modifica el DataFrame original.
+    No modifica el DataFrame original, salvo con inplace=True.
     """
-    df_clean = df.copy()
+    df_clean = df if inplace else df.copy()
     
     # Verificar que la columna exista
     if 'country' not in df_clean.columns:
         return df_clean
         
     # Rellenar valores nulos
+    # Si viene de la caché es categórica y 'Unknown' tiene que existir como categoría
+    if isinstance(df_clean['country'].dtype, pd.CategoricalDtype) and 'Unknown' not in df_clean['country'].cat.categories:
+        df_clean['country'] = df_clean['country'].cat.add_categories('Unknown')
     df_clean['country'] = df_clean['country'].fillna('Unknown')
     
     # Quedarse con el primer país si hay varios (separados por coma)
     # Por ejemplo: 'United States, United Kingdom' -> nos quedamos solo con 'United States'
-    df_clean['country'] = df_clean['country'].apply(lambda x: x.split(',')[0].strip() if isinstance(x, str) else x)
+    df_clean['country'] = primer_elemento(df_clean['country'])
     
     return df_clean
 
 
-def extraer_duracion_numerica(row):
+def por_valores_distintos(serie, transformar):
     """
-    Extrae el valor numérico de la duración.
-    Maneja 'min' para películas y 'Season'/'Seasons' para series.
+    Aplica una transformación vectorizada solo a los valores distintos de la serie
+    y reparte el resultado a cada fila. Columnas como country o duration tienen
+    unos cientos de valores distintos, así que es mucho más rápido que aplicarla
+    a todas las filas. Los nulos siguen siendo nulos.
     """
-    duration = row['duration']
-    
-    if pd.isna(duration):
-        return np.nan
-        
-    # Usamos regex para sacar los números de la cadena
-    # Ej: "90 min" -> 90, "1 Season" -> 1    
-    match = re.search(r'(\d+)', str(duration))
-    if match:
-        return int(match.group(1))
-    
-    return np.nan
+    codigos, distintos = pd.factorize(serie)
+    resultado = transformar(pd.Series(distintos))
+    # El código -1 (nulo) apunta a la fila extra, que queda a NaN
+    resultado = resultado.reindex(range(len(distintos) + 1))
+    resultado = resultado.iloc[codigos]
+    resultado.index = serie.index
+    return resultado
 
 
-def limpiar_duracion(df):
+def primer_elemento(serie, separador=','):
     """
-    Crea una nueva columna duration_num con el valor numérico.
-    No modifica el DataFrame original.
+    Devuelve el primer elemento de cada valor separado por comas, sin espacios.
+    Usa operaciones vectorizadas (.str) en vez de una función Python por fila.
     """
-    df_clean = df.copy()
-    # Aplicamos la función a cada fila si la columna existe.
-    if 'duration' in df_clean.columns:
-        # Usamos axis=1 para procesar por filas, permitiendo lógica compleja basada en múltiples columnas si fuera necesario.
-        df_clean['duration_num'] = df_clean.apply(extraer_duracion_numerica, axis=1)
-    else:
-        # Si no existe, creamos la columna con NaN para evitar fallos aguas abajo
+    primeros = por_valores_distintos(serie, lambda valores: valores.astype('str').str.split(separador).str[0].str.strip())
+    return primeros.astype('category') if isinstance(serie.dtype, pd.CategoricalDtype) else primeros
+
+
+def separar_duracion(valores):
+    """
+    Separa textos de duración en número y unidad con una sola expresión regular:
+    "90 min" -> (90, 'min'), "1 Season" / "2 Seasons" -> (1, 'season') / (2, 'season').
+    """
+    partes = valores.astype('str').str.extract(r'(\d+)\s*(min|Season)?')
+    return pd.DataFrame({
+        'num': pd.to_numeric(partes[0]).astype('float64'),
+        'unidad': partes[1].map({'min': 'min', 'Season': 'season'}),
+    })
+
+
+def limpiar_duracion(df, minutos_por_temporada=None, inplace=False):
+    """
+    Crea las columnas de duración a partir de textos como "90 min" o "2 Seasons":
+    - duration_num: el valor numérico (minutos o temporadas).
+    - duration_unit: 'min' para películas y 'season' para series.
+    - duration_min: la duración en minutos. Para las series solo se rellena si se
+      indica minutos_por_temporada (una estimación), si no queda a NaN.
+    No modifica el DataFrame original, salvo con inplace=True.
+    """
+    df_clean = df if inplace else df.copy()
+    # Si no existe, creamos las columnas con NaN para evitar fallos aguas abajo
+    if 'duration' not in df_clean.columns:
         df_clean['duration_num'] = np.nan
+        df_clean['duration_unit'] = pd.Series(np.nan, index=df_clean.index, dtype='category')
+        df_clean['duration_min'] = np.nan
+        return df_clean
+
+    partes = por_valores_distintos(df_clean['duration'], separar_duracion)
+    df_clean['duration_num'] = partes['num']
+    df_clean['duration_unit'] = partes['unidad'].astype('category')
+
+    minutos = df_clean['duration_num'].where(df_clean['duration_unit'] == 'min')
+    if minutos_por_temporada is not None:
+        temporadas = df_clean['duration_num'] * minutos_por_temporada
+        minutos = minutos.fillna(temporadas.where(df_clean['duration_unit'] == 'season'))
+    df_clean['duration_min'] = minutos
     
     return df_clean
 
 
-def preparar_dataset(df):
+def quitar_duplicados(df, inplace=False):
+    """
+    Quita las filas duplicadas.
+    No modifica el DataFrame original, salvo con inplace=True.
+    """
+    if inplace:
+        df.drop_duplicates(inplace=True)
+        return df
+    return df.drop_duplicates()
+
+
+# Pasos de la limpieza, en orden
+PASOS_LIMPIEZA = [
+    ('quitar_duplicados', quitar_duplicados),
+    ('limpiar_columna_country', limpiar_columna_country),
+    ('limpiar_duracion', limpiar_duracion),
+]
+
+
+def memoria_asignada():
+    """
+    Bytes reservados ahora mismo por Python/numpy (tracemalloc) y por pyarrow,
+    que guarda las columnas de texto fuera del alcance de tracemalloc.
+    """
+    total = tracemalloc.get_traced_memory()[0]
+    try:
+        import pyarrow as pa
+        total += pa.total_allocated_bytes()
+    except ImportError:
+        pass
+    return total
+
+
+def ejecutar_paso(nombre, paso, df, inplace):
+    """
+    Ejecuta un paso y mide su tiempo y memoria:
+    - delta_mb: memoria que queda reservada después del paso.
+    - pico_mb: pico de memoria de Python/numpy durante el paso.
+    """
+    iniciado_aqui = not tracemalloc.is_tracing()
+    if iniciado_aqui:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    antes = memoria_asignada()
+    inicio = time.perf_counter()
+
+    df = paso(df, inplace=inplace)
+
+    segundos = time.perf_counter() - inicio
+    despues = memoria_asignada()
+    # Lo que llegó a subir tracemalloc por encima de lo que queda al final
+    actual, pico_traza = tracemalloc.get_traced_memory()
+    pico = despues + (pico_traza - actual)
+    if iniciado_aqui:
+        tracemalloc.stop()
+
+    return df, {
+        'paso': nombre,
+        'segundos': segundos,
+        'delta_mb': (despues - antes) / 1024 ** 2,
+        'pico_mb': (pico - antes) / 1024 ** 2,
+        'filas': len(df),
+    }
+
+
+def preparar_dataset(df, modo='copias', metricas=None):
     """
     Función que llama a todas las limpiezas en orden.
+
+    - modo='copias': cada paso trabaja sobre una copia completa del DataFrame.
+    - modo='pipeline': los pasos se encadenan sobre un único DataFrame que solo
+      sustituye las columnas que cambia, así la memoria se queda en ~1x el dataset.
+      El original no se modifica porque se parte de una copia superficial.
+    - metricas: si se pasa una lista, se añade el tiempo y la memoria de cada paso.
     """
+    if modo not in MODOS_PREPARACION:
+        raise ValueError(f"Modo desconocido: {modo}. Opciones: {', '.join(MODOS_PREPARACION)}")
+
+    inplace = modo == 'pipeline'
+    if inplace:
+        # Copia superficial: comparte los datos del original. Asignar una columna
+        # entera o drop_duplicates(inplace=True) solo cambian esta copia
+        df = df.copy(deep=False)
+
     # Pipeline de limpieza
     # 1. Quitar duplicados por si acaso
-    df = df.drop_duplicates()
-
     # 2. Arreglar columna country
-    df_step1 = limpiar_columna_country(df)
-    
     # 3. Arreglar duración
-    df_final = limpiar_duracion(df_step1)
-    
-    return df_final
+    for nombre, paso in PASOS_LIMPIEZA:
+        if metricas is None:
+            df = paso(df, inplace=inplace)
+        else:
+            df, medida = ejecutar_paso(nombre, paso, df, inplace)
+            metricas.append(medida)
+
+    return df
+
+
+def mostrar_metricas(metricas):
+    """
+    Muestra una tabla con el tiempo y la memoria de cada paso de la limpieza.
+    """
+    print(f"   {'Paso':26}{'Tiempo (s)':>12}{'Delta (MB)':>12}{'Pico (MB)':>11}")
+    for medida in metricas:
+        print(f"   {medida['paso']:26}{medida['segundos']:12.4f}{medida['delta_mb']:12.2f}{medida['pico_mb']:11.2f}")
@@ -4,22 +4,166 @@ data_loader.py
 Funciones para cargar el archivo CSV.
 Controlamos errores típicos como que el archivo no exista o esté vacío.
 
+La primera carga guarda una copia tipada en formato Feather junto al CSV
+(netflix_titles.feather). Las siguientes cargas leen esa copia con memory
+map, que es mucho más rápido que volver a parsear el CSV. La caché se
+invalida sola si el CSV cambia (se comprueba su fecha de modificación y,
+si no coincide, su hash).
+
 Autor: Luis Cendán
 """
 
 import pandas as pd
+import hashlib
 import os
 from pandas.errors import EmptyDataError, ParserError
 
-def cargar_dataset(ruta_csv):
+# Tipos de la copia en caché
+COLUMNAS_CATEGORICAS = ['type', 'rating', 'country']
+FORMATO_FECHA = '%B %d, %Y'  # Ej: "September 25, 2021"
+
+
+def ruta_cache(ruta_csv):
+    """
+    Ruta del fichero de caché: mismo nombre que el CSV con extensión .feather.
+    """
+    return os.path.splitext(ruta_csv)[0] + '.feather'
+
+
+def hash_fichero(ruta):
+    """
+    Calcula el sha1 del fichero leyéndolo por bloques.
+    """
+    sha1 = hashlib.sha1()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b''):
+            sha1.update(bloque)
+    return sha1.hexdigest()
+
+
+def tipar_dataset(df):
+    """
+    Convierte las columnas a tipos compactos: categóricas para type, rating
+    y country, Int16 para release_year y fechas para date_added.
+    """
+    for columna in COLUMNAS_CATEGORICAS:
+        if columna in df.columns:
+            df[columna] = df[columna].astype('category')
+
+    if 'release_year' in df.columns:
+        df['release_year'] = df['release_year'].astype('Int16')
+
+    if 'date_added' in df.columns:
+        # Algunas fechas vienen con espacios al principio (" August 4, 2017")
+        df['date_added'] = pd.to_datetime(df['date_added'].str.strip(), format=FORMATO_FECHA, errors='coerce')
+
+    return df
+
+
+def leer_cache(ruta_csv, columnas=None):
+    """
+    Devuelve el DataFrame de la caché si sigue siendo válido, o None.
+    La fecha de modificación y el tamaño del CSV se comprueban siempre;
+    el hash solo si la fecha no coincide (por ejemplo, tras copiar el fichero).
+    """
+    try:
+        import pyarrow as pa
+        from pyarrow import feather
+    except ImportError:
+        return None
+
+    ruta = ruta_cache(ruta_csv)
+    if not os.path.exists(ruta):
+        return None
+
+    try:
+        with pa.memory_map(ruta) as origen:
+            metadatos = pa.ipc.open_file(origen).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+    estado = os.stat(ruta_csv)
+    if metadatos.get(b'csv_size') != str(estado.st_size).encode():
+        return None
+    mtime = str(estado.st_mtime_ns).encode()
+    if metadatos.get(b'csv_mtime') != mtime:
+        if metadatos.get(b'csv_sha1') != hash_fichero(ruta_csv).encode():
+            return None
+        # El contenido es el mismo: se guarda la fecha nueva para no volver
+        # a calcular el hash en las siguientes cargas
+        tabla = feather.read_table(ruta, memory_map=False)
+        guardar_tabla(tabla.replace_schema_metadata({**metadatos, b'csv_mtime': mtime}), ruta)
+
+    # Sin compresión, memory_map evita copiar los datos al leer
+    tabla = feather.read_table(ruta, columns=columnas, memory_map=True)
+    return tabla.to_pandas()
+
+
+def guardar_tabla(tabla, ruta):
+    """
+    Escribe la tabla en Feather sin compresión a través de un fichero temporal,
+    para no dejar nunca una caché a medias.
+    """
+    from pyarrow import feather
+
+    temporal = ruta + '.tmp'
+    try:
+        feather.write_feather(tabla, temporal, compression='uncompressed')
+        os.replace(temporal, ruta)
+    except OSError as e:
+        print(f"   [WARNING] No se pudo guardar la caché: {e}")
+
+
+def escribir_cache(df, ruta_csv):
+    """
+    Guarda la copia tipada en Feather con los datos del CSV (tamaño, fecha y hash)
+    en los metadatos del esquema. Si falla, se sigue sin caché.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        print("   [INFO] pyarrow no está instalado: no se guarda la caché.")
+        return
+
+    estado = os.stat(ruta_csv)
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    tabla = tabla.replace_schema_metadata({
+        **(tabla.schema.metadata or {}),
+        b'csv_size': str(estado.st_size).encode(),
+        b'csv_mtime': str(estado.st_mtime_ns).encode(),
+        b'csv_sha1': hash_fichero(ruta_csv).encode(),
+    })
+    guardar_tabla(tabla, ruta_cache(ruta_csv))
+
+
+def cargar_dataset(ruta_csv, columnas=None, usar_cache=True):
     """
     Carga el archivo CSV indicado por la ruta recibida como parametro.
+
+    - columnas: lista de columnas a leer (None = todas), para que cada análisis
+      lea solo lo que necesita.
+    - usar_cache: si es True, usa (o crea) la copia tipada en Feather. Si es
+      False, es la carga original (read_csv sin convertir tipos), útil como
+      referencia para comparar.
     """
     if not os.path.exists(ruta_csv):
         raise FileNotFoundError(f"El archivo {ruta_csv} no existe.")
     
     try:
-        df = pd.read_csv(ruta_csv)
+        df = leer_cache(ruta_csv, columnas) if usar_cache else None
+        if df is not None:
+            print(f"Dataset cargado desde la caché: {df.shape[0]} filas, {df.shape[1]} columnas")
+            return df
+
+        if usar_cache:
+            df = tipar_dataset(pd.read_csv(ruta_csv))
+            if not df.empty:
+                escribir_cache(df, ruta_csv)
+        else:
+            df = pd.read_csv(ruta_csv)
+        if columnas is not None:
+            df = df[columnas]
+
         if df.empty:
             print("   [WARNING] El dataset se cargó pero está vacío.")
         else:
@@ -0,0 +1,157 @@
+"""
+label_index.py
+--------------
+Índice de atributos con varios valores por título (listed_in, country, cast).
+
+Cada columna se guarda como una matriz dispersa títulos x etiquetas en
+formato CSR: para el título i, sus etiquetas son
+indices[indptr[i]:indptr[i + 1]], y el vocabulario traduce cada índice a
+su texto. Se construye una vez por dataset y después:
+
+- el top-N de una columna es la suma por columnas de la matriz (1ᵀ·A),
+- las co-ocurrencias (pares de géneros, país x género...) son el producto
+  Aᵀ·B, que se calcula fila a fila con los pares de etiquetas de cada título,
+
+sin volver a hacer split/explode/groupby. A diferencia de la limpieza, aquí
+se guardan todos los países de cada título, no solo el primero.
+
+La matriz se implementa con arrays de numpy; si scipy está instalado,
+a_scipy() la convierte en scipy.sparse.csr_matrix.
+
+Autor: Luis Cendán
+"""
+
+import numpy as np
+import pandas as pd
+
+COLUMNAS_MULTIVALOR = ['listed_in', 'country', 'cast']
+SEPARADOR = ','
+
+
+class IndiceEtiquetas:
+    """
+    Matriz dispersa títulos x etiquetas (CSR binaria) con su vocabulario.
+    """
+
+    def __init__(self, indptr, indices, vocabulario, nombre=None):
+        self.indptr = indptr
+        self.indices = indices
+        self.vocabulario = vocabulario
+        self.nombre = nombre
+
+    @classmethod
+    def desde_serie(cls, serie, separador=SEPARADOR):
+        """
+        Construye el índice a partir de una columna de texto con valores separados
+        por comas. Los nulos y las etiquetas vacías se ignoran, y una etiqueta
+        repetida en el mismo título cuenta una sola vez.
+        """
+        serie = serie.reset_index(drop=True)
+        n_titulos = len(serie)
+        etiquetas = serie.astype('object').str.split(separador).explode().str.strip()
+        etiquetas = etiquetas[etiquetas.notna() & (etiquetas != '')]
+
+        filas = etiquetas.index.to_numpy(dtype=np.int64)
+        # sort=True: los códigos siguen el orden alfabético del vocabulario
+        codigos, vocabulario = pd.factorize(etiquetas, sort=True)
+
+        # Quitar repetidas dentro de un título y dejar las entradas ordenadas por fila
+        n_etiquetas = max(len(vocabulario), 1)
+        claves = np.unique(filas * n_etiquetas + codigos)
+        filas = claves // n_etiquetas
+        indices = (claves % n_etiquetas).astype(np.int32)
+
+        indptr = np.zeros(n_titulos + 1, dtype=np.int64)
+        np.cumsum(np.bincount(filas, minlength=n_titulos), out=indptr[1:])
+        return cls(indptr, indices, np.asarray(vocabulario, dtype=object), nombre=serie.name)
+
+    @property
+    def n_titulos(self):
+        return len(self.indptr) - 1
+
+    @property
+    def n_etiquetas(self):
+        return len(self.vocabulario)
+
+    def etiquetas_de(self, titulo):
+        """
+        Etiquetas del título en la posición indicada.
+        """
+        return list(self.vocabulario[self.indices[self.indptr[titulo]:self.indptr[titulo + 1]]])
+
+    def conteos(self):
+        """
+        Número de títulos por etiqueta (suma por columnas de la matriz).
+        """
+        return np.bincount(self.indices, minlength=self.n_etiquetas)
+
+    def top(self, n=5):
+        """
+        Las n etiquetas con más títulos, como una Serie etiqueta -> cantidad.
+        Los empates se ordenan alfabéticamente.
+        """
+        conteos = self.conteos()
+        orden = np.lexsort((np.arange(self.n_etiquetas), -conteos))[:n]
+        return pd.Series(conteos[orden], index=pd.Index(self.vocabulario[orden], name=self.nombre), name='count')
+
+    def a_scipy(self):
+        """
+        Devuelve la misma matriz como scipy.sparse.csr_matrix (requiere scipy).
+        """
+        from scipy.sparse import csr_matrix
+        datos = np.ones(len(self.indices), dtype=np.int32)
+        return csr_matrix((datos, self.indices, self.indptr), shape=(self.n_titulos, self.n_etiquetas))
+
+
+def pares_por_titulo(a, b):
+    """
+    Para cada título, todos los pares (etiqueta de a, etiqueta de b) que tiene.
+    Es el paso fila a fila del producto Aᵀ·B: se hace con np.repeat sobre los
+    arrays CSR, sin bucles de Python por título.
+    """
+    cuenta_a = np.diff(a.indptr)
+    cuenta_b = np.diff(b.indptr)
+    pares = cuenta_a * cuenta_b
+
+    filas = np.repeat(np.arange(len(pares)), pares)
+    inicio_bloque = np.repeat(np.cumsum(pares) - pares, pares)
+    desplazamiento = np.arange(pares.sum()) - inicio_bloque
+    ancho = cuenta_b[filas]
+
+    columnas_a = a.indices[a.indptr[filas] + desplazamiento // ancho]
+    columnas_b = b.indices[b.indptr[filas] + desplazamiento % ancho]
+    return columnas_a, columnas_b
+
+
+def coocurrencias(a, b=None, n=10):
+    """
+    Las n combinaciones de etiquetas que más aparecen juntas en un título (Aᵀ·B).
+    - coocurrencias(generos): pares de géneros distintos (sin repetir A-B y B-A).
+    - coocurrencias(paises, generos): país x género.
+    Devuelve una Serie con índice (etiqueta_a, etiqueta_b) -> cantidad.
+    """
+    mismo = b is None
+    b = a if mismo else b
+    if a.n_titulos != b.n_titulos:
+        raise ValueError("Los dos índices deben tener los mismos títulos.")
+
+    columnas_a, columnas_b = pares_por_titulo(a, b)
+    if mismo:
+        # Matriz simétrica: solo la mitad superior, sin la diagonal
+        mitad = columnas_a < columnas_b
+        columnas_a, columnas_b = columnas_a[mitad], columnas_b[mitad]
+
+    claves, conteos = np.unique(columnas_a.astype(np.int64) * b.n_etiquetas + columnas_b, return_counts=True)
+    orden = np.lexsort((claves, -conteos))[:n]
+    claves = claves[orden]
+    indice = pd.MultiIndex.from_arrays(
+        [a.vocabulario[claves // b.n_etiquetas], b.vocabulario[claves % b.n_etiquetas]],
+        names=[a.nombre, b.nombre if not mismo else f'{a.nombre}_2'])
+    return pd.Series(conteos[orden], index=indice, name='count')
+
+
+def construir_indices(df, columnas=COLUMNAS_MULTIVALOR):
+    """
+    Construye el índice de cada columna multivalor presente en el DataFrame.
+    """
+    return {columna: IndiceEtiquetas.desde_serie(df[columna]) for columna in columnas if columna in df.columns}
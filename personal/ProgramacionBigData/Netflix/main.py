@@ -7,26 +7,72 @@ Desde aquí controlamos todo el proceso: carga, limpieza, análisis y gráficos.
 Autor: Luis Cendán
 """
 
+import sys
+
 from data_loader import *
 from data_cleaning import *
 from analysis import *
 from visualization import *
+from label_index import construir_indices, coocurrencias
+from chunked_pipeline import analizar_por_trozos
 
 # BONUS: Descomentar si se implementa la clase analítica avanzada
 # from netflix_analyzer import NetflixAnalyzer
 
 
-def main():
+def main_por_trozos(ruta_csv, modo_graficos='secuencial'):
+    """
+    Modo por trozos: limpieza y conteos sin cargar el CSV entero en memoria.
+    No hay exploración ni índice de etiquetas, que necesitan el dataset completo.
+    """
+    print(f"1. Procesando {ruta_csv} por trozos...")
+    agregados, resumen = analizar_por_trozos(ruta_csv)
+    print(f"   {resumen['trozos']} trozos, {resumen['filas']} filas, "
+          f"{resumen['titulos']} títulos ({resumen['duplicados']} duplicados quitados)")
+
+    print("\n   --- Contenido por Tipo ---")
+    print(agregados['por_tipo'])
+
+    print("\n   --- Contenido por País (Top 5) ---")
+    print(agregados['por_pais'].head(5))
+
+    print("\n   --- Contenido por Rating ---")
+    print(agregados['por_rating'].head())
+
+    print("\n2. Generando visualizaciones...")
+    print("   Guardando gráficos en la carpeta 'graphs'...")
+    if modo_graficos == 'paralelo':
+        renderizar_graficos(agregados)
+    else:
+        # Los gráficos solo usan los agregados, no hace falta el DataFrame
+        grafico_contenido_por_tipo(None, agregados=agregados)
+        grafico_contenido_por_anio(None, agregados=agregados)
+        grafico_top_paises(None, agregados=agregados)
+        grafico_distribucion_duracion(None, agregados=agregados)
+        grafico_contenido_por_rating(None, agregados=agregados)
+        grafico_top_generos(None, agregados=agregados)
+
+
+def main(modo_graficos='secuencial', por_trozos=False, metricas=False):
     """
     Función principal.
     Organiza todo el trabajo llamando a las funciones de los otros ficheros.
+    - modo_graficos: 'secuencial' (un gráfico detrás de otro con pyplot) o
+      'paralelo' (procesos en paralelo, saltando los gráficos sin cambios).
+    - por_trozos: leer el CSV por trozos (para catálogos que no caben en memoria).
+    - metricas: medir tiempo y memoria de cada paso de la limpieza. Usa
+      tracemalloc, que ralentiza la limpieza, así que solo se activa si se pide.
     """
     print("=========================================")
     print("   ANÁLISIS DE DATOS DE NETFLIX")
     print("=========================================\n")
 
-    # 1. Cargar los datos
     ruta_csv = "netflix_titles.csv"
+    if por_trozos:
+        main_por_trozos(ruta_csv, modo_graficos)
+        return
+
+    # 1. Cargar los datos
     print(f"1. Cargando dataset desde: {ruta_csv}...")
     df = cargar_dataset(ruta_csv)
     
@@ -41,32 +87,58 @@ def main():
         
         # 3. Limpiar los datos
         print("3. Limpiando y preparando datos...")
-        df_clean = preparar_dataset(df)
+        # Modo pipeline: un único DataFrame para todos los pasos, sin copias completas
+        metricas_limpieza = [] if metricas else None
+        df_clean = preparar_dataset(df, modo='pipeline', metricas=metricas_limpieza)
         print("   Datos limpiados correctamente.")
+        if metricas:
+            mostrar_metricas(metricas_limpieza)
         
         # 4. Analizar
         print("\n4. Ejecutando análisis de datos...")
+        # Todos los conteos de una vez; los gráficos reutilizan el mismo resultado.
+        # La huella del dataset se calcula una sola vez y se pasa a cada consulta
+        version = version_dataset(df_clean)
+        agregados = obtener_agregados(df_clean, version=version)
         
         print("\n   --- Contenido por Tipo ---")
-        type_counts = contenido_por_tipo(df_clean)
+        type_counts = agregados['por_tipo']
         print(type_counts)
         
         print("\n   --- Contenido por País (Top 5) ---")
-        print(top_paises(df_clean))
+        print(agregados['por_pais'].head(5))
         
         print("\n   --- Contenido por Rating ---")
-        print(contenido_por_rating(df_clean).head()) # Mostramos head para no saturar
+        print(agregados['por_rating'].head()) # Mostramos head para no saturar
+        
+        # Índice de géneros, países y reparto (todos los valores de cada título).
+        # Se construye con el DataFrame cargado porque la limpieza deja solo el primer país,
+        # pero sin duplicados (como en la limpieza) para no contar dos veces un título
+        indices = construir_indices(df.drop_duplicates())
+        
+        print("\n   --- Contenido por País, contando todos los países (Top 5) ---")
+        print(indices['country'].top(5))
+        
+        print("\n   --- Géneros que más aparecen juntos (Top 5) ---")
+        print(coocurrencias(indices['listed_in'], n=5))
+        
+        print("\n   --- País x Género (Top 5) ---")
+        print(coocurrencias(indices['country'], indices['listed_in'], n=5))
         
         # 5. Visualización
         print("\n5. Generando visualizaciones...")
         print("   Guardando gráficos en la carpeta 'graphs'...")
         
-        grafico_contenido_por_tipo(df_clean)
-        grafico_contenido_por_anio(df_clean)
-        grafico_top_paises(df_clean)
-        grafico_distribucion_duracion(df_clean)
-        grafico_contenido_por_rating(df_clean)
-        grafico_top_generos(df_clean)
+        if modo_graficos == 'paralelo':
+            # En varios procesos y solo los gráficos cuyos datos han cambiado
+            renderizar_graficos(agregados)
+        else:
+            grafico_contenido_por_tipo(df_clean, agregados=agregados, version=version)
+            grafico_contenido_por_anio(df_clean, agregados=agregados, version=version)
+            grafico_top_paises(df_clean, agregados=agregados, version=version)
+            grafico_distribucion_duracion(df_clean, agregados=agregados, version=version)
+            grafico_contenido_por_rating(df_clean, agregados=agregados, version=version)
+            grafico_top_generos(df_clean, agregados=agregados, version=version)
         
         print("\n=========================================")
         print("   ANÁLISIS COMPLETADO")
@@ -83,4 +155,7 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    # Uso: python main.py [secuencial|paralelo] [trozos] [metricas]
+    main(sys.argv[1] if len(sys.argv) > 1 else 'secuencial',
+         por_trozos='trozos' in sys.argv[2:],
+         metricas='metricas' in sys.argv[2:])
@@ -3,22 +3,35 @@ visualization.py
 ----------------
 Fichero para pintar las gráficas con seaborn y matplotlib.
 Cada función crea un gráfico y lo guarda en la carpeta 'graphs'.
+Los conteos salen de los agregados de analysis.py (parámetro agregados); si
+no se pasan, se obtienen de la caché con obtener_agregados. Pasar también
+version (de version_dataset) evita volver a calcular la huella del dataset
+en cada gráfico.
 
 Autor: Luis Cendán
 """
 
 import seaborn as sns
 import matplotlib.pyplot as plt
+import numpy as np
+import hashlib
+import json
 import os
-from analysis import contenido_por_rating, top_generos
+from concurrent.futures import ProcessPoolExecutor
+from analysis import obtener_agregados
 
-def grafico_contenido_por_tipo(df, save_dir='graphs'):
+def grafico_contenido_por_tipo(df, save_dir='graphs', agregados=None, version=None):
     """
     Gráfico de barras: Películas vs Series.
     """
     try:
+        # Se pintan los conteos ya calculados (countplot volvería a contar todas las filas)
+        agregados = agregados or obtener_agregados(df, version=version)
+        conteo_tipo = agregados['por_tipo']
+        
         plt.figure(figsize=(8, 6))
-        sns.countplot(data=df, x='type', hue='type', palette='viridis', legend=False)
+        sns.barplot(x=conteo_tipo.index.astype(str), y=conteo_tipo.values,
+                    hue=conteo_tipo.index.astype(str), palette='viridis', legend=False)
         plt.title('Distribución de Contenido por Tipo')
         plt.xlabel('Tipo')
         plt.ylabel('Cantidad')
@@ -32,13 +45,14 @@ def grafico_contenido_por_tipo(df, save_dir='graphs'):
         print(f"   [ERROR] No se pudo generar el gráfico de contenido por tipo: {e}")
 
 
-def grafico_contenido_por_anio(df, save_dir='graphs'):
+def grafico_contenido_por_anio(df, save_dir='graphs', agregados=None, version=None):
     """
     Genera un gráfico de líneas con la evolución del número de títulos por año y lo guarda.
     """
     try:
-        # Primero agregamos los datos
-        conteo_anio = df['release_year'].value_counts().sort_index()
+        # Los datos ya vienen agregados
+        agregados = agregados or obtener_agregados(df, version=version)
+        conteo_anio = agregados['por_anio']
         
         plt.figure(figsize=(12, 6))
         sns.lineplot(x=conteo_anio.index, y=conteo_anio.values, marker='o')
@@ -56,12 +70,13 @@ def grafico_contenido_por_anio(df, save_dir='graphs'):
         print(f"   [ERROR] No se pudo generar el gráfico de evolución por año: {e}")
 
 
-def grafico_top_paises(df, n=5, save_dir='graphs'):
+def grafico_top_paises(df, n=5, save_dir='graphs', agregados=None, version=None):
     """
     Genera un gráfico de barras con los n países con más títulos y lo guarda.
     """
     try:
-        top_c = df['country'].value_counts().head(n)
+        agregados = agregados or obtener_agregados(df, version=version)
+        top_c = agregados['por_pais'].head(n)
         
         plt.figure(figsize=(10, 6))
         sns.barplot(x=top_c.values, y=top_c.index, hue=top_c.index, palette='magma', legend=False)
@@ -78,16 +93,25 @@ def grafico_top_paises(df, n=5, save_dir='graphs'):
         print(f"   [ERROR] No se pudo generar el gráfico de top países: {e}")
 
 
-def grafico_distribucion_duracion(df, save_dir='graphs'):
+def grafico_distribucion_duracion(df, save_dir='graphs', agregados=None, version=None):
     """
     Histograma de la distribución de duración guardado como imagen.
     """
     try:
-        # Filtramos nulos en duration_num
-        df_clean = df.dropna(subset=['duration_num'])
+        # Los intervalos y conteos por tipo vienen de np.histogram en los agregados,
+        # así el tiempo del gráfico no depende del número de filas
+        agregados = agregados or obtener_agregados(df, version=version)
+        bordes, conteos = agregados['hist_duracion']
+        anchos = np.diff(bordes)
+        colores = sns.color_palette('coolwarm', len(conteos))
         
         plt.figure(figsize=(12, 6))
-        sns.histplot(data=df_clean, x='duration_num', hue='type', multiple='stack', bins=30, palette='coolwarm')
+        base = np.zeros(len(anchos))
+        for (tipo, valores), color in zip(conteos.items(), colores):
+            plt.bar(bordes[:-1], valores, width=anchos, bottom=base, align='edge',
+                    color=color, edgecolor='white', label=str(tipo))
+            base += valores
+        plt.legend(title='type')
         plt.title('Distribución de la Duración (Minutos / Temporadas)')
         plt.xlabel('Duración')
         plt.ylabel('Frecuencia')
@@ -101,15 +125,19 @@ def grafico_distribucion_duracion(df, save_dir='graphs'):
         print(f"   [ERROR] No se pudo generar el gráfico de distribución de duración: {e}")
 
 
-def grafico_contenido_por_rating(df, save_dir='graphs'):
+def grafico_contenido_por_rating(df, save_dir='graphs', agregados=None, version=None):
     """
     Gráfico de barras del número de títulos por rating guardado como imagen.
     """
     try:
+        agregados = agregados or obtener_agregados(df, version=version)
+        # value_counts ya viene ordenado por cantidad, que se ve mejor
+        conteo_rating = agregados['por_rating']
+        etiquetas = conteo_rating.index.astype(str)
+        
         plt.figure(figsize=(12, 6))
-        # Ordenamos por cantidad para mejor visualización
-        order = df['rating'].value_counts().index
-        sns.countplot(data=df, x='rating', order=order, hue='rating', palette='pastel', legend=False)
+        sns.barplot(x=etiquetas, y=conteo_rating.values, order=etiquetas,
+                    hue=etiquetas, palette='pastel', legend=False)
         plt.title('Distribución de Contenido por Rating')
         plt.xlabel('Rating')
         plt.ylabel('Cantidad')
@@ -124,18 +152,14 @@ def grafico_contenido_por_rating(df, save_dir='graphs'):
         print(f"   [ERROR] No se pudo generar el gráfico de contenido por rating: {e}")
 
 
-def grafico_top_generos(df, n=5, save_dir='graphs'):
+def grafico_top_generos(df, n=5, save_dir='graphs', agregados=None, version=None):
     """
     Gráfico de barras de los n géneros más frecuentes guardado como imagen.
     """
-    # Reutilizamos la lógica de split y explode, o podemos llamar a la funcion de analisis si queremos estandarizar
-    # Pero visualización suele recibir el df.
-    # Dado que analysis.py tiene 'top_generos', podemos usarla para obtener los datos.
-    
     try:
-        # Usamos la función de analisis para obtener los datos
-        # Nota: top_generos devuelve una Serie pandas
-        top_g = top_generos(df, n)
+        # Los géneros ya vienen separados y contados en los agregados
+        agregados = agregados or obtener_agregados(df, version=version)
+        top_g = agregados['por_genero'].head(n)
         
         plt.figure(figsize=(10, 6))
         sns.barplot(x=top_g.values, y=top_g.index, hue=top_g.index, palette='Spectral', legend=False)
@@ -150,3 +174,167 @@ def grafico_top_generos(df, n=5, save_dir='graphs'):
         print(f"   Gráfico guardado en: {save_path}")
     except Exception as e:
         print(f"   [ERROR] No se pudo generar el gráfico de top géneros: {e}")
+
+
+# ---------------------------------------------------------------------------
+# Modo paralelo
+# ---------------------------------------------------------------------------
+# Cada gráfico se describe con un diccionario pequeño (títulos, etiquetas y
+# valores ya agregados) y se dibuja en otro proceso con la API orientada a
+# objetos de matplotlib (Figure + FigureCanvasAgg), sin el estado global de
+# pyplot. La huella de esos datos se guarda en los metadatos del PNG: si no ha
+# cambiado, el gráfico no se vuelve a dibujar.
+
+# Cambiar si cambia la forma de dibujar, para forzar que se regeneren todos
+VERSION_RENDER = 1
+CLAVE_HUELLA = 'netflix_huella'
+
+
+def especificaciones_graficos(agregados, n=5):
+    """
+    Describe los seis gráficos del informe a partir de los agregados.
+    Solo contiene listas y textos, así se envía barato a otros procesos.
+    """
+    def barras(serie):
+        return [str(etiqueta) for etiqueta in serie.index], [int(valor) for valor in serie.values]
+
+    tipos, conteo_tipos = barras(agregados['por_tipo'])
+    anios, conteo_anios = barras(agregados['por_anio'])
+    paises, conteo_paises = barras(agregados['por_pais'].head(n))
+    ratings, conteo_ratings = barras(agregados['por_rating'])
+    generos, conteo_generos = barras(agregados['por_genero'].head(n))
+
+    especificaciones = [
+        {'archivo': 'contenido_por_tipo.png', 'forma': 'barras', 'tamano': (8, 6),
+         'titulo': 'Distribución de Contenido por Tipo', 'xlabel': 'Tipo', 'ylabel': 'Cantidad',
+         'etiquetas': tipos, 'valores': conteo_tipos, 'paleta': 'viridis'},
+        {'archivo': 'contenido_por_anio.png', 'forma': 'lineas', 'tamano': (12, 6),
+         'titulo': 'Evolución del Contenido por Año', 'xlabel': 'Año', 'ylabel': 'Cantidad de Títulos',
+         'etiquetas': [int(anio) for anio in anios], 'valores': conteo_anios},
+        {'archivo': 'top_paises.png', 'forma': 'barras_h', 'tamano': (10, 6),
+         'titulo': f'Top {n} Países con más Contenido', 'xlabel': 'Cantidad', 'ylabel': 'País',
+         'etiquetas': paises, 'valores': conteo_paises, 'paleta': 'magma'},
+        {'archivo': 'contenido_por_rating.png', 'forma': 'barras', 'tamano': (12, 6),
+         'titulo': 'Distribución de Contenido por Rating', 'xlabel': 'Rating', 'ylabel': 'Cantidad',
+         'etiquetas': ratings, 'valores': conteo_ratings, 'paleta': 'pastel', 'rotacion': 45},
+        {'archivo': 'top_generos.png', 'forma': 'barras_h', 'tamano': (10, 6),
+         'titulo': f'Top {n} Géneros más Frecuentes', 'xlabel': 'Cantidad', 'ylabel': 'Género',
+         'etiquetas': generos, 'valores': conteo_generos, 'paleta': 'Spectral'},
+    ]
+
+    if 'hist_duracion' in agregados:
+        bordes, conteos = agregados['hist_duracion']
+        especificaciones.append(
+            {'archivo': 'distribucion_duracion.png', 'forma': 'histograma_apilado', 'tamano': (12, 6),
+             'titulo': 'Distribución de la Duración (Minutos / Temporadas)',
+             'xlabel': 'Duración', 'ylabel': 'Frecuencia', 'paleta': 'coolwarm',
+             'bordes': [float(borde) for borde in bordes],
+             'series': {str(tipo): [int(c) for c in valores] for tipo, valores in conteos.items()}})
+    return especificaciones
+
+
+def huella_grafico(especificacion):
+    """
+    sha1 de la especificación del gráfico (datos, títulos y versión de dibujo).
+    """
+    texto = json.dumps([VERSION_RENDER, especificacion], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+
+def leer_huella_png(ruta):
+    """
+    Devuelve la huella guardada en los metadatos del PNG, o None.
+    """
+    if not os.path.exists(ruta):
+        return None
+    try:
+        from PIL import Image
+        with Image.open(ruta) as imagen:
+            return imagen.text.get(CLAVE_HUELLA)
+    except (ImportError, OSError, AttributeError):
+        return None
+
+
+def dibujar_grafico(tarea):
+    """
+    Dibuja un gráfico sin pyplot y lo guarda con su huella en los metadatos.
+    Se ejecuta en los procesos del pool, por eso recibe y devuelve datos simples.
+    """
+    especificacion, ruta, huella = tarea
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    try:
+        figura = Figure(figsize=especificacion['tamano'])
+        FigureCanvasAgg(figura)
+        ax = figura.add_subplot()
+        forma = especificacion['forma']
+        etiquetas = especificacion.get('etiquetas')
+        valores = especificacion.get('valores')
+
+        if forma == 'barras':
+            colores = sns.color_palette(especificacion['paleta'], len(etiquetas))
+            ax.bar(etiquetas, valores, color=colores)
+            if especificacion.get('rotacion'):
+                ax.tick_params(axis='x', labelrotation=especificacion['rotacion'])
+        elif forma == 'barras_h':
+            colores = sns.color_palette(especificacion['paleta'], len(etiquetas))
+            # El primero arriba, como en sns.barplot
+            ax.barh(etiquetas, valores, color=colores)
+            ax.invert_yaxis()
+        elif forma == 'lineas':
+            ax.plot(etiquetas, valores, marker='o')
+            ax.grid(True)
+        elif forma == 'histograma_apilado':
+            bordes = especificacion['bordes']
+            anchos = [b - a for a, b in zip(bordes, bordes[1:])]
+            colores = sns.color_palette(especificacion['paleta'], len(especificacion['series']))
+            base = [0] * len(anchos)
+            for (tipo, conteos), color in zip(especificacion['series'].items(), colores):
+                ax.bar(bordes[:-1], conteos, width=anchos, bottom=base, align='edge',
+                       color=color, edgecolor='white', label=tipo)
+                base = [b + c for b, c in zip(base, conteos)]
+            ax.legend(title='type')
+
+        ax.set_title(especificacion['titulo'])
+        ax.set_xlabel(especificacion['xlabel'])
+        ax.set_ylabel(especificacion['ylabel'])
+        # Para que no se corten las etiquetas largas (países, géneros)
+        figura.tight_layout()
+        figura.savefig(ruta, metadata={CLAVE_HUELLA: huella})
+        return ruta, 'generado'
+    except Exception as e:
+        return ruta, f'error: {e}'
+
+
+def renderizar_graficos(agregados, save_dir='graphs', n=5, procesos=None, forzar=False):
+    """
+    Genera todos los gráficos en paralelo a partir de los agregados.
+    Los gráficos cuya huella coincide con la del PNG existente se saltan
+    (salvo con forzar=True).
+    Devuelve un diccionario ruta -> 'generado' / 'sin cambios' / 'error: ...'.
+    """
+    os.makedirs(save_dir, exist_ok=True)
+    estados = {}
+    tareas = []
+    for especificacion in especificaciones_graficos(agregados, n):
+        ruta = os.path.join(save_dir, especificacion['archivo'])
+        estados[ruta] = None  # Reserva el orden del informe
+        huella = huella_grafico(especificacion)
+        if not forzar and leer_huella_png(ruta) == huella:
+            estados[ruta] = 'sin cambios'
+        else:
+            tareas.append((especificacion, ruta, huella))
+
+    if len(tareas) == 1:
+        estados.update([dibujar_grafico(tareas[0])])
+    elif tareas:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            estados.update(pool.map(dibujar_grafico, tareas))
+
+    for ruta, estado in estados.items():
+        if estado.startswith('error'):
+            print(f"   [ERROR] No se pudo generar {ruta}: {estado[7:]}")
+        else:
+            print(f"   Gráfico {estado}: {ruta}")
+    return estados